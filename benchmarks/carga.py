@@ -0,0 +1,130 @@
+# Teste de carga de leitura/escrita simultâneas comparando o SQLite sem
+# PRAGMAs (journal padrão) com o perfil de produção (WAL e PRAGMAs de
+# src/config.py). Sobe o app em um servidor HTTP multi-thread local e dispara
+# leitores e escritores em paralelo durante alguns segundos.
+#
+# Uso: python benchmarks/carga.py [segundos] [leitores] [escritores]
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server
+from src.app import create_app
+from src.models import db
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
+from src.models.problema import Problema
+from src.models.manutencao import Manutencao
+
+COMPUTADORES = 500
+
+
+def popular(app, quantidade=20000):
+    with app.app_context():
+        db.session.execute(db.insert(Computador), [
+            {'marca': 'Dell', 'modelo': f'OptiPlex {i}', 'numero_serie': f'CARGA{i:06d}',
+             'data_aquisicao': date(2022, 1, 1)} for i in range(COMPUTADORES)
+        ])
+        db.session.add(Funcionario(nome='Técnico', cargo='Técnico', departamento='TI'))
+        db.session.add(Problema(descricao='Não liga', categoria='Hardware'))
+        db.session.flush()
+        inicio = datetime(2020, 1, 1)
+        db.session.execute(db.insert(Manutencao), [
+            {'computador_id': i % COMPUTADORES + 1, 'funcionario_id': 1, 'problema_id': 1,
+             'data_manutencao': inicio + timedelta(hours=i), 'tipo_manutencao': 'Corretiva',
+             'descricao_problema': 'Não liga', 'solucao_aplicada': 'Troca da fonte'} for i in range(quantidade)
+        ])
+        db.session.commit()
+
+
+def requisicao(metodo, url, corpo=None):
+    dados = json.dumps(corpo).encode() if corpo is not None else None
+    pedido = urllib.request.Request(url, data=dados, method=metodo,
+                                    headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(pedido, timeout=30) as resposta:
+            resposta.read()
+            return resposta.status
+    except urllib.error.HTTPError as erro:
+        return erro.code
+
+
+def executar(nome, perfil, configuracao, segundos, leitores, escritores):
+    caminho = tempfile.mktemp(suffix='.db')
+    # Log de consultas lentas desligado nos dois perfis, para não pesar só em um
+    configuracao = {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}', 'DEBUG': False,
+                    'CONSULTAS_LENTAS_LIMIAR_MS': None, **configuracao}
+    app = create_app(perfil, configuracao)
+    popular(app)
+
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{servidor.server_port}/api'
+
+    resultados = {'leitura': [], 'escrita': []}
+    erros = {'leitura': 0, 'escrita': 0}
+    lock = threading.Lock()
+    fim = time.monotonic() + segundos
+
+    def trabalhador(tipo):
+        aleatorio = random.Random()
+        while time.monotonic() < fim:
+            id_computador = aleatorio.randint(1, COMPUTADORES)
+            inicio = time.perf_counter()
+            if tipo == 'leitura':
+                status = requisicao('GET', f'{base}/manutencoes/computador/{id_computador}')
+            else:
+                status = requisicao('PUT', f'{base}/computadores/{id_computador}',
+                                    {'modelo': f'OptiPlex {aleatorio.randint(1, 10 ** 6)}'})
+            duracao = time.perf_counter() - inicio
+            with lock:
+                if status >= 500:
+                    erros[tipo] += 1
+                else:
+                    resultados[tipo].append(duracao)
+
+    threads = [threading.Thread(target=trabalhador, args=('leitura',)) for _ in range(leitores)]
+    threads += [threading.Thread(target=trabalhador, args=('escrita',)) for _ in range(escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    servidor.shutdown()
+    with app.app_context():
+        db.engine.dispose()
+    for sufixo in ('', '-wal', '-shm'):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+
+    for tipo in ('leitura', 'escrita'):
+        tempos = sorted(resultados[tipo])
+        p95 = tempos[int(len(tempos) * 0.95)] * 1000 if tempos else 0
+        print(f'{nome:<30} {tipo:<8} {len(tempos) / segundos:>9.1f} req/s  p95 {p95:>8.1f}ms  erros {erros[tipo]:>5}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga de leitura/escrita sem PRAGMAs e com o perfil de produção')
+    parser.add_argument('segundos', type=float, nargs='?', default=10, help='duração de cada execução (padrão: 10)')
+    parser.add_argument('leitores', type=int, nargs='?', default=8, help='threads de leitura (padrão: 8)')
+    parser.add_argument('escritores', type=int, nargs='?', default=4, help='threads de escrita (padrão: 4)')
+    args = parser.parse_args()
+    segundos, leitores, escritores = args.segundos, args.leitores, args.escritores
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    print(f'{segundos:.0f}s, {leitores} leitores, {escritores} escritores')
+    executar('sem PRAGMAs (antes)', 'desenvolvimento', {'SQLITE_PRAGMAS': {}}, segundos, leitores, escritores)
+    executar('produção (WAL + PRAGMAs)', 'producao', {}, segundos, leitores, escritores)
+
+
+if __name__ == '__main__':
+    main()
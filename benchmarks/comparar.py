@@ -0,0 +1,69 @@
+# Compara dois resultados de benchmarks/endpoints.py cenário a cenário.
+#
+# Uso: python benchmarks/comparar.py antes.json depois.json [--limiar 10]
+#
+# Variações de latência acima do limiar (em %) são marcadas com "+" (pior)
+# ou "-" (melhor); mudanças no número de consultas SQL são sempre marcadas.
+import argparse
+import json
+
+
+def carregar(caminho):
+    with open(caminho) as arquivo:
+        relatorio = json.load(arquivo)
+    return relatorio['meta'], {(r['modo'], r['cenario']): r for r in relatorio['resultados']}
+
+
+def variacao(antes, depois):
+    if not antes:
+        return None
+    return (depois - antes) / antes * 100
+
+
+def marcar(percentual, limiar):
+    if percentual is None or abs(percentual) < limiar:
+        return ' '
+    return '+' if percentual > 0 else '-'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara dois resultados de benchmark')
+    parser.add_argument('antes')
+    parser.add_argument('depois')
+    parser.add_argument('--limiar', type=float, default=10, help='variação (%%) considerada relevante')
+    args = parser.parse_args()
+
+    meta_antes, antes = carregar(args.antes)
+    meta_depois, depois = carregar(args.depois)
+    print(f"antes:  {meta_antes.get('commit')} {meta_antes['data']} {meta_antes['contagens']}")
+    print(f"depois: {meta_depois.get('commit')} {meta_depois['data']} {meta_depois['contagens']}")
+    print()
+    print(f"{'modo':<8} {'cenário':<62} {'p50 antes':>10} {'depois':>9} {'var':>8}  "
+          f"{'p95 antes':>10} {'depois':>9} {'var':>8}  {'sql':>11}")
+
+    piores = melhores = 0
+    # Mantém a ordem de execução dos cenários
+    for chave in list(depois) + [chave for chave in antes if chave not in depois]:
+        modo, cenario = chave
+        a, d = antes.get(chave), depois.get(chave)
+        if a is None or d is None:
+            print(f"{modo:<8} {cenario[:62]:<62} {'(só em ' + ('depois' if a is None else 'antes') + ')':>10}")
+            continue
+        p50 = variacao(a['latencia_ms']['p50'], d['latencia_ms']['p50'])
+        p95 = variacao(a['latencia_ms']['p95'], d['latencia_ms']['p95'])
+        sql_a, sql_d = a['consultas_sql']['por_requisicao'], d['consultas_sql']['por_requisicao']
+        sql = f'{sql_a:g} -> {sql_d:g}' if sql_a != sql_d else f'{sql_d:g}'
+        marca = marcar(p50, args.limiar)
+        piores += marca == '+'
+        melhores += marca == '-'
+        print(f"{modo:<8} {cenario[:62]:<62} {a['latencia_ms']['p50']:>8.2f}ms {d['latencia_ms']['p50']:>7.2f}ms "
+              f"{p50 if p50 is not None else 0:>+7.1f}%{marca} {a['latencia_ms']['p95']:>8.2f}ms "
+              f"{d['latencia_ms']['p95']:>7.2f}ms {p95 if p95 is not None else 0:>+7.1f}%{marcar(p95, args.limiar)} "
+              f"{sql:>11}")
+
+    print()
+    print(f'p50 {args.limiar:g}% pior em {piores} cenário(s) e melhor em {melhores}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Mede bytes na rede e custo de CPU da compressão das respostas por
+# codificação e nível, sobre os payloads maiores da API, e o tempo de
+# requisição com e sem Accept-Encoding pelo middleware.
+#
+# Uso: python benchmarks/compressao.py [quantidade_de_manutencoes] [--link 10]
+#      --link: velocidade do link em Mbit/s para estimar o tempo de transferência
+import argparse
+import os
+import sys
+import tempfile
+import time
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serializacao import popular
+from src.app import create_app
+from src.models import db
+from src.utils.compressao import COMPRESSORES
+
+REPETICOES = 5
+NIVEIS = {'gzip': (1, 3, 6, 9), 'br': (1, 4, 6, 9, 11), 'zstd': (1, 3, 6, 12, 19)}
+PAYLOADS = [
+    ('lista expandida', '/api/manutencoes?expand=all'),
+    ('lista só com ids', '/api/manutencoes'),
+    ('exportação ndjson', '/api/manutencoes/exportar?formato=ndjson&expand=all'),
+]
+
+
+def comprimir(codificacao, nivel, dados):
+    compressor = COMPRESSORES[codificacao](nivel)
+    return compressor.compress(dados) + compressor.flush()
+
+
+def medir_nivel(codificacao, nivel, dados):
+    # Tempo de CPU do processo (não inclui espera), mediana das repetições
+    tempos = []
+    for _ in range(REPETICOES):
+        inicio = time.process_time()
+        comprimido = comprimir(codificacao, nivel, dados)
+        tempos.append(time.process_time() - inicio)
+    return len(comprimido), median(tempos)
+
+
+def medir_requisicao(cliente, url, codificacao):
+    cabecalhos = {'Accept-Encoding': codificacao} if codificacao else {}
+    tempos = []
+    tamanho = 0
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resposta = cliente.get(url, headers=cabecalhos)
+        tamanho = len(resposta.data)
+        tempos.append(time.perf_counter() - inicio)
+    return tamanho, median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('quantidade', type=int, nargs='?', default=5000)
+    parser.add_argument('--link', type=float, default=10.0)
+    args = parser.parse_args()
+
+    caminho = tempfile.mktemp(suffix='.db')
+    app = create_app('producao', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}'})
+    with app.app_context():
+        popular(args.quantidade)
+    cliente = app.test_client()
+    bytes_por_segundo = args.link * 1_000_000 / 8
+
+    print(f'{args.quantidade} manutenções, codificações disponíveis: {", ".join(COMPRESSORES)}, '
+          f'link de {args.link:g} Mbit/s, mediana de {REPETICOES} execuções')
+    for nome, url in PAYLOADS:
+        dados = cliente.get(url).data
+        print(f'\n{nome} ({url}): {len(dados):,} bytes, {len(dados) / bytes_por_segundo * 1000:,.0f} ms no link')
+        print(f'{"codificação":<12} {"nível":>5} {"bytes":>12} {"razão":>7} {"CPU":>10} {"MB/s":>8} {"no link":>10}')
+        for codificacao in COMPRESSORES:
+            for nivel in NIVEIS[codificacao]:
+                tamanho, cpu = medir_nivel(codificacao, nivel, dados)
+                print(f'{codificacao:<12} {nivel:>5} {tamanho:>12,} {len(dados) / tamanho:>6.1f}x '
+                      f'{cpu * 1000:>8.1f}ms {len(dados) / cpu / 1e6 if cpu else 0:>8.0f} '
+                      f'{tamanho / bytes_por_segundo * 1000:>8,.0f}ms')
+
+    print('\nrequisição completa pelo middleware (níveis de COMPRESSAO_NIVEIS)')
+    print(f'{"payload":<20} {"Accept-Encoding":<16} {"bytes":>12} {"requisição":>12}')
+    for nome, url in PAYLOADS:
+        for codificacao in (None, *COMPRESSORES):
+            tamanho, tempo = medir_requisicao(cliente, url, codificacao)
+            print(f'{nome:<20} {codificacao or "-":<16} {tamanho:>12,} {tempo * 1000:>10.1f}ms')
+
+    with app.app_context():
+        db.engine.dispose()
+    for sufixo in ('', '-wal', '-shm'):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,462 @@
+# Benchmark de todos os endpoints da API. Cada cenário é executado pelo test
+# client do Flask (custo da aplicação, sem rede) e por HTTP real em um servidor
+# multi-thread local (inclui socket, parsing HTTP e concorrência). Para cada
+# cenário são registrados latência p50/p95/p99, vazão, consultas SQL por
+# requisição, tamanho da resposta e pico de memória (RSS) do processo. O
+# resultado é gravado em JSON para ser comparado com benchmarks/comparar.py.
+#
+# Uso: python benchmarks/endpoints.py [--banco arquivo.db | --escala pequena] [--semente 42]
+#                                     [--modo cliente|http|ambos] [--repeticoes 200]
+#                                     [--concorrencia 4] [--perfil producao]
+#                                     [--filtro texto] [--sem-escritas] [--saida arquivo.json]
+#
+# Sem --banco, o banco da escala/semente é gerado por benchmarks/gerador.py
+# (e reaproveitado nas execuções seguintes). Os registros criados pelos
+# cenários de escrita são removidos ao final.
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func, text
+from werkzeug.serving import make_server
+from src.app import create_app
+from src.models import db
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
+from src.models.problema import Problema
+from src.models.manutencao import Manutencao
+from src.models.peca import Peca
+
+import gerador
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+PASTA_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+# Prefixo dos registros criados pelos cenários de escrita
+PREFIXO = 'BENCH'
+LINHAS_IMPORTACAO = 100
+
+
+class Cenario:
+    # montar(contexto) devolve (caminho, corpo); corpo pode ser um dict (JSON),
+    # uma tupla (bytes, content-type) ou None
+    def __init__(self, metodo, nome, montar, repeticoes=None, escrita=False, aquecimento=3):
+        self.metodo = metodo
+        self.nome = nome
+        self.montar = montar
+        self.repeticoes = repeticoes
+        self.escrita = escrita
+        self.aquecimento = 0 if escrita else aquecimento
+
+
+class Contexto:
+    # Ids e termos existentes no banco, sorteados com uma semente fixa
+    def __init__(self, app, semente):
+        self.aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self._sequencia = 0
+        self.criados = {}
+        with app.app_context():
+            self.maximos = {
+                'computadores': db.session.query(func.max(Computador.id)).scalar() or 1,
+                'funcionarios': db.session.query(func.max(Funcionario.id)).scalar() or 1,
+                'problemas': db.session.query(func.max(Problema.id)).scalar() or 1,
+                'pecas': db.session.query(func.max(Peca.id)).scalar() or 1,
+                'manutencoes': db.session.query(func.max(Manutencao.id)).scalar() or 1,
+            }
+            self.contagens = {
+                'computadores': Computador.query.count(),
+                'funcionarios': Funcionario.query.count(),
+                'problemas': Problema.query.count(),
+                'pecas': Peca.query.count(),
+                'manutencoes': Manutencao.query.count(),
+            }
+            self.ativo_js = next((nome for nome, ativo in app.extensions['estaticos'].ativos.items()
+                                  if ativo.nome == 'script.js' and nome != ativo.nome), 'script.js')
+
+    def id(self, tabela):
+        with self._lock:
+            return self.aleatorio.randint(1, self.maximos[tabela])
+
+    def escolha(self, opcoes):
+        with self._lock:
+            return self.aleatorio.choice(opcoes)
+
+    def sequencia(self):
+        with self._lock:
+            self._sequencia += 1
+            return self._sequencia
+
+    def guardar(self, tabela, id_criado):
+        with self._lock:
+            self.criados.setdefault(tabela, []).append(id_criado)
+
+    def ultimo(self, tabela):
+        with self._lock:
+            ids = self.criados.get(tabela)
+            return ids[-1] if ids else 0
+
+    def retirar(self, tabela):
+        with self._lock:
+            ids = self.criados.get(tabela)
+            return ids.pop() if ids else 0
+
+
+def _csv(linhas):
+    return ('\n'.join(linhas) + '\n').encode('utf-8'), 'text/csv'
+
+
+def cenarios(contexto, escritas=True):
+    c = contexto
+    marcas = tuple(gerador.MARCAS)
+    termos_pecas = ('ssd', 'memoria', 'fonte', 'kingston', 'teclado')
+    lista = [
+        Cenario('GET', '/', lambda: ('/', None)),
+        Cenario('GET', '/<ativo.js>', lambda: (f'/{c.ativo_js}', None)),
+        Cenario('GET', '/api/computadores?limit=50', lambda: ('/api/computadores?limit=50', None)),
+        Cenario('GET', '/api/computadores/<id>', lambda: (f"/api/computadores/{c.id('computadores')}", None)),
+        Cenario('GET', '/api/computadores/search', lambda: (f'/api/computadores/search?q={c.escolha(marcas)}', None)),
+        Cenario('GET', '/api/funcionarios', lambda: ('/api/funcionarios', None)),
+        Cenario('GET', '/api/funcionarios?limit=50', lambda: ('/api/funcionarios?limit=50', None)),
+        Cenario('GET', '/api/funcionarios/<id>', lambda: (f"/api/funcionarios/{c.id('funcionarios')}", None)),
+        Cenario('GET', '/api/funcionarios/search',
+                lambda: (f'/api/funcionarios/search?q={c.escolha(gerador.SOBRENOMES)}', None)),
+        Cenario('GET', '/api/problemas', lambda: ('/api/problemas', None)),
+        Cenario('GET', '/api/problemas/<id>', lambda: (f"/api/problemas/{c.id('problemas')}", None)),
+        Cenario('GET', '/api/problemas/categorias', lambda: ('/api/problemas/categorias', None)),
+        Cenario('GET', '/api/problemas/search', lambda: ('/api/problemas/search?q=rede', None)),
+        Cenario('GET', '/api/pecas?limit=50', lambda: ('/api/pecas?limit=50', None)),
+        Cenario('GET', '/api/pecas/<id>', lambda: (f"/api/pecas/{c.id('pecas')}", None)),
+        Cenario('GET', '/api/pecas/disponiveis?limit=50', lambda: ('/api/pecas/disponiveis?limit=50', None)),
+        Cenario('GET', '/api/pecas/search', lambda: (f'/api/pecas/search?q={c.escolha(termos_pecas)}', None)),
+        Cenario('GET', '/api/manutencoes?limit=50', lambda: ('/api/manutencoes?limit=50', None)),
+        Cenario('GET', '/api/manutencoes?limit=50&expand=computador,funcionario',
+                lambda: ('/api/manutencoes?limit=50&expand=computador,funcionario', None)),
+        Cenario('GET', '/api/manutencoes/<id>?expand=all',
+                lambda: (f"/api/manutencoes/{c.id('manutencoes')}?expand=all", None)),
+        Cenario('GET', '/api/manutencoes/computador/<id>',
+                lambda: (f"/api/manutencoes/computador/{c.id('computadores')}", None)),
+        Cenario('GET', '/api/manutencoes/tipos', lambda: ('/api/manutencoes/tipos', None)),
+        Cenario('GET', '/api/manutencoes/relatorio',
+                lambda: ('/api/manutencoes/relatorio?data_inicio=2020-01&data_fim=2024-12', None)),
+        Cenario('GET', '/api/manutencoes/exportar?computador_id=<id>',
+                lambda: (f"/api/manutencoes/exportar?computador_id={c.id('computadores')}", None)),
+        Cenario('GET', '/api/manutencoes/exportar?formato=csv&data_inicio=<mês>',
+                lambda: ('/api/manutencoes/exportar?formato=csv&data_inicio=2024-06-01&data_fim=2024-06-30', None),
+                repeticoes=20),
+        Cenario('GET', '/api/search', lambda: (f'/api/search?q={c.escolha(termos_pecas)}', None)),
+        Cenario('GET', '/api/_cache', lambda: ('/api/_cache', None)),
+        Cenario('GET', '/api/users', lambda: ('/api/users', None)),
+    ]
+    if not escritas:
+        return lista
+
+    def novo_computador():
+        n = c.sequencia()
+        return '/api/computadores', {'marca': 'Dell', 'modelo': 'OptiPlex 7090',
+                                     'numero_serie': f'{PREFIXO}-{os.getpid()}-{n}', 'data_aquisicao': '2024-01-10'}
+
+    def nova_peca():
+        n = c.sequencia()
+        return '/api/pecas', {'nome_peca': 'SSD 480GB', 'fabricante': 'Kingston', 'custo': 259.9,
+                              'numero_serie_peca': f'{PREFIXO}-{os.getpid()}-{n}', 'data_aquisicao_peca': '2024-01-10'}
+
+    def nova_manutencao():
+        return '/api/manutencoes', {
+            'computador_id': c.id('computadores'), 'funcionario_id': c.id('funcionarios'),
+            'problema_id': c.id('problemas'), 'data_manutencao': '2024-06-10T14:30',
+            'tipo_manutencao': 'Corretiva', 'descricao_problema': f'{PREFIXO} chamado de teste',
+            'solucao_aplicada': 'Troca do componente'}
+
+    def importar_computadores():
+        n = c.sequencia()
+        linhas = ['marca,modelo,numero_serie,data_aquisicao']
+        linhas += [f'HP,ProDesk 400 G7,{PREFIXO}-IMP-{os.getpid()}-{n}-{i},2023-05-02' for i in range(LINHAS_IMPORTACAO)]
+        return '/api/computadores/importar', _csv(linhas)
+
+    def importar_pecas():
+        n = c.sequencia()
+        linhas = ['nome_peca,fabricante,numero_serie_peca,data_aquisicao_peca,custo']
+        linhas += [f'Cooler,Intel,{PREFIXO}-IMP-{os.getpid()}-{n}-{i},2023-05-02,89.90' for i in range(LINHAS_IMPORTACAO)]
+        return '/api/pecas/importar', _csv(linhas)
+
+    # Cada recurso é criado, alterado e excluído pelos próprios cenários
+    for recurso, criar, alteracao in (
+        ('computadores', novo_computador, {'modelo': 'OptiPlex 3080'}),
+        ('funcionarios', lambda: ('/api/funcionarios', {'nome': f'{PREFIXO} Técnico', 'cargo': 'Técnico de Suporte',
+                                                        'departamento': 'TI'}), {'cargo': 'Analista de Suporte'}),
+        ('problemas', lambda: ('/api/problemas', {'descricao': f'{PREFIXO} problema', 'categoria': 'Hardware'}),
+         {'categoria': 'Software'}),
+        ('pecas', nova_peca, {'custo': 199.9}),
+        ('manutencoes', nova_manutencao, {'solucao_aplicada': 'Limpeza interna'}),
+        ('users', lambda: ('/api/users', {'username': f'{PREFIXO}{c.sequencia()}',
+                                          'email': f'{PREFIXO}{c.sequencia()}@teste.com'}), {'email': 'x@teste.com'}),
+    ):
+        lista += [
+            Cenario('POST', f'/api/{recurso}', criar, escrita=True),
+            Cenario('PUT', f'/api/{recurso}/<id>',
+                    lambda recurso=recurso, alteracao=alteracao: (
+                        f'/api/{recurso}/{c.ultimo(recurso)}', alteracao),
+                    escrita=True),
+            Cenario('DELETE', f'/api/{recurso}/<id>',
+                    lambda recurso=recurso: (f'/api/{recurso}/{c.retirar(recurso)}', None), escrita=True),
+        ]
+    lista += [
+        Cenario('POST', f'/api/computadores/importar ({LINHAS_IMPORTACAO} linhas)', importar_computadores,
+                repeticoes=20, escrita=True),
+        Cenario('POST', f'/api/pecas/importar ({LINHAS_IMPORTACAO} linhas)', importar_pecas,
+                repeticoes=20, escrita=True),
+        Cenario('DELETE', '/api/_cache', lambda: ('/api/_cache', None), escrita=True),
+    ]
+    return lista
+
+
+def _limpar_escritas(app):
+    # Remove o que sobrou dos cenários de escrita (importações e falhas)
+    padrao = f'{PREFIXO}%'
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text('DELETE FROM manutencoes WHERE descricao_problema LIKE :p'), {'p': padrao})
+            conn.execute(text('DELETE FROM pecas WHERE numero_serie_peca LIKE :p'), {'p': padrao})
+            conn.execute(text('DELETE FROM computadores WHERE numero_serie LIKE :p'), {'p': padrao})
+            conn.execute(text('DELETE FROM funcionarios WHERE nome LIKE :p'), {'p': padrao})
+            conn.execute(text('DELETE FROM problemas WHERE descricao LIKE :p'), {'p': padrao})
+            conn.execute(text('DELETE FROM user WHERE username LIKE :p'), {'p': padrao})
+
+
+class ContadorSQL:
+    def __init__(self, engine):
+        self.total = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._contar)
+
+    def _contar(self, *args):
+        with self._lock:
+            self.total += 1
+
+
+def rss_pico_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentil(ordenados, p):
+    if not ordenados:
+        return None
+    indice = min(len(ordenados) - 1, max(0, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+class ClienteTeste:
+    modo = 'cliente'
+
+    def __init__(self, app):
+        self.cliente = app.test_client()
+
+    def executar(self, metodo, caminho, corpo):
+        if isinstance(corpo, tuple):
+            resposta = self.cliente.open(caminho, method=metodo, data=corpo[0], content_type=corpo[1])
+        else:
+            resposta = self.cliente.open(caminho, method=metodo, json=corpo)
+        dados = resposta.get_data()
+        return resposta.status_code, dados
+
+
+class ClienteHTTP:
+    modo = 'http'
+
+    def __init__(self, app):
+        self.servidor = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.base = f'http://127.0.0.1:{self.servidor.server_port}'
+
+    def executar(self, metodo, caminho, corpo):
+        cabecalhos = {}
+        dados = None
+        if isinstance(corpo, tuple):
+            dados, cabecalhos['Content-Type'] = corpo
+        elif corpo is not None:
+            dados = json.dumps(corpo).encode('utf-8')
+            cabecalhos['Content-Type'] = 'application/json'
+        pedido = urllib.request.Request(self.base + caminho, data=dados, method=metodo, headers=cabecalhos)
+        try:
+            with urllib.request.urlopen(pedido, timeout=120) as resposta:
+                return resposta.status, resposta.read()
+        except urllib.error.HTTPError as erro:
+            return erro.code, erro.read()
+
+    def fechar(self):
+        self.servidor.shutdown()
+
+
+def medir(cliente, cenario, contexto, contador, repeticoes, concorrencia):
+    for _ in range(cenario.aquecimento):
+        cliente.executar(cenario.metodo, *cenario.montar())
+
+    latencias, status, tamanhos = [], {}, []
+    lock = threading.Lock()
+    restantes = [repeticoes]
+
+    def trabalhador():
+        while True:
+            with lock:
+                if restantes[0] <= 0:
+                    return
+                restantes[0] -= 1
+            caminho, corpo = cenario.montar()
+            inicio = time.perf_counter()
+            codigo, dados = cliente.executar(cenario.metodo, caminho, corpo)
+            duracao = time.perf_counter() - inicio
+            if cenario.metodo == 'POST' and codigo == 201:
+                try:
+                    criado = json.loads(dados)
+                    contexto.guardar(caminho.split('/')[2], criado['id'])
+                except (ValueError, KeyError, TypeError):
+                    pass
+            with lock:
+                latencias.append(duracao * 1000)
+                status[codigo] = status.get(codigo, 0) + 1
+                tamanhos.append(len(dados))
+
+    # Escritas encadeadas (POST -> PUT -> DELETE) rodam em sequência
+    threads = 1 if cenario.escrita else concorrencia
+    consultas_antes = contador.total
+    inicio = time.perf_counter()
+    if threads == 1:
+        trabalhador()
+    else:
+        trabalhadores = [threading.Thread(target=trabalhador) for _ in range(threads)]
+        for thread in trabalhadores:
+            thread.start()
+        for thread in trabalhadores:
+            thread.join()
+    duracao = time.perf_counter() - inicio
+    consultas = contador.total - consultas_antes
+
+    latencias.sort()
+    n = len(latencias)
+    return {
+        'modo': cliente.modo,
+        'cenario': f'{cenario.metodo} {cenario.nome}',
+        'requisicoes': n,
+        'concorrencia': threads,
+        'erros': sum(total for codigo, total in status.items() if codigo >= 400),
+        'status': {str(codigo): total for codigo, total in sorted(status.items())},
+        'latencia_ms': {
+            'p50': round(percentil(latencias, 50), 3),
+            'p95': round(percentil(latencias, 95), 3),
+            'p99': round(percentil(latencias, 99), 3),
+            'media': round(sum(latencias) / n, 3),
+            'max': round(latencias[-1], 3),
+        },
+        'vazao_rps': round(n / duracao, 1),
+        'consultas_sql': {'total': consultas, 'por_requisicao': round(consultas / n, 2)},
+        'bytes_por_resposta': round(sum(tamanhos) / n),
+        'rss_pico_mb': rss_pico_mb(),
+    }
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede todos os endpoints da API')
+    parser.add_argument('--banco', help='banco SQLite já populado (padrão: gerado por gerador.py)')
+    parser.add_argument('--escala', choices=gerador.ESCALAS, default='pequena')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--modo', choices=('cliente', 'http', 'ambos'), default='ambos')
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--concorrencia', type=int, default=4, help='threads de leitura no modo http')
+    parser.add_argument('--perfil', default='producao')
+    parser.add_argument('--filtro', help='executa apenas os cenários que contêm este texto')
+    parser.add_argument('--sem-escritas', action='store_true')
+    parser.add_argument('--saida', help='arquivo JSON de resultados (padrão: benchmarks/resultados/)')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    caminho = args.banco or gerador.caminho_padrao(args.escala, args.semente)
+    if not os.path.exists(caminho):
+        print(f'gerando {caminho}')
+        gerador.gerar_banco(caminho, args.escala, args.semente)
+
+    app = create_app(args.perfil, {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(caminho)}',
+                                   'DEBUG': False})
+    contexto = Contexto(app, args.semente)
+    with app.app_context():
+        contador = ContadorSQL(db.engine)
+
+    lista = cenarios(contexto, escritas=not args.sem_escritas)
+    if args.filtro:
+        lista = [cenario for cenario in lista if args.filtro in f'{cenario.metodo} {cenario.nome}']
+    modos = ('cliente', 'http') if args.modo == 'ambos' else (args.modo,)
+
+    resultados = []
+    try:
+        for modo in modos:
+            cliente = ClienteTeste(app) if modo == 'cliente' else ClienteHTTP(app)
+            concorrencia = 1 if modo == 'cliente' else args.concorrencia
+            for cenario in lista:
+                repeticoes = min(cenario.repeticoes or args.repeticoes, args.repeticoes)
+                resultado = medir(cliente, cenario, contexto, contador, repeticoes, concorrencia)
+                resultados.append(resultado)
+                latencia = resultado['latencia_ms']
+                print(f"{modo:<8} {resultado['cenario'][:62]:<62} p50 {latencia['p50']:>8.2f}ms "
+                      f"p95 {latencia['p95']:>8.2f}ms p99 {latencia['p99']:>8.2f}ms "
+                      f"{resultado['vazao_rps']:>8.1f} req/s  sql {resultado['consultas_sql']['por_requisicao']:>5.1f}"
+                      f"  erros {resultado['erros']}")
+            if modo == 'http':
+                cliente.fechar()
+    finally:
+        if not args.sem_escritas:
+            _limpar_escritas(app)
+
+    relatorio = {
+        'meta': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit_atual(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+            'processadores': os.cpu_count(),
+            'banco': os.path.abspath(caminho),
+            'contagens': contexto.contagens,
+            'perfil': args.perfil,
+            'semente': args.semente,
+            'repeticoes': args.repeticoes,
+            'concorrencia_http': args.concorrencia,
+        },
+        'resultados': resultados,
+    }
+    saida = args.saida or os.path.join(PASTA_RESULTADOS, f"endpoints-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w') as arquivo:
+        json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    print(f'resultados gravados em {saida}')
+
+
+if __name__ == '__main__':
+    main()
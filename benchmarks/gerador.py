@@ -0,0 +1,315 @@
+# Gerador de dados sintéticos para os benchmarks. Preenche um banco SQLite com
+# volumes realistas (dezenas de milhares de computadores, milhares de
+# funcionários e milhões de manutenções/peças). Com a mesma semente e a mesma
+# escala o conteúdo gerado é sempre o mesmo, então execuções podem ser
+# comparadas entre si.
+#
+# Uso: python benchmarks/gerador.py [--escala pequena|media|grande] [--semente 42]
+#                                   [--banco caminho.db] [--manutencoes N] ...
+#
+# Por padrão grava em benchmarks/dados/<escala>-<semente>.db. Para popular o
+# banco do app use --banco src/database/app.db (o conteúdo atual é apagado).
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from itertools import accumulate
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+from src.app import create_app
+from src.models import db
+from src.models.busca import fts_disponivel, reconstruir_indices_busca
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
+from src.models.problema import Problema
+from src.models.manutencao import Manutencao
+from src.models.peca import Peca
+from src.models.alteracoes import reconstruir_alteracoes
+from src.models.custos import reconstruir_custos
+from src.models.resumo import reconstruir_resumo
+from src.models.user import User
+from src.models.versao import TABELAS_VERSIONADAS
+
+PASTA_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dados')
+
+ESCALAS = {
+    'pequena': {'computadores': 2000, 'funcionarios': 200, 'manutencoes': 50000},
+    'media': {'computadores': 20000, 'funcionarios': 2000, 'manutencoes': 500000},
+    'grande': {'computadores': 50000, 'funcionarios': 5000, 'manutencoes': 2000000},
+}
+
+LOTE = 10000
+# Período coberto pelo histórico de manutenções
+INICIO_HISTORICO = datetime(2020, 1, 1)
+DIAS_HISTORICO = 5 * 365
+
+MARCAS = {
+    'Dell': ('OptiPlex 3080', 'OptiPlex 7090', 'Latitude 5420', 'Latitude 7430', 'Vostro 3510'),
+    'HP': ('ProDesk 400 G7', 'EliteDesk 800 G6', 'ProBook 440 G8', 'EliteBook 840 G8'),
+    'Lenovo': ('ThinkCentre M70q', 'ThinkCentre M90s', 'ThinkPad T14', 'ThinkPad E14', 'IdeaPad 3'),
+    'Positivo': ('Master D3400', 'Master N4340', 'Vision C14'),
+    'Acer': ('Veriton X2690G', 'Aspire 5', 'TravelMate P2'),
+    'Apple': ('iMac 24', 'MacBook Air M1', 'MacBook Pro 14'),
+}
+# Pesos aproximados da participação de cada marca no parque
+PESOS_MARCAS = (30, 25, 25, 10, 7, 3)
+
+NOMES = ('Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela',
+         'João', 'Karina', 'Lucas', 'Mariana', 'Nicolas', 'Otávio', 'Paula', 'Rafael', 'Sofia',
+         'Thiago', 'Vanessa', 'William', 'Yasmin')
+SOBRENOMES = ('Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira',
+              'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Araújo')
+CARGOS = ('Técnico de Suporte', 'Técnico de Manutenção', 'Analista de Suporte', 'Estagiário de TI',
+          'Coordenador de TI')
+DEPARTAMENTOS = ('TI', 'Suporte', 'Infraestrutura', 'Financeiro', 'RH', 'Comercial', 'Logística',
+                 'Jurídico', 'Marketing', 'Operações')
+
+PROBLEMAS = {
+    'Hardware': ('Computador não liga', 'Tela azul frequente', 'Superaquecimento', 'Ruído na ventoinha',
+                 'Memória RAM com defeito', 'HD com setores defeituosos', 'Fonte queimada',
+                 'Teclado com teclas falhando', 'Monitor sem imagem', 'Bateria não carrega'),
+    'Software': ('Sistema operacional lento', 'Erro ao iniciar o Windows', 'Vírus detectado',
+                 'Aplicativo travando', 'Atualização falhou', 'Licença expirada'),
+    'Rede': ('Sem acesso à internet', 'Wi-Fi desconectando', 'Placa de rede não reconhecida',
+             'Lentidão na rede'),
+    'Periféricos': ('Impressora não imprime', 'Mouse sem resposta', 'Webcam não reconhecida',
+                    'Leitor de código de barras falhando'),
+}
+
+# tipo de manutenção -> (peso, probabilidade de trocar peças)
+TIPOS_MANUTENCAO = {
+    'Corretiva': (55, 0.7),
+    'Preventiva': (30, 0.2),
+    'Preditiva': (10, 0.3),
+    'Upgrade': (5, 1.0),
+}
+
+# nome da peça -> (fabricantes, custo médio)
+PECAS = {
+    'Memória RAM 8GB': (('Kingston', 'Crucial', 'Corsair'), 180),
+    'Memória RAM 16GB': (('Kingston', 'Crucial', 'Corsair'), 320),
+    'SSD 240GB': (('Kingston', 'WD', 'Samsung'), 160),
+    'SSD 480GB': (('Kingston', 'WD', 'Samsung', 'Crucial'), 260),
+    'HD 1TB': (('Seagate', 'WD', 'Toshiba'), 290),
+    'Fonte 500W': (('Corsair', 'EVGA', 'Cooler Master'), 350),
+    'Cooler': (('Cooler Master', 'DeepCool', 'Intel'), 90),
+    'Placa-mãe': (('ASUS', 'Gigabyte', 'MSI'), 750),
+    'Teclado': (('Logitech', 'Dell', 'Microsoft'), 80),
+    'Mouse': (('Logitech', 'Dell', 'Microsoft'), 45),
+    'Bateria de notebook': (('Dell', 'HP', 'Lenovo'), 420),
+    'Placa de rede': (('TP-Link', 'Intel', 'D-Link'), 110),
+    'Pasta térmica': (('Arctic', 'Thermal Grizzly'), 35),
+}
+
+SOLUCOES = ('Substituição do componente', 'Limpeza interna e troca de pasta térmica',
+            'Reinstalação do sistema operacional', 'Atualização de drivers', 'Remoção de malware',
+            'Reconfiguração da rede', 'Ajuste nas configurações do BIOS', 'Teste e recalibração')
+
+
+def _escolha_ponderada(aleatorio, opcoes, pesos):
+    return aleatorio.choices(opcoes, weights=pesos, k=1)[0]
+
+
+def _lotes(linhas, tamanho=LOTE):
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def gerar_computadores(aleatorio, quantidade):
+    marcas = tuple(MARCAS)
+    for i in range(quantidade):
+        marca = _escolha_ponderada(aleatorio, marcas, PESOS_MARCAS)
+        aquisicao = date(2016, 1, 1) + timedelta(days=aleatorio.randint(0, 8 * 365))
+        yield {'marca': marca, 'modelo': aleatorio.choice(MARCAS[marca]),
+               'numero_serie': f'{marca[:3].upper()}{i:08d}', 'data_aquisicao': aquisicao,
+               'created_at': datetime.combine(aquisicao, datetime.min.time()),
+               'updated_at': datetime.combine(aquisicao, datetime.min.time())}
+
+
+def gerar_funcionarios(aleatorio, quantidade):
+    for _ in range(quantidade):
+        nome = f'{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {aleatorio.choice(SOBRENOMES)}'
+        yield {'nome': nome, 'cargo': _escolha_ponderada(aleatorio, CARGOS, (40, 25, 20, 10, 5)),
+               'departamento': aleatorio.choice(DEPARTAMENTOS),
+               'created_at': INICIO_HISTORICO, 'updated_at': INICIO_HISTORICO}
+
+
+def gerar_problemas():
+    for categoria, descricoes in PROBLEMAS.items():
+        for descricao in descricoes:
+            yield {'descricao': descricao, 'categoria': categoria,
+                   'created_at': INICIO_HISTORICO, 'updated_at': INICIO_HISTORICO}
+
+
+def gerar_manutencoes_e_pecas(aleatorio, quantidade, computadores, funcionarios, problemas):
+    # Poucos computadores concentram muitas falhas: cada um recebe um peso
+    # sorteado de uma distribuição de Pareto. Os técnicos também não atendem igualmente.
+    tipos = tuple(TIPOS_MANUTENCAO)
+    pesos_tipos = tuple(peso for peso, _ in TIPOS_MANUTENCAO.values())
+    nomes_pecas = tuple(PECAS)
+    tecnicos = max(1, funcionarios // 5)
+    pesos_computadores = list(accumulate(aleatorio.paretovariate(2.0) for _ in range(computadores)))
+    ids_computadores = range(1, computadores + 1)
+    id_peca = 0
+    for id_manutencao in range(1, quantidade + 1):
+        computador = aleatorio.choices(ids_computadores, cum_weights=pesos_computadores, k=1)[0]
+        funcionario = aleatorio.randint(1, tecnicos) if aleatorio.random() < 0.8 else aleatorio.randint(1, funcionarios)
+        tipo = _escolha_ponderada(aleatorio, tipos, pesos_tipos)
+        quando = INICIO_HISTORICO + timedelta(days=aleatorio.randint(0, DIAS_HISTORICO - 1),
+                                              minutes=aleatorio.randint(8 * 60, 18 * 60))
+        problema = aleatorio.randint(1, problemas)
+        manutencao = {'id': id_manutencao, 'computador_id': computador, 'funcionario_id': funcionario,
+                      'problema_id': problema, 'data_manutencao': quando, 'tipo_manutencao': tipo,
+                      'descricao_problema': f'Chamado {id_manutencao}: problema relatado pelo usuário',
+                      'solucao_aplicada': aleatorio.choice(SOLUCOES), 'created_at': quando, 'updated_at': quando}
+
+        pecas = []
+        if aleatorio.random() < TIPOS_MANUTENCAO[tipo][1]:
+            for _ in range(1 + int(aleatorio.expovariate(2.0))):
+                id_peca += 1
+                nome = aleatorio.choice(nomes_pecas)
+                fabricantes, custo_medio = PECAS[nome]
+                custo = round(custo_medio * math.exp(aleatorio.gauss(0, 0.25)), 2)
+                pecas.append({'nome_peca': nome, 'fabricante': aleatorio.choice(fabricantes),
+                              'numero_serie_peca': f'PC{id_peca:09d}',
+                              'data_aquisicao_peca': (quando - timedelta(days=aleatorio.randint(1, 60))).date(),
+                              'custo': custo, 'manutencao_id': id_manutencao,
+                              'created_at': quando, 'updated_at': quando})
+        yield manutencao, pecas
+
+
+def gerar_pecas_estoque(aleatorio, quantidade):
+    nomes_pecas = tuple(PECAS)
+    for i in range(quantidade):
+        nome = aleatorio.choice(nomes_pecas)
+        fabricantes, custo_medio = PECAS[nome]
+        aquisicao = date(2024, 1, 1) + timedelta(days=aleatorio.randint(0, 365))
+        yield {'nome_peca': nome, 'fabricante': aleatorio.choice(fabricantes),
+               'numero_serie_peca': f'ES{i:09d}', 'data_aquisicao_peca': aquisicao,
+               'custo': round(custo_medio * math.exp(aleatorio.gauss(0, 0.25)), 2), 'manutencao_id': None,
+               'created_at': datetime.combine(aquisicao, datetime.min.time()),
+               'updated_at': datetime.combine(aquisicao, datetime.min.time())}
+
+
+def _remover_gatilhos(conn):
+    # Os triggers (busca, resumo e versões) dobrariam o tempo de carga; são
+    # removidos durante a inserção e os dados derivados são reconstruídos no fim
+    gatilhos = conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'")).all()
+    for nome, _ in gatilhos:
+        conn.exec_driver_sql(f'DROP TRIGGER {nome}')
+    return [sql for _, sql in gatilhos]
+
+
+def _inserir(conn, modelo, linhas):
+    total = 0
+    for lote in _lotes(linhas):
+        conn.execute(insert(modelo), lote)
+        total += len(lote)
+    return total
+
+
+def popular(app, escala, semente, progresso=print):
+    aleatorio = random.Random(semente)
+    contagens = {}
+    inicio = time.perf_counter()
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('PRAGMA foreign_keys = OFF')
+            gatilhos = _remover_gatilhos(conn)
+
+            contagens['computadores'] = _inserir(conn, Computador, gerar_computadores(aleatorio, escala['computadores']))
+            contagens['funcionarios'] = _inserir(conn, Funcionario, gerar_funcionarios(aleatorio, escala['funcionarios']))
+            contagens['problemas'] = _inserir(conn, Problema, gerar_problemas())
+            contagens['users'] = _inserir(conn, User, ({'username': f'usuario{i}', 'email': f'usuario{i}@empresa.com'}
+                                                       for i in range(20)))
+            progresso(f'cadastros gerados em {time.perf_counter() - inicio:.1f}s')
+
+            contagens['manutencoes'] = contagens['pecas'] = 0
+            manutencoes, pecas = [], []
+            for manutencao, pecas_manutencao in gerar_manutencoes_e_pecas(
+                    aleatorio, escala['manutencoes'], contagens['computadores'],
+                    contagens['funcionarios'], contagens['problemas']):
+                manutencoes.append(manutencao)
+                pecas.extend(pecas_manutencao)
+                if len(manutencoes) >= LOTE:
+                    conn.execute(insert(Manutencao), manutencoes)
+                    conn.execute(insert(Peca), pecas)
+                    contagens['manutencoes'] += len(manutencoes)
+                    contagens['pecas'] += len(pecas)
+                    manutencoes, pecas = [], []
+                    if contagens['manutencoes'] % (LOTE * 20) == 0:
+                        progresso(f"{contagens['manutencoes']} manutenções ({time.perf_counter() - inicio:.1f}s)")
+            if manutencoes:
+                conn.execute(insert(Manutencao), manutencoes)
+                contagens['manutencoes'] += len(manutencoes)
+            if pecas:
+                conn.execute(insert(Peca), pecas)
+                contagens['pecas'] += len(pecas)
+            contagens['pecas'] += _inserir(conn, Peca, gerar_pecas_estoque(aleatorio, max(100, escala['manutencoes'] // 50)))
+
+            for sql in gatilhos:
+                conn.exec_driver_sql(sql)
+            reconstruir_resumo(conn)
+            reconstruir_custos(conn)
+            reconstruir_alteracoes(conn)
+            # Invalida ETags e caches gerados antes da carga
+            for tabela in TABELAS_VERSIONADAS:
+                conn.execute(text(
+                    "INSERT INTO versoes_tabelas (tabela, versao, atualizado_em) "
+                    "VALUES (:tabela, 1, strftime('%Y-%m-%d %H:%M:%f', 'now')) "
+                    "ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1, atualizado_em = excluded.atualizado_em"
+                ), {'tabela': tabela})
+        progresso(f'dados inseridos em {time.perf_counter() - inicio:.1f}s, reconstruindo índices de busca')
+        if fts_disponivel():
+            reconstruir_indices_busca()
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql('ANALYZE')
+        db.engine.dispose()
+    progresso(f'concluído em {time.perf_counter() - inicio:.1f}s: {contagens}')
+    return contagens
+
+
+def caminho_padrao(escala, semente):
+    return os.path.join(PASTA_DADOS, f'{escala}-{semente}.db')
+
+
+def gerar_banco(caminho, escala='pequena', semente=42, progresso=print, **quantidades):
+    valores = dict(ESCALAS[escala])
+    valores.update({chave: valor for chave, valor in quantidades.items() if valor is not None})
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    for sufixo in ('', '-wal', '-shm'):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+    app = create_app('producao', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(caminho)}'})
+    return popular(app, valores, semente, progresso)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera um banco com dados sintéticos para benchmarks')
+    parser.add_argument('--escala', choices=ESCALAS, default='pequena')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--banco', help='arquivo SQLite de destino (é recriado)')
+    parser.add_argument('--computadores', type=int)
+    parser.add_argument('--funcionarios', type=int)
+    parser.add_argument('--manutencoes', type=int)
+    args = parser.parse_args()
+
+    caminho = args.banco or caminho_padrao(args.escala, args.semente)
+    print(f'gerando escala {args.escala} (semente {args.semente}) em {caminho}')
+    gerar_banco(caminho, args.escala, args.semente, computadores=args.computadores,
+                funcionarios=args.funcionarios, manutencoes=args.manutencoes)
+
+
+if __name__ == '__main__':
+    main()
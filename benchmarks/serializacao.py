@@ -0,0 +1,105 @@
+# Compara tamanho e tempo de serialização de GET /api/manutencoes:
+# payload expandido com o codificador padrão do Flask (comportamento antigo)
+# contra orjson e a resposta só com ids (padrão atual).
+#
+# Uso: python benchmarks/serializacao.py [quantidade_de_manutencoes]
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+from src.app import create_app
+from src.models import db
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
+from src.models.problema import Problema
+from src.models.manutencao import Manutencao
+from src.models.peca import Peca
+from src.utils.json_rapido import ProvedorJSONRapido, orjson
+
+REPETICOES = 5
+
+
+def popular(quantidade):
+    computadores = [Computador(marca='Dell', modelo=f'OptiPlex {i}', numero_serie=f'BENCH{i:06d}',
+                               data_aquisicao=date(2022, 1, 1)) for i in range(200)]
+    funcionarios = [Funcionario(nome=f'Técnico {i}', cargo='Técnico', departamento='TI') for i in range(20)]
+    problemas = [Problema(descricao=f'Problema {i}', categoria='Hardware') for i in range(30)]
+    db.session.add_all(computadores + funcionarios + problemas)
+    db.session.flush()
+
+    inicio = datetime(2020, 1, 1)
+    manutencoes = [
+        {'computador_id': computadores[i % 200].id, 'funcionario_id': funcionarios[i % 20].id,
+         'problema_id': problemas[i % 30].id, 'data_manutencao': inicio + timedelta(hours=i),
+         'tipo_manutencao': ('Preventiva', 'Corretiva', 'Upgrade')[i % 3],
+         'descricao_problema': 'Equipamento não liga após queda de energia',
+         'solucao_aplicada': 'Substituição da fonte de alimentação'}
+        for i in range(quantidade)
+    ]
+    db.session.execute(db.insert(Manutencao), manutencoes)
+    pecas = [
+        {'nome_peca': 'Fonte 500W', 'numero_serie_peca': f'PS{i:07d}', 'fabricante': 'Corsair',
+         'data_aquisicao_peca': date(2023, 1, 1), 'custo': 249.9, 'manutencao_id': i + 1}
+        for i in range(quantidade)
+    ]
+    db.session.execute(db.insert(Peca), pecas)
+    db.session.commit()
+
+
+def medir(app, provedor, ordenar_chaves, url):
+    app.json = provedor(app)
+    app.json.sort_keys = ordenar_chaves
+    cliente = app.test_client()
+    tempos_requisicao, tempos_serializacao = [], []
+    tamanho = 0
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        resposta = cliente.get(url)
+        tempos_requisicao.append(time.perf_counter() - inicio)
+        tamanho = len(resposta.data)
+
+        with app.test_request_context(url):
+            expandir = ('computador', 'funcionario', 'problema', 'pecas') if 'expand' in url else ()
+            dados = [m.to_dict(expandir) for m in Manutencao.com_relacionamentos(expandir).all()]
+            inicio = time.perf_counter()
+            app.json.response(dados)
+            tempos_serializacao.append(time.perf_counter() - inicio)
+    return tamanho, median(tempos_serializacao), median(tempos_requisicao)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara a serialização de GET /api/manutencoes')
+    parser.add_argument('quantidade', type=int, nargs='?', default=5000, help='manutenções geradas (padrão: 5000)')
+    quantidade = parser.parse_args().quantidade
+    caminho = tempfile.mktemp(suffix='.db')
+    app = create_app('producao', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{caminho}'})
+    with app.app_context():
+        popular(quantidade)
+
+    cenarios = [
+        ('json padrão, expand=all (antes)', DefaultJSONProvider, True, '/api/manutencoes?expand=all'),
+        ('orjson, expand=all', ProvedorJSONRapido, False, '/api/manutencoes?expand=all'),
+        ('json padrão, só ids', DefaultJSONProvider, True, '/api/manutencoes'),
+        ('orjson, só ids (atual)', ProvedorJSONRapido, False, '/api/manutencoes'),
+    ]
+    print(f'{quantidade} manutenções, orjson {"disponível" if orjson else "ausente"}, mediana de {REPETICOES} execuções')
+    print(f'{"cenário":<34} {"bytes":>12} {"serialização":>14} {"requisição":>12}')
+    for nome, provedor, ordenar_chaves, url in cenarios:
+        tamanho, serializacao, requisicao = medir(app, provedor, ordenar_chaves, url)
+        print(f'{nome:<34} {tamanho:>12,} {serializacao * 1000:>12.1f}ms {requisicao * 1000:>10.1f}ms')
+    with app.app_context():
+        db.engine.dispose()
+    for sufixo in ('', '-wal', '-shm'):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+
+
+if __name__ == '__main__':
+    main()
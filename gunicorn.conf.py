@@ -0,0 +1,24 @@
+# Configuração do gunicorn para o perfil de produção:
+#   gunicorn -c gunicorn.conf.py src.wsgi:app
+import multiprocessing
+import os
+
+bind = os.environ.get('APP_BIND', '0.0.0.0:5000')
+
+# SQLite aceita um escritor por vez; com WAL os leitores não bloqueiam, então
+# poucos processos com várias threads cada rendem mais que muitos processos
+workers = int(os.environ.get('APP_WORKERS', min(multiprocessing.cpu_count(), 4)))
+worker_class = 'gthread'
+threads = int(os.environ.get('APP_THREADS', 8))
+
+# Cada worker cria o próprio app (e o próprio pool de conexões) depois do fork
+preload_app = False
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+max_requests = 5000
+max_requests_jitter = 500
+
+accesslog = '-'
+errorlog = '-'
@@ -159,7 +159,7 @@ async function loadDashboardData() {
             apiRequest('/computadores'),
             apiRequest('/funcionarios'),
             apiRequest('/pecas'),
-            apiRequest('/manutencoes')
+            apiRequest('/manutencoes?expand=computador,funcionario')
         ]);
         
         // Atualizar estatísticas
@@ -434,7 +434,7 @@ function searchPecas() {
 async function loadManutencoes() {
     try {
         const [manutencoes, computadores] = await Promise.all([
-            apiRequest('/manutencoes'),
+            apiRequest('/manutencoes?expand=computador,funcionario,problema'),
             apiRequest('/computadores')
         ]);
         
@@ -1024,7 +1024,7 @@ async function editManutencao(id) {
 
 async function viewManutencao(id) {
     try {
-        const manutencao = await apiRequest(`/manutencoes/${id}`);
+        const manutencao = await apiRequest(`/manutencoes/${id}?expand=all`);
         
         const content = `
             <div class="manutencao-details">
@@ -0,0 +1,196 @@
+import os
+import time
+import click
+from datetime import datetime, timedelta
+from flask import Flask
+from flask_cors import CORS
+from src.config import PERFIS
+from src.models import db
+from src.models.arquivo import arquivar_lote, configurar_arquivo
+from src.models.busca import verificar_indices_busca
+from src.models.conexao import (caminho_banco, caminho_replica, configurar_leitura, configurar_sqlite,
+                                criar_replica, preparar_leitura, replicar)
+from src.models.custos import reconstruir_custos
+from src.models.migracoes import aplicar_migracoes
+from src.models.resumo import reconstruir_resumo
+from src.routes.user import user_bp
+from src.routes.computador import computador_bp
+from src.routes.funcionario import funcionario_bp
+from src.routes.problema import problema_bp
+from src.routes.peca import peca_bp
+from src.routes.manutencao import manutencao_bp
+from src.routes.busca import busca_bp
+from src.routes.painel import painel_bp
+from src.routes.analise import analise_bp
+from src.routes.alteracoes import alteracoes_bp
+from src.routes.eventos import eventos_bp
+from src.routes.lote import lote_bp
+from src.routes.sistema import sistema_bp
+from src.utils.cache import cache_referencia
+from src.utils.compressao import compressao
+from src.utils.consultas_lentas import ORDENACOES, consultas_lentas, relatorio_arquivo
+from src.utils.estaticos import ManifestoEstaticos
+from src.utils.eventos import eventos
+from src.utils.json_rapido import configurar_json
+from src.utils.metricas import metricas
+
+
+def create_app(perfil='desenvolvimento', configuracao=None):
+    # perfil: chave de src.config.PERFIS; configuracao: valores que
+    # sobrescrevem os do perfil (por exemplo, outro banco para testes)
+    app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
+    app.config.from_object(PERFIS[perfil])
+    if configuracao:
+        app.config.update(configuracao)
+    configurar_json(app)
+    
+    # Habilitar CORS para permitir requisições do frontend
+    CORS(app)
+    
+    # Registrar blueprints
+    app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(computador_bp, url_prefix='/api')
+    app.register_blueprint(funcionario_bp, url_prefix='/api')
+    app.register_blueprint(problema_bp, url_prefix='/api')
+    app.register_blueprint(peca_bp, url_prefix='/api')
+    app.register_blueprint(manutencao_bp, url_prefix='/api')
+    app.register_blueprint(busca_bp, url_prefix='/api')
+    app.register_blueprint(painel_bp, url_prefix='/api')
+    app.register_blueprint(analise_bp, url_prefix='/api')
+    app.register_blueprint(alteracoes_bp, url_prefix='/api')
+    app.register_blueprint(eventos_bp, url_prefix='/api')
+    app.register_blueprint(lote_bp, url_prefix='/api')
+    app.register_blueprint(sistema_bp, url_prefix='/api')
+    
+    preparar_leitura(app)
+    db.init_app(app)
+    configurar_sqlite(app)
+    configurar_arquivo(app)
+    configurar_leitura(app)
+    cache_referencia.init_app(app)
+    metricas.init_app(app)
+    compressao.init_app(app)
+    consultas_lentas.init_app(app)
+    eventos.init_app(app)
+    with app.app_context():
+        aplicar_migracoes()
+        verificar_indices_busca()
+    criar_replica(app)
+    
+    registrar_comandos(app)
+    
+    # Arquivos estáticos ficam na memória; nenhuma requisição consulta o disco
+    estaticos = ManifestoEstaticos(app.static_folder)
+    app.extensions['estaticos'] = estaticos
+    
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        ativo = estaticos.obter(path) if path else None
+        if ativo is None:
+            # Rotas da SPA respondem com o index.html
+            ativo = estaticos.indice
+        if ativo is None:
+            return "index.html not found", 404
+        return estaticos.responder(ativo, path)
+    
+    return app
+
+
+def registrar_comandos(app):
+    @app.cli.command('migrar')
+    def migrar():
+        # Uso: flask --app src.main migrar
+        aplicadas = aplicar_migracoes()
+        if not aplicadas:
+            print('Banco de dados já está atualizado')
+        for numero, descricao in aplicadas:
+            print(f'Migração {numero} aplicada: {descricao}')
+    
+    @app.cli.command('reconstruir-resumo')
+    def reconstruir_resumo_manutencoes():
+        # Uso: flask --app src.main reconstruir-resumo
+        with db.engine.begin() as conn:
+            reconstruir_resumo(conn)
+            reconstruir_custos(conn)
+        print('Resumos de manutenções e de custos das peças reconstruídos')
+    
+    @app.cli.command('arquivar')
+    @click.option('--dias', type=int, help='Idade mínima em dias (padrão: ARQUIVO_IDADE_DIAS)')
+    @click.option('--lote', type=int, help='Manutenções por transação (padrão: ARQUIVO_LOTE)')
+    @click.option('--compactar', is_flag=True, help='Executa VACUUM no banco principal ao final')
+    def arquivar(dias, lote, compactar):
+        # Uso: APP_ARQUIVO=arquivo.db flask --app src.main arquivar
+        # Move manutenções antigas e suas peças para o banco de arquivo, um
+        # lote por transação para não segurar o lock de escrita
+        if not app.config.get('ARQUIVO_CAMINHO'):
+            raise click.ClickException('Defina APP_ARQUIVO com o caminho do banco de arquivo')
+        dias = dias if dias is not None else app.config['ARQUIVO_IDADE_DIAS']
+        lote = lote or app.config['ARQUIVO_LOTE']
+        limite = datetime.utcnow() - timedelta(days=dias)
+        total_manutencoes = total_pecas = 0
+        while True:
+            with db.engine.begin() as conn:
+                manutencoes, pecas = arquivar_lote(conn, limite, lote)
+            if not manutencoes:
+                break
+            total_manutencoes += manutencoes
+            total_pecas += pecas
+            print(f'{total_manutencoes} manutenções e {total_pecas} peças arquivadas')
+        print(f'Arquivamento concluído: {total_manutencoes} manutenções e {total_pecas} peças '
+              f'anteriores a {limite:%Y-%m-%d}')
+        if compactar and total_manutencoes:
+            # Devolve ao sistema as páginas liberadas nas tabelas quentes
+            with db.engine.connect() as conn:
+                conn.exec_driver_sql('VACUUM main')
+            print('Banco principal compactado')
+    
+    @app.cli.command('replicar')
+    @click.option('--intervalo', type=int, help='Repete a cada N segundos (padrão: uma vez)')
+    def replicar_leitura(intervalo):
+        # Uso: APP_LEITURA=replica.db flask --app src.main replicar [--intervalo 30]
+        # Atualiza a réplica lida pelas requisições GET; rode um único processo
+        # (cron ou --intervalo), não um por worker
+        destino = caminho_replica(app.config)
+        if not destino:
+            raise click.ClickException('Defina APP_LEITURA com o caminho da réplica')
+        origem = caminho_banco(app.config['SQLALCHEMY_DATABASE_URI'])
+        while True:
+            inicio = time.perf_counter()
+            replicar(origem, destino)
+            print(f'Réplica atualizada em {(time.perf_counter() - inicio) * 1000:.0f} ms')
+            if not intervalo:
+                break
+            time.sleep(intervalo)
+    
+    @app.cli.command('construir-estaticos')
+    def construir_estaticos():
+        # Uso: flask --app src.main construir-estaticos
+        # Pré-comprime os arquivos (.gz/.br) e grava o manifest.json
+        manifesto = ManifestoEstaticos(app.static_folder).gravar_build()
+        for nome, nome_publico in sorted(manifesto.items()):
+            print(f'{nome} -> {nome_publico}')
+    
+    @app.cli.command('consultas-lentas')
+    @click.argument('arquivo', required=False)
+    @click.option('--ordenar', type=click.Choice(ORDENACOES), default='total_ms')
+    @click.option('--limite', type=int, default=20)
+    def relatorio_consultas_lentas(arquivo, ordenar, limite):
+        # Uso: flask --app src.main consultas-lentas [arquivo.ndjson]
+        # Agrega o NDJSON de todos os workers (CONSULTAS_LENTAS_ARQUIVO por padrão)
+        arquivo = arquivo or app.config.get('CONSULTAS_LENTAS_ARQUIVO')
+        if not arquivo or not os.path.exists(arquivo):
+            raise click.ClickException('Nenhum arquivo de consultas lentas encontrado')
+        for posicao, formato in enumerate(relatorio_arquivo(arquivo, ordenar, limite), 1):
+            rotas = ', '.join(f'{rota} ({total}x)' for rota, total in
+                              sorted(formato['rotas'].items(), key=lambda item: -item[1]))
+            print(f"{posicao}. total {formato['total_ms']:.1f} ms | {formato['ocorrencias']}x | "
+                  f"média {formato['media_ms']:.1f} ms | máx {formato['max_ms']:.1f} ms")
+            print(f"   {formato['formato']}")
+            print(f'   rotas: {rotas}')
+            print(f"   parâmetros (mais lenta): {formato['exemplo']['parametros']}")
+            for linha in formato['plano'] or ():
+                print(f'   | {linha}')
+            if formato['varredura_completa']:
+                print(f"   ! varredura completa: {'; '.join(linha.strip() for linha in formato['varredura_completa'])}")
+            print()
@@ -0,0 +1,102 @@
+import os
+
+DIRETORIO_SRC = os.path.dirname(os.path.abspath(__file__))
+
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'asdf#FGSgvasgf$5$WGT')
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'DATABASE_URL', f"sqlite:///{os.path.join(DIRETORIO_SRC, 'database', 'app.db')}"
+    )
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # PRAGMAs executados em cada nova conexão com o SQLite
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 5000
+    }
+    
+    CACHE_REFERENCIA_TTL = 300
+    CACHE_REFERENCIA_MAXIMO = 128
+    
+    # Server-Timing e /api/_metrics; APP_METRICAS=0 desliga a instrumentação
+    METRICAS_ATIVAS = os.environ.get('APP_METRICAS', '1') != '0'
+    
+    # Compressão das respostas conforme o Accept-Encoding (zstd e br só com os
+    # pacotes zstandard e brotli instalados); APP_COMPRESSAO=0 desliga, por
+    # exemplo quando um proxy à frente já comprime
+    COMPRESSAO_ATIVA = os.environ.get('APP_COMPRESSAO', '1') != '0'
+    # Abaixo disso (bytes) a compressão não compensa
+    COMPRESSAO_MINIMO = 1024
+    # Níveis por codificação: gzip 1-9, br 0-11, zstd 1-22
+    COMPRESSAO_NIVEIS = {'zstd': 3, 'br': 4, 'gzip': int(os.environ.get('APP_COMPRESSAO_NIVEL', 6))}
+    
+    # Log de consultas lentas com EXPLAIN QUERY PLAN (/api/_consultas_lentas):
+    # desligado fora do desenvolvimento, a menos que APP_CONSULTAS_LENTAS_MS
+    # defina o limiar. Os valores dos parâmetros só são guardados e expostos
+    # com APP_CONSULTAS_LENTAS_PARAMETROS=1 (dados dos usuários)
+    CONSULTAS_LENTAS_LIMIAR_MS = float(os.environ.get('APP_CONSULTAS_LENTAS_MS', 0)) or None
+    CONSULTAS_LENTAS_PARAMETROS = os.environ.get('APP_CONSULTAS_LENTAS_PARAMETROS') == '1'
+    CONSULTAS_LENTAS_MAXIMO = 200
+    # NDJSON compartilhado pelos workers, lido por "flask consultas-lentas"
+    CONSULTAS_LENTAS_ARQUIVO = os.environ.get('APP_CONSULTAS_LENTAS_ARQUIVO')
+
+    # Engine somente leitura para as requisições GET/HEAD: APP_LEITURA=ro abre
+    # o próprio banco com mode=ro; um caminho usa essa réplica, atualizada por
+    # "flask replicar". Sem APP_LEITURA tudo usa o engine principal.
+    LEITURA_BANCO = os.environ.get('APP_LEITURA')
+
+    # Stream de alterações em /api/eventos (SSE); APP_EVENTOS=0 desliga
+    EVENTOS_ATIVOS = os.environ.get('APP_EVENTOS', '1') != '0'
+    EVENTOS_HEARTBEAT = 15
+    EVENTOS_MAXIMO_CLIENTES = 50
+    
+    # Por quanto tempo a resposta de um /api/batch com Idempotency-Key é guardada
+    IDEMPOTENCIA_VALIDADE_HORAS = 24
+    
+    # Banco de arquivo das manutenções antigas (anexado a cada conexão); sem
+    # APP_ARQUIVO o arquivamento fica desligado
+    ARQUIVO_CAMINHO = os.environ.get('APP_ARQUIVO')
+    # Manutenções sem alteração há mais dias que isso são arquivadas
+    ARQUIVO_IDADE_DIAS = int(os.environ.get('APP_ARQUIVO_IDADE_DIAS', 730))
+    ARQUIVO_LOTE = 500
+
+
+class DesenvolvimentoConfig(Config):
+    DEBUG = True
+    
+    CONSULTAS_LENTAS_LIMIAR_MS = float(os.environ.get('APP_CONSULTAS_LENTAS_MS', 100)) or None
+    CONSULTAS_LENTAS_PARAMETROS = os.environ.get('APP_CONSULTAS_LENTAS_PARAMETROS', '1') == '1'
+
+
+class ProducaoConfig(Config):
+    DEBUG = False
+    
+    # WAL permite leituras simultâneas a uma escrita; synchronous=NORMAL é
+    # seguro com WAL e evita um fsync por commit; busy_timeout faz o escritor
+    # esperar o lock em vez de falhar com "database is locked"
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # em KiB quando negativo: 64 MiB por conexão
+        'temp_store': 'MEMORY'
+    }
+    
+    # Um pool por processo: uma conexão por thread do worker e uma pequena folga
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('APP_THREADS', 8)),
+        'max_overflow': 2,
+        'pool_timeout': 10,
+        'pool_recycle': 3600
+    }
+    
+    # Cada cliente do stream ocupa uma thread do worker enquanto está
+    # conectado; metade das threads fica livre para as demais rotas
+    EVENTOS_MAXIMO_CLIENTES = max(1, int(os.environ.get('APP_THREADS', 8)) // 2)
+
+
+PERFIS = {
+    'desenvolvimento': DesenvolvimentoConfig,
+    'producao': ProducaoConfig
+}
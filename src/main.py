@@ -3,52 +3,10 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
-from flask_cors import CORS
-from src.models import db
-from src.routes.user import user_bp
-from src.routes.computador import computador_bp
-from src.routes.funcionario import funcionario_bp
-from src.routes.problema import problema_bp
-from src.routes.peca import peca_bp
-from src.routes.manutencao import manutencao_bp
+from src.app import create_app
 
-app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
-
-# Habilitar CORS para permitir requisições do frontend
-CORS(app)
-
-# Registrar blueprints
-app.register_blueprint(user_bp, url_prefix='/api')
-app.register_blueprint(computador_bp, url_prefix='/api')
-app.register_blueprint(funcionario_bp, url_prefix='/api')
-app.register_blueprint(problema_bp, url_prefix='/api')
-app.register_blueprint(peca_bp, url_prefix='/api')
-app.register_blueprint(manutencao_bp, url_prefix='/api')
-
-# uncomment if you need to use database
-app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(os.path.dirname(__file__), 'database', 'app.db')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db.init_app(app)
-with app.app_context():
-    db.create_all()
-
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
-            return "Static folder not configured", 404
-
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+# Servidor de desenvolvimento; em produção use src/wsgi.py (ver gunicorn.conf.py)
+app = create_app(os.environ.get('APP_PERFIL', 'desenvolvimento'))
 
 
 if __name__ == '__main__':
@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from .sessao import SessaoRoteada
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': SessaoRoteada})
 
 # Importar todos os modelos para garantir que sejam registrados
 from .user import User
@@ -9,4 +10,6 @@ from .funcionario import Funcionario
 from .problema import Problema
 from .manutencao import Manutencao
 from .peca import Peca
+from .resumo import ResumoManutencao
+from .versao import VersaoTabela
 
@@ -0,0 +1,61 @@
+from . import db
+from .arquivo import SEM_ARQUIVAMENTO
+from .versao import TABELAS_VERSIONADAS
+
+OPERACOES = {'I': 'insert', 'U': 'update', 'D': 'delete'}
+
+
+class Alteracao(db.Model):
+    # Registro de alterações para sincronização incremental (/api/changes),
+    # mantido por triggers no SQLite. Guarda uma linha por registro: cada
+    # alteração apaga a anterior e insere outra com o próximo seq, que serve
+    # de token monotônico. Exclusões ficam como marcadores (operacao 'D').
+    __tablename__ = 'alteracoes'
+
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tabela = db.Column(db.String(50), nullable=False)
+    registro_id = db.Column(db.Integer, nullable=False)
+    operacao = db.Column(db.String(1), nullable=False)
+    alterado_em = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('tabela', 'registro_id', name='uq_alteracoes_registro'),
+        # AUTOINCREMENT impede que um seq seja reutilizado depois de apagado
+        {'sqlite_autoincrement': True},
+    )
+
+    def __repr__(self):
+        return f'<Alteracao {self.seq} {self.operacao} {self.tabela}#{self.registro_id}>'
+
+
+def _registrar(tabela, prefixo, operacao):
+    return (
+        f"DELETE FROM alteracoes WHERE tabela = '{tabela}' AND registro_id = {prefixo}.id; "
+        "INSERT INTO alteracoes (tabela, registro_id, operacao, alterado_em) "
+        f"VALUES ('{tabela}', {prefixo}.id, '{operacao}', strftime('%Y-%m-%d %H:%M:%f', 'now')); "
+    )
+
+
+def criar_gatilhos_alteracoes(conn):
+    # Linhas movidas para o arquivo não viram exclusões no registro
+    for tabela in TABELAS_VERSIONADAS:
+        for evento, sufixo, prefixo, operacao, condicao in (
+                ('INSERT', 'ai', 'new', 'I', ''), ('UPDATE', 'au', 'new', 'U', ''),
+                ('DELETE', 'ad', 'old', 'D', SEM_ARQUIVAMENTO)):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {tabela}_alteracoes_{sufixo} AFTER {evento} ON {tabela} "
+                + condicao + "BEGIN " + _registrar(tabela, prefixo, operacao) + "END"
+            )
+
+
+def reconstruir_alteracoes(conn):
+    # Registra todas as linhas existentes como inseridas; marcadores de
+    # exclusão anteriores são perdidos, então clientes com tokens antigos
+    # devem sincronizar do zero (since=0)
+    conn.exec_driver_sql('DELETE FROM alteracoes')
+    for tabela in TABELAS_VERSIONADAS:
+        conn.exec_driver_sql(
+            "INSERT INTO alteracoes (tabela, registro_id, operacao, alterado_em) "
+            f"SELECT '{tabela}', id, 'I', COALESCE(updated_at, created_at, strftime('%Y-%m-%d %H:%M:%f', 'now')) "
+            f"FROM {tabela} ORDER BY COALESCE(updated_at, created_at), id"
+        )
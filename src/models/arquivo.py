@@ -0,0 +1,153 @@
+from flask import current_app
+from sqlalchemy import MetaData, event, func, or_, select, union_all
+from sqlalchemy.orm import aliased, selectinload
+from . import db
+from .computador import Computador
+from .funcionario import Funcionario
+from .problema import Problema
+from .manutencao import Manutencao
+from .peca import Peca
+
+# Arquivo de manutenções antigas: um segundo banco SQLite (ARQUIVO_CAMINHO),
+# anexado a cada conexão como o esquema "arquivo", com tabelas manutencoes e
+# pecas iguais às quentes. O arquivamento move as manutenções encerradas, com
+# suas peças, em lotes; as peças de uma manutenção ficam sempre no mesmo banco
+# que ela. As leituras que precisam do histórico consultam a união das duas.
+ESQUEMA = 'arquivo'
+
+# Enquanto houver uma linha em arquivando (só dentro da transação do
+# arquivamento), os triggers de exclusão dos resumos e do registro de
+# alterações não rodam: as linhas arquivadas continuam nos relatórios
+SEM_ARQUIVAMENTO = 'WHEN NOT EXISTS (SELECT 1 FROM arquivando) '
+
+# Cópias das tabelas no esquema do arquivo; computadores, funcionarios e
+# problemas só servem para resolver as chaves estrangeiras
+_metadados = MetaData()
+for _modelo in (Computador, Funcionario, Problema, Manutencao, Peca):
+    _modelo.__table__.to_metadata(_metadados, schema=ESQUEMA)
+MANUTENCOES_ARQUIVO = _metadados.tables[f'{ESQUEMA}.manutencoes']
+PECAS_ARQUIVO = _metadados.tables[f'{ESQUEMA}.pecas']
+
+
+def configurar_arquivo(app):
+    # Anexa o banco de arquivo a todas as conexões dos engines do app. Deve
+    # ser chamado logo após configurar_sqlite(app), antes da primeira conexão.
+    caminho = app.config.get('ARQUIVO_CAMINHO')
+    if not caminho:
+        return
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        engines = dict(db.engines)
+    for chave, engine in engines.items():
+        # O engine somente leitura anexa o arquivo sem alterar o journal
+        _registrar_anexo(engine, caminho, pragmas if chave is None else {})
+    with engines[None].begin() as conn:
+        _metadados.create_all(conn, tables=[MANUTENCOES_ARQUIVO, PECAS_ARQUIVO])
+
+
+def _registrar_anexo(engine, caminho, pragmas):
+    @event.listens_for(engine, 'connect')
+    def anexar_arquivo(conexao_dbapi, registro_conexao):
+        cursor = conexao_dbapi.cursor()
+        cursor.execute(f'ATTACH DATABASE ? AS {ESQUEMA}', (caminho,))
+        # Modo de journal e sincronização valem por banco
+        for nome in ('journal_mode', 'synchronous'):
+            if nome in pragmas:
+                cursor.execute(f'PRAGMA {ESQUEMA}.{nome} = {pragmas[nome]}')
+        cursor.close()
+
+
+def arquivo_anexado():
+    return bool(current_app.config.get('ARQUIVO_CAMINHO'))
+
+
+def arquivo_alcancado(data_inicio=None):
+    # A consulta precisa do arquivo se o período começa antes da manutenção
+    # arquivada mais recente (pelo índice de data, sem varrer o arquivo)
+    if not arquivo_anexado():
+        return False
+    horizonte = db.session.execute(select(func.max(MANUTENCOES_ARQUIVO.c.data_manutencao))).scalar()
+    return horizonte is not None and (data_inicio is None or data_inicio <= horizonte)
+
+
+def _uniao(tabela, copia, nome):
+    return union_all(select(tabela), select(copia)).subquery(nome)
+
+
+def pecas_com_arquivo():
+    # Peca mapeada sobre a união das tabelas quente e de arquivo
+    entidade = aliased(Peca, _uniao(Peca.__table__, PECAS_ARQUIVO, 'pecas_todas'), adapt_on_names=True)
+    return entidade, db.session.query(entidade)
+
+
+def manutencoes_com_arquivo(expandir=Manutencao.EXPANSOES):
+    # Manutencao mapeada sobre a união das tabelas quente e de arquivo,
+    # com as peças também vindas da união. Filtros e ORDER BY ... LIMIT sobre
+    # a entidade retornada são aplicados pelo SQLite a cada lado (MERGE de
+    # UNION ALL pelos índices), desde que a consulta não tenha JOINs: por isso
+    # os relacionamentos expandidos são carregados com selectinload.
+    entidade = aliased(Manutencao, _uniao(Manutencao.__table__, MANUTENCOES_ARQUIVO, 'manutencoes_todas'),
+                       adapt_on_names=True)
+    pecas, _ = pecas_com_arquivo()
+    opcoes = [selectinload(getattr(entidade, nome))
+              for nome in ('computador', 'funcionario', 'problema') if nome in expandir]
+    if 'pecas' in expandir:
+        opcoes.append(selectinload(entidade.pecas.of_type(pecas)))
+    else:
+        opcoes.append(selectinload(entidade.pecas.of_type(pecas)).load_only(pecas.id))
+    return entidade, db.session.query(entidade).options(*opcoes)
+
+
+def partes_manutencoes():
+    # Pares (manutencoes, pecas) das tabelas a consultar
+    partes = [(Manutencao.__table__, Peca.__table__)]
+    if arquivo_anexado():
+        partes.append((MANUTENCOES_ARQUIVO, PECAS_ARQUIVO))
+    return partes
+
+
+def possui_manutencoes_arquivadas(coluna, valor):
+    # Para as exclusões de computadores, funcionários e problemas
+    if not arquivo_anexado():
+        return False
+    return db.session.execute(
+        select(MANUTENCOES_ARQUIVO.c.id).where(MANUTENCOES_ARQUIVO.c[coluna] == valor).limit(1)
+    ).first() is not None
+
+
+def origem_completa(conn, tabela):
+    # Tabela (manutencoes ou pecas) para as reconstruções de resumos: com o
+    # arquivo anexado, a união das linhas quentes e arquivadas
+    anexados = {linha[1] for linha in conn.exec_driver_sql('PRAGMA database_list')}
+    if ESQUEMA not in anexados:
+        return tabela
+    colunas = ', '.join(coluna.name for coluna in db.metadata.tables[tabela].c)
+    return f'(SELECT {colunas} FROM main.{tabela} UNION ALL SELECT {colunas} FROM {ESQUEMA}.{tabela})'
+
+
+def arquivar_lote(conn, limite, tamanho):
+    # Move até "tamanho" manutenções encerradas (data e última alteração
+    # anteriores a "limite") e suas peças para o arquivo, na transação de
+    # "conn". Retorna (manutencoes, pecas) movidas; (0, 0) quando acabou.
+    # O arquivo é gravado antes da remoção e com INSERT OR REPLACE: se o
+    # processo parar no meio, repetir o arquivamento completa o lote.
+    manutencoes, pecas = Manutencao.__table__, Peca.__table__
+    ids = conn.execute(
+        select(manutencoes.c.id)
+        .where(manutencoes.c.data_manutencao < limite,
+               or_(manutencoes.c.updated_at.is_(None), manutencoes.c.updated_at < limite))
+        .order_by(manutencoes.c.data_manutencao, manutencoes.c.id).limit(tamanho)
+    ).scalars().all()
+    if not ids:
+        return 0, 0
+
+    conn.execute(MANUTENCOES_ARQUIVO.insert().prefix_with('OR REPLACE').from_select(
+        list(manutencoes.c.keys()), select(manutencoes).where(manutencoes.c.id.in_(ids))))
+    movidas = conn.execute(PECAS_ARQUIVO.insert().prefix_with('OR REPLACE').from_select(
+        list(pecas.c.keys()), select(pecas).where(pecas.c.manutencao_id.in_(ids)))).rowcount
+
+    conn.exec_driver_sql('INSERT INTO arquivando (ativo) VALUES (1)')
+    conn.execute(pecas.delete().where(pecas.c.manutencao_id.in_(ids)))
+    conn.execute(manutencoes.delete().where(manutencoes.c.id.in_(ids)))
+    conn.exec_driver_sql('DELETE FROM arquivando')
+    return len(ids), movidas
@@ -0,0 +1,124 @@
+import re
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from . import db
+from .computador import Computador
+from .funcionario import Funcionario
+from .problema import Problema
+from .peca import Peca
+
+# Tabelas FTS5 de conteúdo externo: o índice guarda apenas os tokens, o texto
+# continua nas tabelas originais. Triggers mantêm o índice sincronizado em
+# INSERT, UPDATE e DELETE, inclusive para escritas feitas fora das rotas.
+INDICES_BUSCA = {
+    'computadores': (Computador, ('marca', 'modelo', 'numero_serie')),
+    'funcionarios': (Funcionario, ('nome', 'cargo', 'departamento')),
+    'problemas': (Problema, ('descricao', 'categoria')),
+    'pecas': (Peca, ('nome_peca', 'fabricante', 'numero_serie_peca')),
+}
+
+_fts_disponivel = None
+
+
+def _ddl_indice(tabela, colunas):
+    fts = f'{tabela}_fts'
+    lista = ', '.join(colunas)
+    novos = ', '.join(f'new.{c}' for c in colunas)
+    antigos = ', '.join(f'old.{c}' for c in colunas)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({lista}, content='{tabela}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabela} BEGIN "
+        f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {novos}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabela} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {tabela} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos}); "
+        f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {novos}); END",
+    ]
+
+
+def _sem_fts5(erro):
+    return 'no such module: fts5' in str(erro.orig)
+
+
+def criar_indices_busca(conn):
+    # Migração 7, dentro da transação de aplicar_migracoes(). Num SQLite
+    # compilado sem FTS5 nada é criado (o primeiro comando já falha) e as
+    # buscas usam LIKE; qualquer outro erro interrompe a migração
+    try:
+        for tabela, (_, colunas) in INDICES_BUSCA.items():
+            fts = f'{tabela}_fts'
+            existe = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+                {'nome': fts}
+            ).first()
+            for ddl in _ddl_indice(tabela, colunas):
+                conn.exec_driver_sql(ddl)
+            if not existe:
+                # Indexa as linhas que já existiam antes do índice
+                conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    except OperationalError as e:
+        if not _sem_fts5(e):
+            raise
+
+
+def verificar_indices_busca():
+    # Deve ser chamado dentro do app context, depois de aplicar_migracoes():
+    # a busca usa FTS5 se a migração criou os índices e o SQLite tem o módulo
+    global _fts_disponivel
+    try:
+        with db.engine.connect() as conn:
+            for tabela in INDICES_BUSCA:
+                conn.exec_driver_sql(f'SELECT rowid FROM {tabela}_fts LIMIT 0')
+        _fts_disponivel = True
+    except OperationalError as e:
+        if not (_sem_fts5(e) or 'no such table' in str(e.orig)):
+            raise
+        _fts_disponivel = False
+    return _fts_disponivel
+
+
+def reconstruir_indices_busca():
+    with db.engine.begin() as conn:
+        for tabela in INDICES_BUSCA:
+            fts = f'{tabela}_fts'
+            conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def fts_disponivel():
+    return bool(_fts_disponivel)
+
+
+def montar_consulta_fts(termo):
+    # Cada palavra vira um termo entre aspas com busca por prefixo; as aspas
+    # impedem que operadores da sintaxe FTS5 digitados pelo usuário sejam interpretados
+    tokens = re.findall(r'\w+', termo or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def cabecalhos_limite(limite, mais):
+    # A busca por relevância não tem cursor: devolve até "limit" resultados e
+    # informa nos cabeçalhos o limite aplicado e se havia mais resultados
+    return {'X-Result-Limit': str(limite), 'X-Has-More': 'true' if mais else 'false'}
+
+
+def buscar(tabela, termo, limite):
+    # Retorna (objetos, mais): até "limite" objetos que casam com o termo,
+    # ordenados por relevância (bm25), e se havia mais resultados
+    modelo, _ = INDICES_BUSCA[tabela]
+    consulta = montar_consulta_fts(termo)
+    if not consulta:
+        return [], False
+
+    ids = [linha[0] for linha in db.session.execute(
+        text(f'SELECT rowid FROM {tabela}_fts WHERE {tabela}_fts MATCH :q ORDER BY rank LIMIT :limite'),
+        {'q': consulta, 'limite': limite + 1}
+    )]
+    mais = len(ids) > limite
+    ids = ids[:limite]
+    if not ids:
+        return [], mais
+
+    objetos = {obj.id: obj for obj in modelo.query.filter(modelo.id.in_(ids)).all()}
+    return [objetos[i] for i in ids if i in objetos], mais
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+from urllib.parse import quote
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from . import db
+from .sessao import BANCO_LEITURA
+
+# Só alteram o arquivo do banco; não valem para o engine somente leitura
+PRAGMAS_ESCRITA = ('journal_mode',)
+METODOS_LEITURA = ('GET', 'HEAD')
+
+
+def configurar_sqlite(app):
+    # Registra os PRAGMAs de SQLITE_PRAGMAS para todas as conexões dos
+    # engines do app. Deve ser chamado logo após db.init_app(app), antes da
+    # primeira conexão ser aberta.
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    with app.app_context():
+        engines = dict(db.engines)
+    for chave, engine in engines.items():
+        if engine.dialect.name != 'sqlite' or not pragmas:
+            continue
+        _registrar_pragmas(engine, {nome: valor for nome, valor in pragmas.items()
+                                    if chave != BANCO_LEITURA or nome not in PRAGMAS_ESCRITA})
+
+
+def _registrar_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(conexao_dbapi, registro_conexao):
+        cursor = conexao_dbapi.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome} = {valor}')
+        cursor.close()
+
+
+def caminho_banco(uri):
+    # Arquivo de um banco SQLite; None para outros bancos e para :memory:
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or url.database in (None, '', ':memory:'):
+        return None
+    return url.database
+
+
+def caminho_replica(config):
+    # LEITURA_BANCO diferente de "ro" é o caminho da réplica de leitura
+    destino = config.get('LEITURA_BANCO')
+    return destino if destino and destino != 'ro' else None
+
+
+def preparar_leitura(app):
+    # Declara o bind do engine somente leitura (SQLALCHEMY_BINDS); deve ser
+    # chamado antes de db.init_app(app). LEITURA_BANCO=ro abre o próprio banco
+    # principal com mode=ro; um caminho abre a réplica, criada por
+    # criar_replica(app) se ainda não existir. Sem LEITURA_BANCO (ou com um
+    # banco que não é SQLite em arquivo) todas as requisições usam o engine
+    # principal. Nenhuma conexão somente leitura é aberta antes das migrações,
+    # que criam o banco principal na primeira execução.
+    principal = caminho_banco(app.config['SQLALCHEMY_DATABASE_URI'])
+    if not app.config.get('LEITURA_BANCO') or principal is None:
+        return
+    caminho = caminho_replica(app.config) or principal
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    binds[BANCO_LEITURA] = f'sqlite:///file:{quote(os.path.abspath(caminho))}?mode=ro&uri=true'
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def criar_replica(app):
+    # Cria a réplica que ainda não existe a partir do banco principal; deve
+    # ser chamado depois de aplicar_migracoes(), para que ela já tenha o esquema
+    principal = caminho_banco(app.config['SQLALCHEMY_DATABASE_URI'])
+    replica = caminho_replica(app.config)
+    if BANCO_LEITURA in (app.config.get('SQLALCHEMY_BINDS') or {}) and replica and not os.path.exists(replica):
+        replicar(principal, replica)
+
+
+def configurar_leitura(app):
+    # Requisições GET e HEAD passam a consultar o engine somente leitura, sem
+    # mudança nas rotas: a sessão da requisição é marcada e SessaoRoteada
+    # escolhe o engine. Deve ser chamado depois de db.init_app(app).
+    if BANCO_LEITURA not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+    with app.app_context():
+        engine = db.engines[BANCO_LEITURA]
+
+    @event.listens_for(engine, 'connect')
+    def identificar_conexao(conexao_dbapi, registro_conexao):
+        # Lido pelas métricas para saber qual engine atendeu cada requisição
+        registro_conexao.info['banco'] = BANCO_LEITURA
+
+    @app.before_request
+    def rotear_leitura():
+        if request.method in METODOS_LEITURA:
+            db.session.info[BANCO_LEITURA] = True
+
+
+def replicar(origem, destino):
+    # Copia o banco principal para a réplica pela API de backup do SQLite,
+    # em um único passo: os leitores da réplica esperam (busy_timeout) e
+    # nunca veem uma cópia parcial
+    fonte = sqlite3.connect(origem)
+    alvo = sqlite3.connect(destino, timeout=30)
+    try:
+        fonte.backup(alvo)
+    finally:
+        alvo.close()
+        fonte.close()
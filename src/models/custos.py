@@ -0,0 +1,129 @@
+from . import db
+from .arquivo import SEM_ARQUIVAMENTO, origem_completa
+
+# Dimensões de análise do custo das peças. O departamento (do funcionário) e
+# o modelo (marca e modelo do computador) vêm da manutenção da peça; peças
+# sem manutenção ficam com valor ''.
+DIMENSOES = ('fabricante', 'departamento', 'modelo')
+
+
+class ResumoCustoPeca(db.Model):
+    # Custo e quantidade de peças por dimensão, valor e mês de aquisição,
+    # mantidos por triggers no SQLite. O tamanho depende do número de
+    # fabricantes, departamentos e modelos, não da quantidade de peças.
+    __tablename__ = 'pecas_custos_resumo'
+
+    dimensao = db.Column(db.String(20), primary_key=True)
+    ano = db.Column(db.Integer, primary_key=True)
+    mes = db.Column(db.Integer, primary_key=True)
+    valor = db.Column(db.String(200), primary_key=True)
+    custo = db.Column(db.Float, nullable=False, default=0)
+    quantidade = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ResumoCustoPeca {self.dimensao}={self.valor} {self.ano}-{self.mes:02d}: {self.custo}>'
+
+
+_ANO = "CAST(strftime('%Y', {data}) AS INTEGER)"
+_MES = "CAST(strftime('%m', {data}) AS INTEGER)"
+_SOMAR = (
+    " ON CONFLICT (dimensao, ano, mes, valor) DO UPDATE SET "
+    "custo = custo + excluded.custo, quantidade = quantidade + excluded.quantidade; "
+)
+_DEPARTAMENTO = ("COALESCE((SELECT f.departamento FROM manutencoes m JOIN funcionarios f ON f.id = m.funcionario_id "
+                 "WHERE m.id = {manutencao}), '')")
+_MODELO = ("COALESCE((SELECT c.marca || ' ' || c.modelo FROM manutencoes m JOIN computadores c ON c.id = m.computador_id "
+           "WHERE m.id = {manutencao}), '')")
+_LIMPAR_ZERADOS = "DELETE FROM pecas_custos_resumo WHERE quantidade <= 0; "
+
+
+def _peca(prefixo, sinal):
+    # Soma (sinal 1) ou subtrai (sinal -1) uma peça nas três dimensões
+    manutencao = f'{prefixo}.manutencao_id'
+    return (
+        "INSERT INTO pecas_custos_resumo (dimensao, ano, mes, valor, custo, quantidade) "
+        f"SELECT dimensoes.dimensao, {_ANO.format(data=f'{prefixo}.data_aquisicao_peca')}, "
+        f"{_MES.format(data=f'{prefixo}.data_aquisicao_peca')}, dimensoes.valor, "
+        f"{sinal} * {prefixo}.custo, {sinal} "
+        f"FROM (SELECT 'fabricante' AS dimensao, {prefixo}.fabricante AS valor "
+        f"UNION ALL SELECT 'departamento', {_DEPARTAMENTO.format(manutencao=manutencao)} "
+        f"UNION ALL SELECT 'modelo', {_MODELO.format(manutencao=manutencao)}) AS dimensoes "
+        "WHERE 1" + _SOMAR
+    )
+
+
+def _pecas_agrupadas(dimensao, valor, filtro, sinal):
+    # Move o custo das peças selecionadas por "filtro" (já agrupadas por mês)
+    # para "valor" (sinal 1) ou para fora dele (sinal -1)
+    return (
+        "INSERT INTO pecas_custos_resumo (dimensao, ano, mes, valor, custo, quantidade) "
+        f"SELECT '{dimensao}', {_ANO.format(data='p.data_aquisicao_peca')}, "
+        f"{_MES.format(data='p.data_aquisicao_peca')}, {valor}, {sinal} * SUM(p.custo), {sinal} * COUNT(*) "
+        f"FROM pecas p JOIN manutencoes m ON m.id = p.manutencao_id WHERE {filtro} GROUP BY 2, 3" + _SOMAR
+    )
+
+
+def _mover(dimensao, antigo, novo, filtro):
+    return (_pecas_agrupadas(dimensao, antigo, filtro, -1) + _pecas_agrupadas(dimensao, novo, filtro, 1)
+            + _LIMPAR_ZERADOS)
+
+
+GATILHOS_CUSTOS = [
+    "CREATE TRIGGER IF NOT EXISTS pecas_custos_ai AFTER INSERT ON pecas BEGIN "
+    + _peca('new', 1) + "END",
+    "CREATE TRIGGER IF NOT EXISTS pecas_custos_ad AFTER DELETE ON pecas " + SEM_ARQUIVAMENTO + "BEGIN "
+    + _peca('old', -1) + _LIMPAR_ZERADOS + "END",
+    "CREATE TRIGGER IF NOT EXISTS pecas_custos_au AFTER UPDATE OF custo, fabricante, data_aquisicao_peca, "
+    "manutencao_id ON pecas BEGIN "
+    + _peca('old', -1) + _peca('new', 1) + _LIMPAR_ZERADOS + "END",
+    # Mudanças na manutenção, no funcionário ou no computador mudam o
+    # departamento ou o modelo de todas as peças envolvidas
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_custos_funcionario AFTER UPDATE OF funcionario_id ON manutencoes "
+    "WHEN old.funcionario_id IS NOT new.funcionario_id BEGIN "
+    + _mover('departamento',
+             "COALESCE((SELECT departamento FROM funcionarios WHERE id = old.funcionario_id), '')",
+             "COALESCE((SELECT departamento FROM funcionarios WHERE id = new.funcionario_id), '')",
+             'm.id = new.id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_custos_computador AFTER UPDATE OF computador_id ON manutencoes "
+    "WHEN old.computador_id IS NOT new.computador_id BEGIN "
+    + _mover('modelo',
+             "COALESCE((SELECT marca || ' ' || modelo FROM computadores WHERE id = old.computador_id), '')",
+             "COALESCE((SELECT marca || ' ' || modelo FROM computadores WHERE id = new.computador_id), '')",
+             'm.id = new.id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS funcionarios_custos_au AFTER UPDATE OF departamento ON funcionarios "
+    "WHEN old.departamento IS NOT new.departamento BEGIN "
+    + _mover('departamento', 'old.departamento', 'new.departamento', 'm.funcionario_id = new.id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS computadores_custos_au AFTER UPDATE OF marca, modelo ON computadores "
+    "WHEN old.marca IS NOT new.marca OR old.modelo IS NOT new.modelo BEGIN "
+    + _mover('modelo', "old.marca || ' ' || old.modelo", "new.marca || ' ' || new.modelo",
+             'm.computador_id = new.id') + "END",
+]
+
+
+def criar_gatilhos_custos(conn):
+    for ddl in GATILHOS_CUSTOS:
+        conn.exec_driver_sql(ddl)
+
+
+def reconstruir_custos(conn):
+    # Recalcula todo o resumo a partir das tabelas pecas, manutencoes,
+    # funcionarios e computadores, incluindo as peças arquivadas. Os triggers
+    # não alcançam o arquivo: depois de uma mudança de departamento ou de
+    # modelo, as peças arquivadas só mudam de valor na reconstrução.
+    conn.exec_driver_sql('DELETE FROM pecas_custos_resumo')
+    pecas, manutencoes = origem_completa(conn, 'pecas'), origem_completa(conn, 'manutencoes')
+    valores = {
+        'fabricante': 'p.fabricante',
+        'departamento': "COALESCE(f.departamento, '')",
+        'modelo': "COALESCE(c.marca || ' ' || c.modelo, '')",
+    }
+    for dimensao, valor in valores.items():
+        conn.exec_driver_sql(
+            "INSERT INTO pecas_custos_resumo (dimensao, ano, mes, valor, custo, quantidade) "
+            f"SELECT '{dimensao}', {_ANO.format(data='p.data_aquisicao_peca')}, "
+            f"{_MES.format(data='p.data_aquisicao_peca')}, {valor}, SUM(p.custo), COUNT(*) "
+            f"FROM {pecas} p LEFT JOIN {manutencoes} m ON m.id = p.manutencao_id "
+            "LEFT JOIN funcionarios f ON f.id = m.funcionario_id "
+            "LEFT JOIN computadores c ON c.id = m.computador_id "
+            "GROUP BY 2, 3, 4"
+        )
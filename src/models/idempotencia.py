@@ -0,0 +1,20 @@
+from . import db
+from datetime import datetime
+
+
+class ChaveIdempotencia(db.Model):
+    # Resposta de cada lote (/api/batch) enviado com o cabeçalho
+    # Idempotency-Key, gravada na mesma transação das operações: ou o lote foi
+    # aplicado e a resposta está aqui, ou nada foi gravado. Uma repetição com
+    # a mesma chave recebe a resposta guardada sem reaplicar o lote.
+    __tablename__ = 'chaves_idempotencia'
+
+    chave = db.Column(db.String(255), primary_key=True)
+    # SHA-256 do corpo: a mesma chave com outro conteúdo é rejeitada
+    hash_pedido = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.Integer, nullable=False)
+    resposta = db.Column(db.Text, nullable=False)
+    criado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<ChaveIdempotencia {self.chave}>'
@@ -1,4 +1,5 @@
 from . import db
+from .peca import Peca
 from datetime import datetime
 
 class Manutencao(db.Model):
@@ -15,14 +16,43 @@ class Manutencao(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Índices alinhados às consultas das rotas: listagem ordenada por data,
+    # histórico por computador e filtros por funcionário, problema e tipo
+    __table_args__ = (
+        db.Index('ix_manutencoes_data_id', data_manutencao.desc(), id.desc()),
+        db.Index('ix_manutencoes_computador_data', computador_id, data_manutencao.desc()),
+        db.Index('ix_manutencoes_funcionario_data', funcionario_id, data_manutencao.desc()),
+        db.Index('ix_manutencoes_problema', problema_id),
+        db.Index('ix_manutencoes_tipo_data', tipo_manutencao, data_manutencao.desc()),
+        # Ids nunca são reutilizados: um id novo não pode coincidir com o de
+        # uma manutenção arquivada
+        {'sqlite_autoincrement': True},
+    )
+    
     # Relacionamento com peças
     pecas = db.relationship('Peca', backref='manutencao', lazy=True)
+    
+    # Relacionamentos que podem ser incluídos na resposta via ?expand=
+    EXPANSOES = ('computador', 'funcionario', 'problema', 'pecas')
 
     def __repr__(self):
         return f'<Manutencao {self.id} - {self.tipo_manutencao}>'
 
-    def to_dict(self):
-        return {
+    @classmethod
+    def com_relacionamentos(cls, expandir=EXPANSOES):
+        # Carrega os relacionamentos expandidos via JOIN e as peças em uma
+        # única consulta extra, evitando uma consulta por linha em to_dict().
+        # Sem expansão das peças, carrega apenas os ids para pecas_ids.
+        opcoes = [db.joinedload(getattr(cls, nome))
+                  for nome in ('computador', 'funcionario', 'problema') if nome in expandir]
+        if 'pecas' in expandir:
+            opcoes.append(db.selectinload(cls.pecas))
+        else:
+            opcoes.append(db.selectinload(cls.pecas).load_only(Peca.id))
+        return cls.query.options(*opcoes)
+
+    def to_dict(self, expandir=()):
+        dados = {
             'id': self.id,
             'computador_id': self.computador_id,
             'funcionario_id': self.funcionario_id,
@@ -33,9 +63,17 @@ class Manutencao(db.Model):
             'solucao_aplicada': self.solucao_aplicada,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'computador': self.computador.to_dict() if self.computador else None,
-            'funcionario': self.funcionario.to_dict() if self.funcionario else None,
-            'problema': self.problema.to_dict() if self.problema else None,
-            'pecas': [peca.to_dict() for peca in self.pecas] if self.pecas else []
+            'pecas_ids': [peca.id for peca in self.pecas]
         }
+        
+        # Objetos relacionados só são incluídos quando pedidos via ?expand=
+        if 'computador' in expandir:
+            dados['computador'] = self.computador.to_dict() if self.computador else None
+        if 'funcionario' in expandir:
+            dados['funcionario'] = self.funcionario.to_dict() if self.funcionario else None
+        if 'problema' in expandir:
+            dados['problema'] = self.problema.to_dict() if self.problema else None
+        if 'pecas' in expandir:
+            dados['pecas'] = [peca.to_dict() for peca in self.pecas]
+        return dados
 
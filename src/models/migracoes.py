@@ -0,0 +1,170 @@
+from sqlalchemy.schema import CreateTable
+from . import db
+from .arquivo import arquivo_anexado
+from .busca import criar_indices_busca
+from .alteracoes import criar_gatilhos_alteracoes, reconstruir_alteracoes
+from .custos import criar_gatilhos_custos, reconstruir_custos
+from .resumo import criar_gatilhos_resumo, reconstruir_resumo
+from .manutencao import Manutencao
+from .peca import Peca
+from .versao import TABELAS_VERSIONADAS, criar_gatilhos_versao
+
+# Migrações de esquema para bancos já existentes. db.create_all() só cria
+# tabelas que faltam; alterações em tabelas existentes (como novos índices)
+# precisam ser aplicadas aqui. A versão aplicada fica em PRAGMA user_version.
+# Novas migrações devem ser adicionadas ao final com o próximo número.
+
+
+# Índices da migração 1, fixos: a migração aplica sempre o mesmo esquema,
+# independente dos índices que os modelos declararem depois (um índice novo
+# precisa de uma migração nova)
+INDICES_CONSULTAS = [
+    'CREATE INDEX IF NOT EXISTS ix_manutencoes_data_id ON manutencoes (data_manutencao DESC, id DESC)',
+    'CREATE INDEX IF NOT EXISTS ix_manutencoes_computador_data ON manutencoes (computador_id, data_manutencao DESC)',
+    'CREATE INDEX IF NOT EXISTS ix_manutencoes_funcionario_data ON manutencoes (funcionario_id, data_manutencao DESC)',
+    'CREATE INDEX IF NOT EXISTS ix_manutencoes_problema ON manutencoes (problema_id)',
+    'CREATE INDEX IF NOT EXISTS ix_manutencoes_tipo_data ON manutencoes (tipo_manutencao, data_manutencao DESC)',
+    'CREATE INDEX IF NOT EXISTS ix_pecas_manutencao_id ON pecas (manutencao_id)',
+    'CREATE INDEX IF NOT EXISTS ix_problemas_categoria ON problemas (categoria)',
+]
+
+# Quanto um worker espera pelo lock de escrita enquanto outro aplica as migrações
+ESPERA_MIGRACOES_MS = 10 * 60 * 1000
+
+
+def _criar_indices_consultas(conn):
+    for ddl in INDICES_CONSULTAS:
+        conn.exec_driver_sql(ddl)
+
+
+def _criar_resumo_manutencoes(conn):
+    criar_gatilhos_resumo(conn)
+    reconstruir_resumo(conn)
+
+
+def _criar_resumo_custos(conn):
+    criar_gatilhos_custos(conn)
+    reconstruir_custos(conn)
+
+
+def _criar_registro_alteracoes(conn):
+    criar_gatilhos_alteracoes(conn)
+    reconstruir_alteracoes(conn)
+
+
+def _recriar_com_autoincremento(conn, tabela):
+    # Reconstrói a tabela com AUTOINCREMENT preservando os ids e os índices
+    # existentes (procedimento de alteração de tabelas do SQLite: nova
+    # tabela, cópia, troca de nome)
+    nova = f'{tabela.name}_nova'
+    indices = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? "
+                                   "AND sql IS NOT NULL", (tabela.name,)).scalars().all()
+    ddl = str(CreateTable(tabela).compile(dialect=conn.dialect))
+    conn.exec_driver_sql(ddl.replace(f'CREATE TABLE {tabela.name} ', f'CREATE TABLE {nova} ', 1))
+    colunas = ', '.join(coluna.name for coluna in tabela.c)
+    conn.exec_driver_sql(f'INSERT INTO {nova} ({colunas}) SELECT {colunas} FROM {tabela.name}')
+    conn.exec_driver_sql(f'DROP TABLE {tabela.name}')
+    conn.exec_driver_sql(f'ALTER TABLE {nova} RENAME TO {tabela.name}')
+    for sql in indices:
+        conn.exec_driver_sql(sql)
+
+
+def _sem_autoincremento(conn, tabela):
+    sql = conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                               (tabela.name,)).scalar()
+    return 'AUTOINCREMENT' not in sql.upper()
+
+
+def _garantir_autoincremento(conn):
+    # Com o arquivo, um id removido da tabela quente continua em uso no
+    # arquivo e não pode ser reaproveitado. Os bancos criados antes da
+    # migração 6 são reconstruídos na primeira inicialização com o arquivo
+    # configurado (os novos já nascem com AUTOINCREMENT); sem arquivo, nenhum
+    # banco paga pela cópia das tabelas.
+    tabelas = [modelo.__table__ for modelo in (Manutencao, Peca) if _sem_autoincremento(conn, modelo.__table__)]
+    if not tabelas:
+        return
+    # DROP TABLE fora de uma transação, ou com as chaves estrangeiras
+    # ligadas, deixaria o banco pela metade ou apagaria as peças
+    if not conn.connection.dbapi_connection.in_transaction:
+        raise RuntimeError('A reconstrução das tabelas deve rodar dentro de BEGIN IMMEDIATE')
+    if conn.exec_driver_sql('PRAGMA foreign_keys').scalar():
+        raise RuntimeError('A reconstrução das tabelas exige PRAGMA foreign_keys = OFF')
+    # Nenhum trigger pode referenciar manutencoes ou pecas durante a
+    # reconstrução; todos são recriados depois
+    gatilhos = conn.exec_driver_sql("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").all()
+    for nome, _ in gatilhos:
+        conn.exec_driver_sql(f'DROP TRIGGER {nome}')
+    for tabela in tabelas:
+        _recriar_com_autoincremento(conn, tabela)
+    for _, sql in gatilhos:
+        conn.exec_driver_sql(sql)
+
+
+def _preparar_arquivamento(conn):
+    conn.exec_driver_sql('CREATE TABLE IF NOT EXISTS arquivando (ativo INTEGER)')
+    # Os triggers de exclusão dos resumos e do registro de alterações passam
+    # a ignorar o arquivamento
+    redefinidos = ['manutencoes_resumo_ad', 'pecas_custos_ad'] + [f'{tabela}_alteracoes_ad'
+                                                                  for tabela in TABELAS_VERSIONADAS]
+    for nome in redefinidos:
+        conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {nome}')
+    criar_gatilhos_resumo(conn)
+    criar_gatilhos_custos(conn)
+    criar_gatilhos_alteracoes(conn)
+
+
+MIGRACOES = [
+    (1, 'Índices de chaves estrangeiras e colunas de filtro', _criar_indices_consultas),
+    (2, 'Contadores de manutenções por mês e tipo', _criar_resumo_manutencoes),
+    (3, 'Versões por tabela para validação de cache', criar_gatilhos_versao),
+    (4, 'Custo das peças por fabricante, departamento, modelo e mês', _criar_resumo_custos),
+    (5, 'Registro de alterações para sincronização incremental', _criar_registro_alteracoes),
+    (6, 'Triggers compatíveis com o arquivamento', _preparar_arquivamento),
+    (7, 'Índices de busca em texto (FTS5)', criar_indices_busca),
+]
+
+
+def versao_atual(conn):
+    return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+
+def aplicar_migracoes():
+    # Cria as tabelas que faltam (create_all) e aplica as migrações pendentes;
+    # deve ser chamado dentro do app context. Cada worker do gunicorn chama na
+    # inicialização: BEGIN IMMEDIATE toma o lock de escrita antes de verificar
+    # o esquema e ler a versão, então só um deles cria e migra e os demais
+    # esperam e encontram o banco atualizado. O driver fica em
+    # autocommit para que o BEGIN/COMMIT explícito inclua também o DDL (o
+    # pysqlite não abre transação antes de CREATE/DROP/ALTER): uma falha no
+    # meio desfaz a migração inteira.
+    aplicadas = []
+    with db.engine.connect() as conn:
+        conn.execution_options(isolation_level='AUTOCOMMIT')
+        espera = conn.exec_driver_sql('PRAGMA busy_timeout').scalar()
+        chaves_estrangeiras = conn.exec_driver_sql('PRAGMA foreign_keys').scalar()
+        # Não tem efeito dentro de uma transação: precisa vir antes do BEGIN
+        conn.exec_driver_sql('PRAGMA foreign_keys = OFF')
+        conn.exec_driver_sql(f'PRAGMA busy_timeout = {ESPERA_MIGRACOES_MS}')
+        try:
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+            try:
+                db.metadata.create_all(conn)
+                versao = versao_atual(conn)
+                for numero, descricao, migracao in MIGRACOES:
+                    if numero <= versao:
+                        continue
+                    migracao(conn)
+                    conn.exec_driver_sql(f'PRAGMA user_version = {int(numero)}')
+                    aplicadas.append((numero, descricao))
+                if arquivo_anexado():
+                    # Na migração 6 ou na primeira inicialização com o arquivo
+                    _garantir_autoincremento(conn)
+                conn.exec_driver_sql('COMMIT')
+            except BaseException:
+                conn.exec_driver_sql('ROLLBACK')
+                raise
+        finally:
+            conn.exec_driver_sql(f'PRAGMA busy_timeout = {espera}')
+            conn.exec_driver_sql(f'PRAGMA foreign_keys = {chaves_estrangeiras}')
+    return aplicadas
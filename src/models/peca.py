@@ -10,9 +10,13 @@ class Peca(db.Model):
     fabricante = db.Column(db.String(100), nullable=False)
     data_aquisicao_peca = db.Column(db.Date, nullable=False)
     custo = db.Column(db.Numeric(10, 2), nullable=False)
-    manutencao_id = db.Column(db.Integer, db.ForeignKey('manutencoes.id'), nullable=True)
+    manutencao_id = db.Column(db.Integer, db.ForeignKey('manutencoes.id'), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Ids nunca são reutilizados: um id novo não pode coincidir com o de uma
+    # peça arquivada
+    __table_args__ = {'sqlite_autoincrement': True}
 
     def __repr__(self):
         return f'<Peca {self.nome_peca} - {self.fabricante}>'
@@ -6,7 +6,7 @@ class Problema(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     descricao = db.Column(db.String(500), nullable=False)
-    categoria = db.Column(db.String(100), nullable=False)
+    categoria = db.Column(db.String(100), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -0,0 +1,55 @@
+from . import db
+from .arquivo import SEM_ARQUIVAMENTO, origem_completa
+
+class ResumoManutencao(db.Model):
+    # Contadores de manutenções por mês e tipo, mantidos por triggers no SQLite
+    # para que o relatório não precise agrupar a tabela manutencoes inteira
+    __tablename__ = 'manutencoes_resumo'
+    
+    ano = db.Column(db.Integer, primary_key=True)
+    mes = db.Column(db.Integer, primary_key=True)
+    tipo_manutencao = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ResumoManutencao {self.ano}-{self.mes:02d} {self.tipo_manutencao}: {self.total}>'
+
+
+def _incrementar(prefixo, delta):
+    return (
+        "INSERT INTO manutencoes_resumo (ano, mes, tipo_manutencao, total) VALUES ("
+        f"CAST(strftime('%Y', {prefixo}.data_manutencao) AS INTEGER), "
+        f"CAST(strftime('%m', {prefixo}.data_manutencao) AS INTEGER), "
+        f"{prefixo}.tipo_manutencao, {delta}) "
+        f"ON CONFLICT (ano, mes, tipo_manutencao) DO UPDATE SET total = total + ({delta}); "
+    )
+
+
+_LIMPAR_ZERADOS = "DELETE FROM manutencoes_resumo WHERE total <= 0; "
+
+GATILHOS_RESUMO = [
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_resumo_ai AFTER INSERT ON manutencoes BEGIN "
+    + _incrementar('new', 1) + "END",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_resumo_ad AFTER DELETE ON manutencoes " + SEM_ARQUIVAMENTO + "BEGIN "
+    + _incrementar('old', -1) + _LIMPAR_ZERADOS + "END",
+    "CREATE TRIGGER IF NOT EXISTS manutencoes_resumo_au AFTER UPDATE OF data_manutencao, tipo_manutencao "
+    "ON manutencoes BEGIN "
+    + _incrementar('old', -1) + _incrementar('new', 1) + _LIMPAR_ZERADOS + "END",
+]
+
+
+def criar_gatilhos_resumo(conn):
+    for ddl in GATILHOS_RESUMO:
+        conn.exec_driver_sql(ddl)
+
+
+def reconstruir_resumo(conn):
+    # Recalcula todos os contadores a partir da tabela manutencoes (e das
+    # manutenções arquivadas, se o arquivo estiver anexado)
+    conn.exec_driver_sql('DELETE FROM manutencoes_resumo')
+    conn.exec_driver_sql(
+        "INSERT INTO manutencoes_resumo (ano, mes, tipo_manutencao, total) "
+        "SELECT CAST(strftime('%Y', data_manutencao) AS INTEGER), "
+        "CAST(strftime('%m', data_manutencao) AS INTEGER), tipo_manutencao, COUNT(*) "
+        f"FROM {origem_completa(conn, 'manutencoes')} GROUP BY 1, 2, 3"
+    )
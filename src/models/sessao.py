@@ -0,0 +1,23 @@
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+# Nome do bind (SQLALCHEMY_BINDS) do engine somente leitura e rótulos de
+# cada engine nas métricas
+BANCO_LEITURA = 'leitura'
+BANCO_PRINCIPAL = 'principal'
+
+
+class SessaoRoteada(Session):
+    # Sessão que, marcada com info['leitura'] (requisições GET/HEAD, ver
+    # configurar_leitura), consulta o engine somente leitura. Se a sessão
+    # precisar gravar, o flush e tudo o que vier depois vão para o principal.
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(BANCO_LEITURA) and not self._flushing:
+            return self._db.engines[BANCO_LEITURA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(SessaoRoteada, 'before_flush')
+def _antes_do_flush(session, contexto, instancias):
+    session.info.pop(BANCO_LEITURA, None)
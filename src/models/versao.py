@@ -0,0 +1,37 @@
+from . import db
+
+class VersaoTabela(db.Model):
+    # Contador de alterações por tabela, incrementado por triggers no SQLite.
+    # Serve como validador barato para respostas em cache: muda sempre que
+    # qualquer linha da tabela é inserida, alterada ou excluída.
+    __tablename__ = 'versoes_tabelas'
+    
+    tabela = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    atualizado_em = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<VersaoTabela {self.tabela} v{self.versao}>'
+
+
+TABELAS_VERSIONADAS = ('computadores', 'funcionarios', 'problemas', 'pecas', 'manutencoes')
+
+
+def criar_gatilhos_versao(conn):
+    for tabela in TABELAS_VERSIONADAS:
+        for operacao, sufixo in (('INSERT', 'ai'), ('UPDATE', 'au'), ('DELETE', 'ad')):
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS {tabela}_versao_{sufixo} AFTER {operacao} ON {tabela} BEGIN "
+                "INSERT INTO versoes_tabelas (tabela, versao, atualizado_em) "
+                f"VALUES ('{tabela}', 1, strftime('%Y-%m-%d %H:%M:%f', 'now')) "
+                "ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1, atualizado_em = excluded.atualizado_em; "
+                "END"
+            )
+
+
+def versoes(tabelas):
+    # Retorna {tabela: (versao, atualizado_em)} com uma única consulta
+    linhas = db.session.query(VersaoTabela.tabela, VersaoTabela.versao, VersaoTabela.atualizado_em)\
+                       .filter(VersaoTabela.tabela.in_(tabelas)).all()
+    encontradas = {linha.tabela: (linha.versao, linha.atualizado_em) for linha in linhas}
+    return {tabela: encontradas.get(tabela, (0, None)) for tabela in tabelas}
@@ -0,0 +1,100 @@
+from flask import Blueprint, request, jsonify
+from src.models.alteracoes import OPERACOES, Alteracao
+from src.models.arquivo import arquivo_anexado, manutencoes_com_arquivo, pecas_com_arquivo
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
+from src.models.manutencao import Manutencao
+from src.models.peca import Peca
+from src.models.problema import Problema
+from src.models.versao import TABELAS_VERSIONADAS
+from src.utils.condicional import resposta_condicional
+from src.utils.paginacao import ler_limite, ParametroInvalido
+
+alteracoes_bp = Blueprint('alteracoes', __name__)
+
+MODELOS = {
+    'computadores': Computador,
+    'funcionarios': Funcionario,
+    'problemas': Problema,
+    'pecas': Peca,
+    'manutencoes': Manutencao,
+}
+
+
+def _ler_token():
+    valor = request.args.get('since', '0')
+    if not valor.isdigit():
+        raise ParametroInvalido('Parâmetro since deve ser um token retornado em next_token')
+    return int(valor)
+
+
+def _consulta(tabela):
+    # (entidade, consulta); manutenções e peças arquivadas continuam
+    # existindo, então vêm da união com o arquivo
+    if tabela == 'manutencoes':
+        # Carrega os ids das peças em uma consulta, como na listagem
+        if arquivo_anexado():
+            return manutencoes_com_arquivo(())
+        return Manutencao, Manutencao.com_relacionamentos(())
+    if tabela == 'pecas' and arquivo_anexado():
+        return pecas_com_arquivo()
+    return MODELOS[tabela], MODELOS[tabela].query
+
+
+def _carregar(registros):
+    # Um SELECT ... WHERE id IN (...) por tabela com registros alterados
+    ids_por_tabela = {}
+    for registro in registros:
+        if registro.operacao != 'D':
+            ids_por_tabela.setdefault(registro.tabela, []).append(registro.registro_id)
+    dados = {}
+    for tabela, ids in ids_por_tabela.items():
+        entidade, consulta = _consulta(tabela)
+        for obj in consulta.filter(entidade.id.in_(ids)):
+            dados[(tabela, obj.id)] = obj.to_dict()
+    return dados
+
+
+@alteracoes_bp.route('/changes', methods=['GET'])
+@resposta_condicional(*TABELAS_VERSIONADAS)
+def get_alteracoes():
+    # Alterações depois do token "since" (0 ou ausente: desde o início, o que
+    # equivale a uma carga completa), em ordem de token. Cada registro aparece
+    # uma vez, com o estado atual; exclusões vêm como marcadores sem dados.
+    # O cliente guarda next_token e repete enquanto has_more for verdadeiro.
+    try:
+        desde = _ler_token()
+        limite = ler_limite()
+        registros = Alteracao.query.filter(Alteracao.seq > desde)\
+                                   .order_by(Alteracao.seq).limit(limite + 1).all()
+        mais = len(registros) > limite
+        registros = registros[:limite]
+        dados = _carregar(registros)
+
+        alteracoes = []
+        for registro in registros:
+            alteracao = {
+                'token': str(registro.seq),
+                'entidade': registro.tabela,
+                'id': registro.registro_id,
+                'operacao': OPERACOES[registro.operacao],
+                'alterado_em': registro.alterado_em.isoformat()
+            }
+            if registro.operacao != 'D':
+                # Excluído depois da leitura do registro: vira marcador
+                alteracao['dados'] = dados.get((registro.tabela, registro.registro_id))
+                if alteracao['dados'] is None:
+                    alteracao['operacao'] = OPERACOES['D']
+                    del alteracao['dados']
+            alteracoes.append(alteracao)
+
+        return jsonify({
+            'changes': alteracoes,
+            # Sem novidades, o cliente continua com o mesmo token
+            'next_token': str(registros[-1].seq if registros else desde),
+            'has_more': mais
+        }), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,220 @@
+import sqlite3
+from datetime import datetime
+from itertools import accumulate
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func, select
+from src.models import db
+from src.models.custos import DIMENSOES, ResumoCustoPeca
+from src.utils.condicional import resposta_condicional
+from src.utils.paginacao import ParametroInvalido
+
+analise_bp = Blueprint('analise', __name__)
+
+# Funções de janela (SUM/LAG/RANK ... OVER) existem no SQLite desde a 3.25;
+# em versões anteriores as mesmas colunas são calculadas em Python sobre o
+# resultado agrupado
+JANELAS_SQL = sqlite3.sqlite_version_info >= (3, 25, 0)
+
+AGRUPAMENTOS = ('mes',) + DIMENSOES
+
+
+def _ler_mes(nome):
+    valor = request.args.get(nome)
+    if not valor:
+        return None
+    try:
+        data = datetime.strptime(valor[:7], '%Y-%m')
+    except ValueError:
+        raise ParametroInvalido(f'Parâmetro {nome} deve estar no formato YYYY-MM ou YYYY-MM-DD')
+    return data.year * 100 + data.month
+
+
+def _ler_parametros():
+    por = request.args.get('por', 'mes')
+    if por not in AGRUPAMENTOS:
+        raise ParametroInvalido(f"Parâmetro por deve ser um de: {', '.join(AGRUPAMENTOS)}")
+    limite = request.args.get('limite')
+    if limite is not None:
+        if not limite.isdigit() or int(limite) < 1:
+            raise ParametroInvalido('Parâmetro limite deve ser um inteiro maior que zero')
+        limite = int(limite)
+    return por, _ler_mes('data_inicio'), _ler_mes('data_fim'), request.args.get('mensal') == '1', limite
+
+
+def _agrupar(dimensao, inicio, fim, colunas):
+    # Soma o resumo pelas colunas pedidas dentro do período
+    resumo = ResumoCustoPeca
+    chave_mes = resumo.ano * 100 + resumo.mes
+    consulta = select(*colunas, func.sum(resumo.custo).label('custo'),
+                      func.sum(resumo.quantidade).label('quantidade'))\
+        .where(resumo.dimensao == dimensao).group_by(*colunas)
+    if inicio:
+        consulta = consulta.where(chave_mes >= inicio)
+    if fim:
+        consulta = consulta.where(chave_mes <= fim)
+    return consulta
+
+
+def _serie_sql(agrupado, particao=None):
+    # Total acumulado e variação em relação ao mês anterior (com gasto) por
+    # funções de janela, opcionalmente particionadas por valor
+    ordem = (agrupado.c.ano, agrupado.c.mes)
+    janela = {'partition_by': particao, 'order_by': ordem} if particao is not None else {'order_by': ordem}
+    anterior = func.lag(agrupado.c.custo).over(**janela)
+    return select(
+        agrupado,
+        func.sum(agrupado.c.custo).over(**janela).label('acumulado'),
+        anterior.label('anterior'),
+        (agrupado.c.custo - anterior).label('variacao'),
+        (100.0 * (agrupado.c.custo - anterior) / func.nullif(anterior, 0)).label('variacao_percentual'),
+    ).order_by(*(([particao] if particao is not None else []) + list(ordem)))
+
+
+def _serie_python(linhas, chave=None):
+    # Mesmas colunas de _serie_sql, calculadas por coluna sobre as linhas já
+    # agrupadas e ordenadas
+    resultado = []
+    inicio = 0
+    while inicio < len(linhas):
+        fim = inicio + 1
+        while fim < len(linhas) and (chave is None or linhas[fim][chave] == linhas[inicio][chave]):
+            fim += 1
+        custos = [linha['custo'] for linha in linhas[inicio:fim]]
+        anteriores = [None] + custos[:-1]
+        for linha, acumulado, anterior in zip(linhas[inicio:fim], accumulate(custos), anteriores):
+            variacao = linha['custo'] - anterior if anterior is not None else None
+            resultado.append({**linha, 'acumulado': acumulado, 'anterior': anterior, 'variacao': variacao,
+                              'variacao_percentual': 100.0 * variacao / anterior if anterior else None})
+        inicio = fim
+    return resultado
+
+
+def _ranking_sql(agrupado):
+    return select(
+        agrupado,
+        (agrupado.c.custo / func.sum(agrupado.c.custo).over()).label('participacao'),
+        func.rank().over(order_by=agrupado.c.custo.desc()).label('posicao'),
+    ).order_by('posicao', agrupado.c.valor)
+
+
+def _ranking_python(linhas):
+    linhas = sorted(linhas, key=lambda linha: (-linha['custo'], linha['valor']))
+    total = sum(linha['custo'] for linha in linhas)
+    resultado = []
+    for indice, linha in enumerate(linhas):
+        empatado = indice and linha['custo'] == linhas[indice - 1]['custo']
+        posicao = resultado[-1]['posicao'] if empatado else indice + 1
+        resultado.append({**linha, 'participacao': linha['custo'] / total if total else None, 'posicao': posicao})
+    return resultado
+
+
+def _executar(consulta):
+    return [dict(linha._mapping) for linha in db.session.execute(consulta)]
+
+
+def _valor(valor):
+    return valor or None
+
+
+def _dinheiro(valor):
+    return round(valor, 2) if valor is not None else None
+
+
+def _mes(linha):
+    return {
+        'mes': f"{linha['ano']:04d}-{linha['mes']:02d}",
+        'custo': _dinheiro(linha['custo']),
+        'quantidade': linha['quantidade'],
+        'acumulado': _dinheiro(linha['acumulado']),
+        'variacao': _dinheiro(linha['variacao']),
+        'variacao_percentual': round(linha['variacao_percentual'], 1) if linha['variacao_percentual'] is not None else None,
+    }
+
+
+def _por_mes(inicio, fim):
+    resumo = ResumoCustoPeca
+    # Toda peça tem fabricante, então essa dimensão cobre o total do mês
+    agrupado = _agrupar('fabricante', inicio, fim, (resumo.ano, resumo.mes))
+    if JANELAS_SQL:
+        linhas = _executar(_serie_sql(agrupado.subquery()))
+    else:
+        linhas = _serie_python(_executar(agrupado.order_by(resumo.ano, resumo.mes)))
+    return [_mes(linha) for linha in linhas]
+
+
+def _por_dimensao(dimensao, inicio, fim, limite):
+    agrupado = _agrupar(dimensao, inicio, fim, (ResumoCustoPeca.valor,))
+    if JANELAS_SQL:
+        # As janelas são calculadas antes do LIMIT, sobre todos os valores
+        linhas = _executar(_ranking_sql(agrupado.subquery()).limit(limite))
+    else:
+        linhas = _ranking_python(_executar(agrupado))
+    return [{
+        'valor': _valor(linha['valor']),
+        'posicao': linha['posicao'],
+        'custo': _dinheiro(linha['custo']),
+        'quantidade': linha['quantidade'],
+        'custo_medio': _dinheiro(linha['custo'] / linha['quantidade']) if linha['quantidade'] else None,
+        'participacao_percentual': round(100 * linha['participacao'], 2) if linha['participacao'] is not None else None,
+    } for linha in linhas[:limite]]
+
+
+def _por_dimensao_mensal(dimensao, inicio, fim, limite):
+    resumo = ResumoCustoPeca
+    agrupado = _agrupar(dimensao, inicio, fim, (resumo.valor, resumo.ano, resumo.mes))
+    if JANELAS_SQL:
+        subconsulta = agrupado.subquery()
+        linhas = _executar(_serie_sql(subconsulta, particao=subconsulta.c.valor))
+    else:
+        linhas = _serie_python(_executar(agrupado.order_by(resumo.valor, resumo.ano, resumo.mes)), chave='valor')
+
+    series = {}
+    for linha in linhas:
+        series.setdefault(linha['valor'], []).append(_mes(linha))
+    itens = [{
+        'valor': _valor(valor),
+        # O acumulado do último mês é o total do valor no período
+        'custo': serie[-1]['acumulado'],
+        'quantidade': sum(mes['quantidade'] for mes in serie),
+        'serie': serie,
+    } for valor, serie in series.items()]
+    itens.sort(key=lambda item: -item['custo'])
+    return itens[:limite] if limite else itens
+
+
+@analise_bp.route('/analise/custos', methods=['GET'])
+@resposta_condicional('pecas', 'manutencoes', 'funcionarios', 'computadores')
+def get_analise_custos():
+    # Gasto com peças por mês de aquisição (?por=mes, com acumulado e
+    # variação mensal) ou por fabricante, departamento ou modelo (ranking e
+    # participação; com ?mensal=1, a série mensal de cada valor). Filtros:
+    # data_inicio/data_fim (YYYY-MM) e limite. Calculado sobre
+    # pecas_custos_resumo, cujo tamanho não depende da quantidade de peças.
+    try:
+        por, inicio, fim, mensal, limite = _ler_parametros()
+        if por == 'mes':
+            itens = _por_mes(inicio, fim)
+            total = sum(item['custo'] for item in itens)
+            quantidade = sum(item['quantidade'] for item in itens)
+        else:
+            resumo = ResumoCustoPeca
+            geral = db.session.execute(_agrupar(por, inicio, fim, (resumo.dimensao,))).first()
+            total, quantidade = (_dinheiro(geral.custo), geral.quantidade) if geral else (0, 0)
+            if mensal:
+                itens = _por_dimensao_mensal(por, inicio, fim, limite)
+            else:
+                itens = _por_dimensao(por, inicio, fim, limite)
+
+        return jsonify({
+            'por': por,
+            'periodo': {
+                'inicio': f'{inicio // 100:04d}-{inicio % 100:02d}' if inicio else None,
+                'fim': f'{fim // 100:04d}-{fim % 100:02d}' if fim else None
+            },
+            'total': {'custo': round(total, 2), 'quantidade': quantidade},
+            'itens': itens
+        }), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
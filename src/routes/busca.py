@@ -0,0 +1,44 @@
+from flask import Blueprint, request, jsonify
+from src.models.busca import INDICES_BUSCA, buscar, fts_disponivel
+from src.utils.paginacao import ler_limite, ParametroInvalido
+from src.utils.condicional import resposta_condicional
+from src.utils.serializacao import Serializador
+
+busca_bp = Blueprint('busca', __name__)
+
+@busca_bp.route('/search', methods=['GET'])
+@resposta_condicional('computadores', 'funcionarios', 'problemas', 'pecas')
+def search():
+    try:
+        query = request.args.get('q', '')
+        
+        # Entidades a pesquisar (padrão: todas)
+        tipos = request.args.get('tipos')
+        tipos = [t.strip() for t in tipos.split(',') if t.strip()] if tipos else list(INDICES_BUSCA)
+        invalidos = [t for t in tipos if t not in INDICES_BUSCA]
+        if invalidos:
+            return jsonify({'error': f'Tipos inválidos: {", ".join(invalidos)}'}), 400
+        
+        limite = ler_limite()
+        resultado = {tipo: [] for tipo in tipos}
+        if not query:
+            return jsonify(resultado), 200
+        
+        if not fts_disponivel():
+            return jsonify({'error': 'Busca textual indisponível: SQLite sem suporte a FTS5'}), 503
+        
+        # Até "limit" resultados por tipo; X-Truncated-Types lista os tipos
+        # que tinham mais
+        truncados = []
+        for tipo in tipos:
+            serializar = Serializador(INDICES_BUSCA[tipo][0])
+            objetos, mais = buscar(tipo, query, limite)
+            resultado[tipo] = serializar.lista(objetos)
+            if mais:
+                truncados.append(tipo)
+        
+        return jsonify(resultado), 200, {'X-Result-Limit': str(limite), 'X-Truncated-Types': ','.join(truncados)}
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
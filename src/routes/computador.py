@@ -1,23 +1,44 @@
 from flask import Blueprint, request, jsonify
 from src.models import db
+from src.models.arquivo import possui_manutencoes_arquivadas
 from src.models.computador import Computador
+from src.models.busca import buscar, cabecalhos_limite, fts_disponivel
+from src.utils.importacao import (importar, ler_registros, ler_modo, texto_obrigatorio,
+                                   data_obrigatoria, ImportacaoInvalida)
+from src.utils.paginacao import paginacao_solicitada, paginar, ler_ids, buscar_ids, ler_limite, ParametroInvalido
+from src.utils.condicional import resposta_condicional
+from src.utils.serializacao import Serializador
 from datetime import datetime
 
 computador_bp = Blueprint('computador', __name__)
 
 @computador_bp.route('/computadores', methods=['GET'])
+@resposta_condicional('computadores')
 def get_computadores():
     try:
+        serializar = Serializador(Computador)
+        ids = ler_ids()
+        if ids is not None:
+            return jsonify(serializar.lista(buscar_ids(Computador.query, Computador.id, ids))), 200
+        if paginacao_solicitada():
+            return jsonify(paginar(Computador.query, [Computador.id], serializar=serializar)), 200
+        
         computadores = Computador.query.all()
-        return jsonify([computador.to_dict() for computador in computadores]), 200
+        return jsonify(serializar.lista(computadores)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @computador_bp.route('/computadores/<int:id>', methods=['GET'])
+@resposta_condicional('computadores')
 def get_computador(id):
     try:
+        serializar = Serializador(Computador)
         computador = Computador.query.get_or_404(id)
-        return jsonify(computador.to_dict()), 200
+        return jsonify(serializar(computador)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -91,7 +112,7 @@ def delete_computador(id):
         computador = Computador.query.get_or_404(id)
         
         # Verificar se há manutenções associadas
-        if computador.manutencoes:
+        if computador.manutencoes or possui_manutencoes_arquivadas('computador_id', id):
             return jsonify({'error': 'Não é possível excluir computador com manutenções associadas'}), 400
         
         db.session.delete(computador)
@@ -102,20 +123,53 @@ def delete_computador(id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _validar_importacao(registro):
+    return {
+        'marca': texto_obrigatorio(registro, 'marca'),
+        'modelo': texto_obrigatorio(registro, 'modelo'),
+        'numero_serie': texto_obrigatorio(registro, 'numero_serie'),
+        'data_aquisicao': data_obrigatoria(registro, 'data_aquisicao')
+    }
+
+@computador_bp.route('/computadores/importar', methods=['POST'])
+def importar_computadores():
+    try:
+        # CSV ou NDJSON; com ?modo=upsert números de série existentes são atualizados
+        modo = ler_modo()
+        relatorio = importar(Computador, ler_registros(), _validar_importacao, 'numero_serie', modo)
+        return jsonify(relatorio), 200
+    except ImportacaoInvalida as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @computador_bp.route('/computadores/search', methods=['GET'])
+@resposta_condicional('computadores')
 def search_computadores():
     try:
+        serializar = Serializador(Computador)
         query = request.args.get('q', '')
         if not query:
             return jsonify([]), 200
         
-        computadores = Computador.query.filter(
-            (Computador.marca.contains(query)) |
-            (Computador.modelo.contains(query)) |
-            (Computador.numero_serie.contains(query))
-        ).all()
-        
-        return jsonify([computador.to_dict() for computador in computadores]), 200
+        cabecalhos = {}
+        if fts_disponivel():
+            # Índice FTS5: busca por prefixo ordenada por relevância, até
+            # "limit" resultados (X-Result-Limit e X-Has-More)
+            limite = ler_limite()
+            computadores, mais = buscar('computadores', query, limite)
+            cabecalhos = cabecalhos_limite(limite, mais)
+        else:
+            computadores = Computador.query.filter(
+                (Computador.marca.contains(query)) |
+                (Computador.modelo.contains(query)) |
+                (Computador.numero_serie.contains(query))
+            ).all()
+        
+        return jsonify(serializar.lista(computadores)), 200, cabecalhos
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
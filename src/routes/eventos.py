@@ -0,0 +1,68 @@
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from src.utils.eventos import LOTE, RESSINCRONIZAR, alteracoes_desde, eventos, formatar, token_atual
+
+eventos_bp = Blueprint('eventos', __name__)
+
+
+def _stream(assinatura, inicio):
+    try:
+        # Reconexão do navegador em milissegundos
+        yield 'retry: 3000\n\n'
+        yield formatar(inicio, 'ready', {'token': str(inicio)})
+        enviado = inicio
+
+        # Alterações entre o token do cliente e a conexão
+        perdidas = alteracoes_desde(inicio)
+        if len(perdidas) >= LOTE:
+            # Atraso demais para o stream: como no transbordo da fila, o
+            # cliente recarrega ou usa /api/changes e reconecta
+            yield formatar(None, RESSINCRONIZAR, {})
+            return
+        for token, tipo, dados in perdidas:
+            yield formatar(token, tipo, dados)
+            enviado = token
+
+        while True:
+            item = assinatura.proximo(eventos.heartbeat)
+            if item is None:
+                # Comentário SSE: mantém proxies e a conexão abertos
+                yield ': ping\n\n'
+                continue
+            token, tipo, dados = item
+            if token is not None and token <= enviado:
+                continue
+            yield formatar(token, tipo, dados)
+            if tipo == RESSINCRONIZAR:
+                return
+            enviado = token
+    finally:
+        eventos.cancelar(assinatura)
+
+
+@eventos_bp.route('/eventos', methods=['GET'])
+def get_eventos():
+    # Server-Sent Events com as alterações (entidade, id, operação) de todas
+    # as tabelas. O id de cada evento é o mesmo token de /api/changes; ao
+    # reconectar, o navegador envia Last-Event-ID e recebe o que perdeu. O
+    # evento "resync" indica que o cliente deve recarregar ou usar /api/changes.
+    if not eventos.ativos:
+        return jsonify({'error': 'Eventos desativados (EVENTOS_ATIVOS)'}), 404
+    ultimo = request.headers.get('Last-Event-ID') or request.args.get('since')
+    if ultimo is not None and not ultimo.isdigit():
+        return jsonify({'error': 'Last-Event-ID deve ser um token de evento'}), 400
+
+    try:
+        inicio = int(ultimo) if ultimo is not None else token_atual()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    assinatura = eventos.assinar()
+    if assinatura is None:
+        resposta = jsonify({'error': 'Limite de clientes de eventos atingido'})
+        resposta.headers['Retry-After'] = '30'
+        return resposta, 503
+
+    resposta = Response(stream_with_context(_stream(assinatura, inicio)), mimetype='text/event-stream')
+    resposta.headers['Cache-Control'] = 'no-cache'
+    # Desliga o buffer de proxies como o nginx
+    resposta.headers['X-Accel-Buffering'] = 'no'
+    return resposta
@@ -1,23 +1,49 @@
 from flask import Blueprint, request, jsonify
 from src.models import db
+from src.models.arquivo import possui_manutencoes_arquivadas
 from src.models.funcionario import Funcionario
+from src.models.busca import buscar, cabecalhos_limite, fts_disponivel
+from src.utils.paginacao import paginacao_solicitada, paginar, ler_ids, buscar_ids, ler_limite, ParametroInvalido
+from src.utils.condicional import resposta_condicional
+from src.utils.serializacao import Serializador
+from src.utils.cache import cache_referencia
 from datetime import datetime
 
 funcionario_bp = Blueprint('funcionario', __name__)
 
+def funcionarios_referencia():
+    # Tabela de referência pequena: servida do cache em memória
+    return cache_referencia.obter(
+        'funcionarios', ('funcionarios',),
+        lambda: [funcionario.to_dict() for funcionario in Funcionario.query.all()]
+    )
+
 @funcionario_bp.route('/funcionarios', methods=['GET'])
+@resposta_condicional('funcionarios')
 def get_funcionarios():
     try:
-        funcionarios = Funcionario.query.all()
-        return jsonify([funcionario.to_dict() for funcionario in funcionarios]), 200
+        serializar = Serializador(Funcionario)
+        ids = ler_ids()
+        if ids is not None:
+            return jsonify(serializar.lista(buscar_ids(Funcionario.query, Funcionario.id, ids))), 200
+        if paginacao_solicitada():
+            return jsonify(paginar(Funcionario.query, [Funcionario.id], serializar=serializar)), 200
+        
+        return jsonify(serializar.filtrar(funcionarios_referencia())), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @funcionario_bp.route('/funcionarios/<int:id>', methods=['GET'])
+@resposta_condicional('funcionarios')
 def get_funcionario(id):
     try:
+        serializar = Serializador(Funcionario)
         funcionario = Funcionario.query.get_or_404(id)
-        return jsonify(funcionario.to_dict()), 200
+        return jsonify(serializar(funcionario)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -75,7 +101,7 @@ def delete_funcionario(id):
         funcionario = Funcionario.query.get_or_404(id)
         
         # Verificar se há manutenções associadas
-        if funcionario.manutencoes:
+        if funcionario.manutencoes or possui_manutencoes_arquivadas('funcionario_id', id):
             return jsonify({'error': 'Não é possível excluir funcionário com manutenções associadas'}), 400
         
         db.session.delete(funcionario)
@@ -87,19 +113,31 @@ def delete_funcionario(id):
         return jsonify({'error': str(e)}), 500
 
 @funcionario_bp.route('/funcionarios/search', methods=['GET'])
+@resposta_condicional('funcionarios')
 def search_funcionarios():
     try:
+        serializar = Serializador(Funcionario)
         query = request.args.get('q', '')
         if not query:
             return jsonify([]), 200
         
-        funcionarios = Funcionario.query.filter(
-            (Funcionario.nome.contains(query)) |
-            (Funcionario.cargo.contains(query)) |
-            (Funcionario.departamento.contains(query))
-        ).all()
+        cabecalhos = {}
+        if fts_disponivel():
+            # Índice FTS5: busca por prefixo ordenada por relevância, até
+            # "limit" resultados (X-Result-Limit e X-Has-More)
+            limite = ler_limite()
+            funcionarios, mais = buscar('funcionarios', query, limite)
+            cabecalhos = cabecalhos_limite(limite, mais)
+        else:
+            funcionarios = Funcionario.query.filter(
+                (Funcionario.nome.contains(query)) |
+                (Funcionario.cargo.contains(query)) |
+                (Funcionario.departamento.contains(query))
+            ).all()
         
-        return jsonify([funcionario.to_dict() for funcionario in funcionarios]), 200
+        return jsonify(serializar.lista(funcionarios)), 200, cabecalhos
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
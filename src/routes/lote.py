@@ -0,0 +1,290 @@
+import hashlib
+import math
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, request, jsonify
+from sqlalchemy.exc import IntegrityError, StatementError
+from src.models import db
+from src.models.arquivo import possui_manutencoes_arquivadas
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
+from src.models.idempotencia import ChaveIdempotencia
+from src.models.manutencao import Manutencao
+from src.models.peca import Peca
+from src.models.problema import Problema
+from src.routes.manutencao import associar_pecas
+
+lote_bp = Blueprint('lote', __name__)
+
+MAXIMO_OPERACOES = 500
+OPERACOES = ('create', 'update', 'delete')
+
+
+class OperacaoInvalida(ValueError):
+    def __init__(self, indice, mensagem, status=400, **detalhes):
+        super().__init__(mensagem)
+        self.indice = indice
+        self.status = status
+        self.detalhes = detalhes
+
+
+def _texto(valor):
+    if not isinstance(valor, str):
+        raise TypeError(valor)
+    return valor
+
+
+def _inteiro(valor):
+    if not isinstance(valor, int) or isinstance(valor, bool):
+        raise TypeError(valor)
+    return valor
+
+
+def _numero(valor):
+    if not isinstance(valor, (int, float)) or isinstance(valor, bool) or not math.isfinite(valor):
+        raise TypeError(valor)
+    return float(valor)
+
+
+def _data(valor):
+    return datetime.strptime(valor, '%Y-%m-%d').date()
+
+
+def _data_hora(valor):
+    return datetime.strptime(valor, '%Y-%m-%dT%H:%M')
+
+
+# Por entidade: modelo, campos aceitos com a conversão de cada um (que também
+# recusa listas, objetos e tipos errados) e campos obrigatórios, os mesmos das
+# rotas; um campo obrigatório não aceita null nem na atualização
+ENTIDADES = {
+    'computadores': (Computador, {'marca': _texto, 'modelo': _texto, 'numero_serie': _texto, 'data_aquisicao': _data},
+                     ('marca', 'modelo', 'numero_serie', 'data_aquisicao')),
+    'funcionarios': (Funcionario, {'nome': _texto, 'cargo': _texto, 'departamento': _texto},
+                     ('nome', 'cargo', 'departamento')),
+    'problemas': (Problema, {'descricao': _texto, 'categoria': _texto}, ('descricao', 'categoria')),
+    'pecas': (Peca, {'nome_peca': _texto, 'numero_serie_peca': _texto, 'fabricante': _texto,
+                     'data_aquisicao_peca': _data, 'custo': _numero, 'manutencao_id': _inteiro},
+              ('nome_peca', 'fabricante', 'data_aquisicao_peca', 'custo')),
+    'manutencoes': (Manutencao, {'computador_id': _inteiro, 'funcionario_id': _inteiro, 'problema_id': _inteiro,
+                                 'data_manutencao': _data_hora, 'tipo_manutencao': _texto,
+                                 'descricao_problema': _texto, 'solucao_aplicada': _texto},
+                    ('computador_id', 'funcionario_id', 'problema_id', 'data_manutencao',
+                     'tipo_manutencao', 'descricao_problema', 'solucao_aplicada')),
+}
+
+# Campos que referenciam outra entidade: o SQLite não verifica as chaves
+# estrangeiras, então o lote confere se o registro existe
+REFERENCIAS = {'computador_id': Computador, 'funcionario_id': Funcionario,
+               'problema_id': Problema, 'manutencao_id': Manutencao}
+
+# Coluna de manutencoes que referencia cada entidade (restrição de exclusão)
+CHAVES_MANUTENCAO = {'computadores': 'computador_id', 'funcionarios': 'funcionario_id', 'problemas': 'problema_id'}
+
+
+def _resolver(valor, refs, indice):
+    # {"$ref": "nome"} vira o id criado pela operação anterior com esse "ref"
+    if isinstance(valor, dict) and set(valor) == {'$ref'}:
+        if valor['$ref'] not in refs:
+            raise OperacaoInvalida(indice, f"Referência desconhecida: {valor['$ref']}")
+        return refs[valor['$ref']]
+    if isinstance(valor, list):
+        return [_resolver(item, refs, indice) for item in valor]
+    return valor
+
+
+def _converter(campos, obrigatorios, dados, indice):
+    valores = {}
+    for campo, converter in campos.items():
+        if campo not in dados:
+            continue
+        if dados[campo] is None:
+            if campo in obrigatorios:
+                raise OperacaoInvalida(indice, f'{campo} não pode ser nulo')
+            valores[campo] = None
+            continue
+        try:
+            valores[campo] = converter(dados[campo])
+        except (TypeError, ValueError):
+            raise OperacaoInvalida(indice, f'Valor inválido em {campo}')
+    for campo, valor in valores.items():
+        if campo in REFERENCIAS and valor is not None and db.session.get(REFERENCIAS[campo], valor) is None:
+            raise OperacaoInvalida(indice, f'{campo} {valor} não encontrado')
+    return valores
+
+
+def _excluir(entidade, objeto, indice):
+    # Mesmas restrições das rotas DELETE de cada entidade
+    if entidade == 'manutencoes':
+        associar_pecas(objeto.id, [], substituir=True)
+    elif entidade in CHAVES_MANUTENCAO and (objeto.manutencoes or possui_manutencoes_arquivadas(
+            CHAVES_MANUTENCAO[entidade], objeto.id)):
+        raise OperacaoInvalida(indice, f'Não é possível excluir {entidade} {objeto.id}: há manutenções associadas')
+    db.session.delete(objeto)
+
+
+def _aplicar(indice, operacao, refs):
+    if not isinstance(operacao, dict):
+        raise OperacaoInvalida(indice, 'Operação deve ser um objeto')
+    tipo = operacao.get('operacao')
+    entidade = operacao.get('entidade')
+    if tipo not in OPERACOES:
+        raise OperacaoInvalida(indice, f"operacao deve ser uma de: {', '.join(OPERACOES)}")
+    if entidade not in ENTIDADES:
+        raise OperacaoInvalida(indice, f"entidade deve ser uma de: {', '.join(ENTIDADES)}")
+    modelo, campos, obrigatorios = ENTIDADES[entidade]
+    dados = operacao.get('dados') or {}
+    if not isinstance(dados, dict):
+        raise OperacaoInvalida(indice, 'dados deve ser um objeto')
+    dados = {campo: _resolver(valor, refs, indice) for campo, valor in dados.items()}
+
+    if tipo == 'create':
+        faltando = [campo for campo in obrigatorios if campo not in dados]
+        if faltando:
+            raise OperacaoInvalida(indice, f'Dados obrigatórios: {", ".join(faltando)}')
+        objeto = modelo()
+    else:
+        id = _resolver(operacao.get('id'), refs, indice)
+        if not isinstance(id, int) or isinstance(id, bool):
+            raise OperacaoInvalida(indice, 'id deve ser um inteiro ou {"$ref": ...}')
+        objeto = db.session.get(modelo, id)
+        if objeto is None:
+            raise OperacaoInvalida(indice, f'{entidade} {id} não encontrado', status=404)
+        if tipo == 'delete':
+            _excluir(entidade, objeto, indice)
+            db.session.flush()
+            return objeto
+
+    valores = _converter(campos, obrigatorios, dados, indice)
+    if valores.get('manutencao_id') is not None and objeto.manutencao_id not in (None, valores['manutencao_id']):
+        # Mesma regra de associar_pecas: a peça de outra manutenção não é movida
+        raise OperacaoInvalida(indice, f'Peça {objeto.id} já pertence à manutenção {objeto.manutencao_id}',
+                               status=409)
+    if 'numero_serie' in valores:
+        # Também enxerga os computadores criados antes no mesmo lote (autoflush)
+        existente = Computador.query.filter_by(numero_serie=valores['numero_serie']).first()
+        if existente and existente is not objeto:
+            raise OperacaoInvalida(indice, 'Número de série já existe')
+    for campo, valor in valores.items():
+        setattr(objeto, campo, valor)
+    if tipo == 'create':
+        db.session.add(objeto)
+    else:
+        objeto.updated_at = datetime.utcnow()
+    db.session.flush()
+
+    if entidade == 'manutencoes' and 'pecas_ids' in dados:
+        if not isinstance(dados['pecas_ids'], list):
+            raise OperacaoInvalida(indice, 'pecas_ids deve ser uma lista')
+        try:
+            nao_associadas = associar_pecas(objeto.id, dados['pecas_ids'], substituir=tipo == 'update')
+        except (TypeError, ValueError):
+            raise OperacaoInvalida(indice, 'pecas_ids deve conter ids de peças')
+        # Diferente da rota, que só informa: num lote, a peça que não pôde ser
+        # associada ficaria órfã, então o lote inteiro é desfeito
+        if nao_associadas['inexistentes'] or nao_associadas['em_outra_manutencao']:
+            raise OperacaoInvalida(indice, 'Peças não associadas', status=409,
+                                   pecas_nao_associadas=nao_associadas)
+
+    if operacao.get('ref') is not None:
+        if operacao['ref'] in refs:
+            raise OperacaoInvalida(indice, f"ref repetido: {operacao['ref']}")
+        refs[operacao['ref']] = objeto.id
+    return objeto
+
+
+def _ler_operacoes():
+    dados = request.get_json(silent=True)
+    operacoes = dados.get('operacoes') if isinstance(dados, dict) else None
+    if not isinstance(operacoes, list) or not operacoes:
+        raise OperacaoInvalida(None, 'Corpo deve ser {"operacoes": [...]} com ao menos uma operação')
+    if len(operacoes) > MAXIMO_OPERACOES:
+        raise OperacaoInvalida(None, f'No máximo {MAXIMO_OPERACOES} operações por lote')
+    return operacoes
+
+
+def _chave_anterior(chave):
+    validade = timedelta(hours=current_app.config.get('IDEMPOTENCIA_VALIDADE_HORAS', 24))
+    return ChaveIdempotencia.query.filter(ChaveIdempotencia.chave == chave,
+                                          ChaveIdempotencia.criado_em >= datetime.utcnow() - validade).first()
+
+
+def _repetir(anterior, hash_pedido):
+    if anterior.hash_pedido != hash_pedido:
+        return jsonify({'error': 'Idempotency-Key já usada com outro conteúdo'}), 409
+    resposta = current_app.response_class(anterior.resposta, status=anterior.status, mimetype='application/json')
+    resposta.headers['Idempotency-Replayed'] = 'true'
+    return resposta
+
+
+def _guardar(chave, hash_pedido, status, resposta):
+    # Descarta as chaves vencidas (pelo índice de criado_em) e grava a nova
+    # na transação do lote
+    validade = timedelta(hours=current_app.config.get('IDEMPOTENCIA_VALIDADE_HORAS', 24))
+    ChaveIdempotencia.query.filter(ChaveIdempotencia.criado_em < datetime.utcnow() - validade)\
+                           .delete(synchronize_session=False)
+    db.session.add(ChaveIdempotencia(chave=chave, hash_pedido=hash_pedido, status=status,
+                                     resposta=current_app.json.dumps(resposta)))
+
+
+@lote_bp.route('/batch', methods=['POST'])
+def post_lote():
+    # Aplica uma lista ordenada de operações create/update/delete sobre
+    # computadores, funcionarios, problemas, pecas e manutencoes em uma única
+    # transação (um commit): se uma falhar, nenhuma é gravada e a resposta
+    # indica o índice da operação. Uma operação create com "ref" pode ser
+    # referenciada pelas seguintes com {"$ref": "nome"} no id ou nos dados,
+    # por exemplo em manutencoes.pecas_ids. Com o cabeçalho Idempotency-Key,
+    # a repetição do mesmo lote devolve a resposta original sem reaplicá-lo.
+    chave = request.headers.get('Idempotency-Key')
+    if chave is not None and not 0 < len(chave) <= 255:
+        return jsonify({'error': 'Idempotency-Key deve ter de 1 a 255 caracteres'}), 400
+    hash_pedido = hashlib.sha256(request.get_data()).hexdigest()
+
+    try:
+        if chave:
+            anterior = _chave_anterior(chave)
+            if anterior:
+                return _repetir(anterior, hash_pedido)
+
+        refs = {}
+        aplicadas = []
+        for indice, operacao in enumerate(_ler_operacoes()):
+            try:
+                objeto = _aplicar(indice, operacao, refs)
+            except StatementError as e:
+                # Restrição do banco violada pela operação (NOT NULL, UNIQUE, tipo)
+                raise OperacaoInvalida(indice, f'Operação rejeitada pelo banco: {getattr(e, "orig", None) or e}')
+            aplicadas.append((indice, operacao, objeto.id, objeto))
+
+        # Recarrega os objetos: associar_pecas altera as peças direto no banco
+        db.session.expire_all()
+        resultados = []
+        for indice, operacao, id, objeto in aplicadas:
+            resultado = {'indice': indice, 'operacao': operacao['operacao'], 'entidade': operacao['entidade'], 'id': id}
+            if operacao.get('ref') is not None:
+                resultado['ref'] = operacao['ref']
+            if operacao['operacao'] != 'delete':
+                resultado['dados'] = objeto.to_dict()
+            resultados.append(resultado)
+        resposta = {'resultados': resultados, 'refs': refs}
+
+        if chave:
+            _guardar(chave, hash_pedido, 200, resposta)
+        db.session.commit()
+        return jsonify(resposta), 200
+    except OperacaoInvalida as e:
+        db.session.rollback()
+        erro = {'error': str(e), **e.detalhes}
+        if e.indice is not None:
+            erro['indice'] = e.indice
+        return jsonify(erro), e.status
+    except IntegrityError as e:
+        db.session.rollback()
+        # Outra requisição com a mesma chave terminou primeiro
+        anterior = _chave_anterior(chave) if chave else None
+        if anterior:
+            return _repetir(anterior, hash_pedido)
+        return jsonify({'error': str(e)}), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -1,53 +1,224 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from src.models import db
+from src.models.arquivo import arquivo_alcancado, manutencoes_com_arquivo, partes_manutencoes
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
 from src.models.manutencao import Manutencao
 from src.models.peca import Peca
+from src.models.problema import Problema
+from src.models.resumo import ResumoManutencao
+from src.utils.paginacao import paginacao_solicitada, paginar, ler_ids, buscar_ids, ler_data, ParametroInvalido
+from src.utils.condicional import resposta_condicional
+from src.utils.serializacao import Serializador
+from src.utils.cache import cache_referencia
 from datetime import datetime
+from sqlalchemy import select, union_all, update
 
 manutencao_bp = Blueprint('manutencao', __name__)
 
+def _ids_pecas(pecas_ids):
+    # Aceita inteiros ou textos numéricos; qualquer outra coisa é erro do cliente
+    if pecas_ids is None:
+        return set()
+    if not isinstance(pecas_ids, list):
+        raise ParametroInvalido('pecas_ids deve ser uma lista de ids de peças')
+    ids = set()
+    for peca_id in pecas_ids:
+        if isinstance(peca_id, bool) or not isinstance(peca_id, (int, str)) \
+                or not str(peca_id).strip().isdigit():
+            raise ParametroInvalido(f'Id de peça inválido em pecas_ids: {peca_id!r}')
+        ids.add(int(peca_id))
+    return ids
+
+def associar_pecas(manutencao_id, pecas_ids, substituir=False):
+    # Associa as peças com um único UPDATE ... WHERE id IN (...), em vez de
+    # carregar e alterar uma peça por vez dentro da transação de escrita.
+    # Retorna os ids que não existem ou já pertencem a outra manutenção.
+    ids = _ids_pecas(pecas_ids)
+    situacao = dict(db.session.query(Peca.id, Peca.manutencao_id).filter(Peca.id.in_(ids))) if ids else {}
+    
+    if substituir:
+        # Desassocia as peças que saíram da lista
+        db.session.execute(
+            update(Peca)
+            .where(Peca.manutencao_id == manutencao_id, Peca.id.notin_(ids))
+            .values(manutencao_id=None)
+            .execution_options(synchronize_session=False)
+        )
+    
+    livres = [peca_id for peca_id, atual in situacao.items() if atual is None]
+    if livres:
+        db.session.execute(
+            update(Peca)
+            .where(Peca.id.in_(livres), Peca.manutencao_id.is_(None))
+            .values(manutencao_id=manutencao_id)
+            .execution_options(synchronize_session=False)
+        )
+    
+    return {
+        'inexistentes': sorted(ids - situacao.keys()),
+        'em_outra_manutencao': sorted(peca_id for peca_id, atual in situacao.items()
+                                      if atual is not None and atual != manutencao_id)
+    }
+
+def _filtrar_manutencoes(query, entidade=Manutencao):
+    # Parâmetros de filtro
+    computador_id = request.args.get('computador_id')
+    funcionario_id = request.args.get('funcionario_id')
+    tipo = request.args.get('tipo')
+    data_inicio = ler_data('data_inicio')
+    data_fim = ler_data('data_fim')
+    
+    # Aplicar filtros
+    if computador_id:
+        query = query.filter_by(computador_id=computador_id)
+    if funcionario_id:
+        query = query.filter_by(funcionario_id=funcionario_id)
+    if tipo:
+        query = query.filter_by(tipo_manutencao=tipo)
+    if data_inicio:
+        query = query.filter(entidade.data_manutencao >= data_inicio)
+    if data_fim:
+        query = query.filter(entidade.data_manutencao <= data_fim)
+    return query
+
+def _consulta_manutencoes(expandir, data_inicio=None):
+    # (entidade, consulta): a tabela quente ou, quando o período alcança as
+    # manutenções arquivadas, a união com o arquivo
+    if arquivo_alcancado(data_inicio):
+        return manutencoes_com_arquivo(expandir)
+    return Manutencao, Manutencao.com_relacionamentos(expandir)
+
 @manutencao_bp.route('/manutencoes', methods=['GET'])
+@resposta_condicional('manutencoes', 'computadores', 'funcionarios', 'problemas', 'pecas')
 def get_manutencoes():
     try:
-        # Parâmetros de filtro
-        computador_id = request.args.get('computador_id')
-        funcionario_id = request.args.get('funcionario_id')
-        tipo = request.args.get('tipo')
-        data_inicio = request.args.get('data_inicio')
-        data_fim = request.args.get('data_fim')
-        
-        query = Manutencao.query
-        
-        # Aplicar filtros
-        if computador_id:
-            query = query.filter_by(computador_id=computador_id)
-        if funcionario_id:
-            query = query.filter_by(funcionario_id=funcionario_id)
-        if tipo:
-            query = query.filter_by(tipo_manutencao=tipo)
-        if data_inicio:
-            data_inicio_obj = datetime.strptime(data_inicio, '%Y-%m-%d')
-            query = query.filter(Manutencao.data_manutencao >= data_inicio_obj)
-        if data_fim:
-            data_fim_obj = datetime.strptime(data_fim, '%Y-%m-%d')
-            query = query.filter(Manutencao.data_manutencao <= data_fim_obj)
-        
-        manutencoes = query.order_by(Manutencao.data_manutencao.desc()).all()
-        return jsonify([manutencao.to_dict() for manutencao in manutencoes]), 200
+        serializar = Serializador(Manutencao)
+        entidade, query = _consulta_manutencoes(serializar.expandir, ler_data('data_inicio'))
+        query = _filtrar_manutencoes(query, entidade)
+        
+        ids = ler_ids()
+        if ids is not None:
+            return jsonify(serializar.lista(buscar_ids(query, entidade.id, ids))), 200
+        if paginacao_solicitada():
+            colunas = [entidade.data_manutencao, entidade.id]
+            return jsonify(paginar(query, colunas, descendente=True, serializar=serializar)), 200
+        
+        manutencoes = query.order_by(entidade.data_manutencao.desc()).all()
+        return jsonify(serializar.lista(manutencoes)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Linhas lidas do banco por vez e linhas enviadas por bloco na exportação
+LOTE_EXPORTACAO = 1000
+
+def _achatar(dados, prefixo=''):
+    # Converte o dicionário serializado em colunas para o CSV: objetos
+    # expandidos viram colunas com prefixo e listas de ids viram "1;2;3"
+    linha = {}
+    for chave, valor in dados.items():
+        nome = f'{prefixo}{chave}'
+        if isinstance(valor, dict):
+            linha.update(_achatar(valor, f'{nome}_'))
+        elif isinstance(valor, list):
+            linha[nome] = ';'.join(str(item['id'] if isinstance(item, dict) else item) for item in valor)
+        else:
+            linha[nome] = valor
+    return linha
+
+def _percorrer(query):
+    # O gerador roda depois do fim da requisição: a sessão em que a consulta
+    # foi criada já saiu do escopo e precisa ser fechada aqui, senão a conexão
+    # não volta para o pool
+    try:
+        yield from query
+    finally:
+        query.session.close()
+
+def _gerar_ndjson(linhas, serializar):
+    dumps = current_app.json.dumps
+    bloco = []
+    for manutencao in linhas:
+        bloco.append(dumps(serializar(manutencao)))
+        if len(bloco) >= LOTE_EXPORTACAO:
+            yield '\n'.join(bloco) + '\n'
+            bloco = []
+    if bloco:
+        yield '\n'.join(bloco) + '\n'
+
+def _gerar_csv(linhas, serializar):
+    buffer = io.StringIO()
+    escritor = None
+    contador = 0
+    for manutencao in linhas:
+        linha = _achatar(serializar(manutencao))
+        if escritor is None:
+            escritor = csv.DictWriter(buffer, fieldnames=list(linha), restval='', extrasaction='ignore')
+            escritor.writeheader()
+        escritor.writerow(linha)
+        contador += 1
+        if contador % LOTE_EXPORTACAO == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@manutencao_bp.route('/manutencoes/exportar', methods=['GET'])
+@resposta_condicional('manutencoes', 'computadores', 'funcionarios', 'problemas', 'pecas')
+def exportar_manutencoes():
+    try:
+        # Mesmos filtros, fields, expand e arquivo de GET /manutencoes, mas as linhas
+        # são lidas em blocos (yield_per) e enviadas conforme são geradas,
+        # sem montar o resultado inteiro na memória
+        formato = request.args.get('formato', 'ndjson')
+        if formato not in ('ndjson', 'csv'):
+            raise ParametroInvalido('Formato inválido: use ndjson ou csv')
+        
+        serializar = Serializador(Manutencao)
+        entidade, query = _consulta_manutencoes(serializar.expandir, ler_data('data_inicio'))
+        query = _filtrar_manutencoes(query, entidade)
+        linhas = _percorrer(query.order_by(entidade.data_manutencao.desc(), entidade.id.desc())
+                                 .yield_per(LOTE_EXPORTACAO))
+        
+        if formato == 'csv':
+            gerador, mimetype = _gerar_csv(linhas, serializar), 'text/csv'
+        else:
+            gerador, mimetype = _gerar_ndjson(linhas, serializar), 'application/x-ndjson'
+        
+        resposta = Response(stream_with_context(gerador), mimetype=mimetype)
+        resposta.headers['Content-Disposition'] = f'attachment; filename=manutencoes.{formato}'
+        return resposta
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @manutencao_bp.route('/manutencoes/<int:id>', methods=['GET'])
+@resposta_condicional('manutencoes', 'computadores', 'funcionarios', 'problemas', 'pecas')
 def get_manutencao(id):
     try:
-        manutencao = Manutencao.query.get_or_404(id)
-        return jsonify(manutencao.to_dict()), 200
+        serializar = Serializador(Manutencao)
+        manutencao = Manutencao.com_relacionamentos(serializar.expandir).filter_by(id=id).first()
+        if manutencao is None and arquivo_alcancado():
+            entidade, query = manutencoes_com_arquivo(serializar.expandir)
+            manutencao = query.filter(entidade.id == id).first()
+        if manutencao is None:
+            return jsonify({'error': 'Manutenção não encontrada'}), 404
+        return jsonify(serializar(manutencao)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @manutencao_bp.route('/manutencoes', methods=['POST'])
 def create_manutencao():
     try:
+        serializar = Serializador(Manutencao)
         data = request.get_json()
         
         # Validação básica
@@ -73,15 +244,19 @@ def create_manutencao():
         db.session.flush()  # Para obter o ID da manutenção
         
         # Associar peças se fornecidas
-        if 'pecas_ids' in data and data['pecas_ids']:
-            for peca_id in data['pecas_ids']:
-                peca = Peca.query.get(peca_id)
-                if peca:
-                    peca.manutencao_id = manutencao.id
+        pecas_nao_associadas = None
+        if 'pecas_ids' in data:
+            pecas_nao_associadas = associar_pecas(manutencao.id, data['pecas_ids'])
         
         db.session.commit()
         
-        return jsonify(manutencao.to_dict()), 201
+        resposta = serializar(manutencao)
+        if pecas_nao_associadas is not None:
+            resposta['pecas_nao_associadas'] = pecas_nao_associadas
+        return jsonify(resposta), 201
+    except ParametroInvalido as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -89,7 +264,12 @@ def create_manutencao():
 @manutencao_bp.route('/manutencoes/<int:id>', methods=['PUT'])
 def update_manutencao(id):
     try:
-        manutencao = Manutencao.query.get_or_404(id)
+        serializar = Serializador(Manutencao)
+        # Manutenções arquivadas são somente leitura: só as da tabela quente
+        # podem ser alteradas ou excluídas
+        manutencao = db.session.get(Manutencao, id)
+        if manutencao is None:
+            return jsonify({'error': 'Manutenção não encontrada'}), 404
         data = request.get_json()
         
         if not data:
@@ -111,23 +291,21 @@ def update_manutencao(id):
         if 'solucao_aplicada' in data:
             manutencao.solucao_aplicada = data['solucao_aplicada']
         
-        # Atualizar peças associadas
+        # Atualizar peças associadas (a lista enviada substitui a atual)
+        pecas_nao_associadas = None
         if 'pecas_ids' in data:
-            # Remover associações antigas
-            for peca in manutencao.pecas:
-                peca.manutencao_id = None
-            
-            # Adicionar novas associações
-            if data['pecas_ids']:
-                for peca_id in data['pecas_ids']:
-                    peca = Peca.query.get(peca_id)
-                    if peca:
-                        peca.manutencao_id = manutencao.id
+            pecas_nao_associadas = associar_pecas(manutencao.id, data['pecas_ids'], substituir=True)
         
         manutencao.updated_at = datetime.utcnow()
         db.session.commit()
         
-        return jsonify(manutencao.to_dict()), 200
+        resposta = serializar(manutencao)
+        if pecas_nao_associadas is not None:
+            resposta['pecas_nao_associadas'] = pecas_nao_associadas
+        return jsonify(resposta), 200
+    except ParametroInvalido as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -135,11 +313,12 @@ def update_manutencao(id):
 @manutencao_bp.route('/manutencoes/<int:id>', methods=['DELETE'])
 def delete_manutencao(id):
     try:
-        manutencao = Manutencao.query.get_or_404(id)
+        manutencao = db.session.get(Manutencao, id)
+        if manutencao is None:
+            return jsonify({'error': 'Manutenção não encontrada'}), 404
         
         # Desassociar peças antes de excluir
-        for peca in manutencao.pecas:
-            peca.manutencao_id = None
+        associar_pecas(manutencao.id, [], substituir=True)
         
         db.session.delete(manutencao)
         db.session.commit()
@@ -150,49 +329,185 @@ def delete_manutencao(id):
         return jsonify({'error': str(e)}), 500
 
 @manutencao_bp.route('/manutencoes/computador/<int:computador_id>', methods=['GET'])
+@resposta_condicional('manutencoes', 'computadores', 'funcionarios', 'problemas', 'pecas')
 def get_manutencoes_por_computador(computador_id):
     try:
-        manutencoes = Manutencao.query.filter_by(computador_id=computador_id)\
-                                     .order_by(Manutencao.data_manutencao.desc()).all()
-        return jsonify([manutencao.to_dict() for manutencao in manutencoes]), 200
+        serializar = Serializador(Manutencao)
+        entidade, query = _consulta_manutencoes(serializar.expandir)
+        manutencoes = query.filter(entidade.computador_id == computador_id)\
+                           .order_by(entidade.data_manutencao.desc()).all()
+        return jsonify(serializar.lista(manutencoes)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Tipos de manutenção que contam como falha no intervalo médio entre falhas
+TIPOS_FALHA = ('Corretiva',)
+
+def _dinheiro(valor):
+    return round(float(valor or 0), 2)
+
+def _eventos_computador(computador_id):
+    # Um evento por manutenção com o custo e a quantidade de peças somados
+    # no SQL (JOIN pelo índice ix_pecas_manutencao_id), sem carregar objetos.
+    # Com o arquivo anexado, as manutenções arquivadas (cada uma com suas
+    # peças no mesmo banco) entram por UNION ALL, cada lado com seus índices.
+    partes = [
+        select(m.c.id, m.c.data_manutencao, m.c.tipo_manutencao,
+               Problema.descricao.label('problema'), Funcionario.nome.label('funcionario'),
+               db.func.count(p.c.id).label('pecas'), db.func.sum(p.c.custo).label('custo'))
+        .join(Problema, Problema.id == m.c.problema_id)
+        .join(Funcionario, Funcionario.id == m.c.funcionario_id)
+        .outerjoin(p, p.c.manutencao_id == m.c.id)
+        .where(m.c.computador_id == computador_id)
+        .group_by(m.c.id)
+        for m, p in partes_manutencoes()
+    ]
+    return (union_all(*partes) if len(partes) > 1 else partes[0]).subquery('eventos')
+
+def _linha_do_tempo(eventos):
+    return db.session.execute(
+        select(eventos).order_by(eventos.c.data_manutencao.desc(), eventos.c.id.desc())
+    ).all()
+
+def _totais_por_tipo(eventos):
+    # Uma consulta agregada por tipo: eventos, custo das peças, primeira e
+    # última data e o intervalo médio (em dias) entre eventos do tipo
+    data = eventos.c.data_manutencao
+    total = db.func.count()
+    return db.session.execute(
+        select(eventos.c.tipo_manutencao, total.label('eventos'), db.func.sum(eventos.c.custo).label('custo'),
+               db.func.min(data).label('primeira'), db.func.max(data).label('ultima'),
+               ((db.func.julianday(db.func.max(data)) - db.func.julianday(db.func.min(data)))
+                / db.func.nullif(total - 1, 0)).label('intervalo_dias'))
+        .group_by(eventos.c.tipo_manutencao)
+    ).all()
+
+def historico_computador(computador_id):
+    eventos = _eventos_computador(computador_id)
+    tipos = _totais_por_tipo(eventos)
+    falhas = [tipo for tipo in tipos if tipo.tipo_manutencao in TIPOS_FALHA]
+    eventos_falha = sum(tipo.eventos for tipo in falhas)
+    intervalo_falhas = None
+    if eventos_falha > 1:
+        # Com mais de um tipo de falha, usa o período entre a primeira e a última
+        primeira = min(tipo.primeira for tipo in falhas)
+        ultima = max(tipo.ultima for tipo in falhas)
+        intervalo_falhas = round((ultima - primeira).total_seconds() / 86400 / (eventos_falha - 1), 1)
+    
+    return {
+        'computador_id': computador_id,
+        'totais': {
+            'eventos': sum(tipo.eventos for tipo in tipos),
+            'custo_pecas': _dinheiro(sum(tipo.custo or 0 for tipo in tipos)),
+            'primeira_manutencao': min(tipo.primeira for tipo in tipos).isoformat() if tipos else None,
+            'ultima_manutencao': max(tipo.ultima for tipo in tipos).isoformat() if tipos else None,
+            'dias_medios_entre_falhas': intervalo_falhas,
+            'por_tipo': {tipo.tipo_manutencao: {
+                'eventos': tipo.eventos,
+                'custo_pecas': _dinheiro(tipo.custo),
+                'primeira': tipo.primeira.isoformat(),
+                'ultima': tipo.ultima.isoformat(),
+                'dias_medios_entre_eventos': round(tipo.intervalo_dias, 1) if tipo.intervalo_dias is not None else None
+            } for tipo in tipos}
+        },
+        'eventos': [{
+            'id': evento.id,
+            'data': evento.data_manutencao.isoformat(),
+            'tipo': evento.tipo_manutencao,
+            'problema': evento.problema,
+            'funcionario': evento.funcionario,
+            'pecas': evento.pecas,
+            'custo_pecas': _dinheiro(evento.custo)
+        } for evento in _linha_do_tempo(eventos)]
+    }
+
+@manutencao_bp.route('/manutencoes/computador/<int:computador_id>/historico', methods=['GET'])
+@resposta_condicional('manutencoes', 'computadores', 'funcionarios', 'problemas', 'pecas')
+def get_historico_computador(computador_id):
+    try:
+        # Linha do tempo compacta e totais calculados no banco, para a tela de detalhe
+        if db.session.get(Computador, computador_id) is None:
+            return jsonify({'error': 'Computador não encontrado'}), 404
+        return jsonify(historico_computador(computador_id)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def tipos_manutencao():
+    return cache_referencia.obter(
+        'manutencoes/tipos', ('manutencoes',),
+        lambda: [tipo[0] for tipo in db.session.query(Manutencao.tipo_manutencao).distinct().all()]
+    )
+
 @manutencao_bp.route('/manutencoes/tipos', methods=['GET'])
+@resposta_condicional('manutencoes')
 def get_tipos_manutencao():
     try:
-        tipos = db.session.query(Manutencao.tipo_manutencao).distinct().all()
-        return jsonify([tipo[0] for tipo in tipos]), 200
+        return jsonify(tipos_manutencao()), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _janela_relatorio():
+    # Janela do relatório mensal como (ano, mes) de início e fim. Aceita
+    # data_inicio/data_fim (YYYY-MM-DD ou YYYY-MM) ou ?meses=N contando
+    # a partir do mês atual (padrão 12)
+    def ler_mes(valor):
+        data = datetime.strptime(valor[:7], '%Y-%m')
+        return data.year, data.month
+    
+    agora = datetime.utcnow()
+    fim = ler_mes(request.args['data_fim']) if request.args.get('data_fim') else (agora.year, agora.month)
+    if request.args.get('data_inicio'):
+        return ler_mes(request.args['data_inicio']), fim
+    
+    meses = max(int(request.args.get('meses', 12)), 1)
+    indice = fim[0] * 12 + (fim[1] - 1) - (meses - 1)
+    return (indice // 12, indice % 12 + 1), fim
+
+def relatorio_manutencoes():
+    # Os números vêm de manutencoes_resumo (contadores por mês e tipo
+    # mantidos por triggers), cujo tamanho não depende do histórico.
+    # ValueError indica período inválido na requisição. Os três números
+    # respeitam a mesma janela (padrão: últimos 12 meses); o total geral
+    # fica em /api/bootstrap (totais)
+    inicio, fim = _janela_relatorio()
+    chave_mes = ResumoManutencao.ano * 100 + ResumoManutencao.mes
+    na_janela = chave_mes.between(inicio[0] * 100 + inicio[1], fim[0] * 100 + fim[1])
+    
+    # Manutenções por tipo
+    tipos = db.session.query(ResumoManutencao.tipo_manutencao,
+                             db.func.sum(ResumoManutencao.total))\
+                      .filter(na_janela)\
+                      .group_by(ResumoManutencao.tipo_manutencao).all()
+    
+    # Estatísticas gerais
+    total_manutencoes = sum(tipo[1] for tipo in tipos)
+    
+    # Manutenções por mês
+    manutencoes_por_mes = db.session.query(
+        ResumoManutencao.ano,
+        ResumoManutencao.mes,
+        db.func.sum(ResumoManutencao.total).label('total')
+    ).filter(na_janela)\
+     .group_by(ResumoManutencao.ano, ResumoManutencao.mes)\
+     .order_by(ResumoManutencao.ano, ResumoManutencao.mes).all()
+    
+    return {
+        'total_manutencoes': total_manutencoes,
+        'por_tipo': [{'tipo': tipo[0], 'quantidade': tipo[1]} for tipo in tipos],
+        'por_mes': [{'ano': item.ano, 'mes': item.mes, 'total': item.total}
+                   for item in manutencoes_por_mes],
+        'periodo': {'inicio': f'{inicio[0]:04d}-{inicio[1]:02d}', 'fim': f'{fim[0]:04d}-{fim[1]:02d}'}
+    }
+
 @manutencao_bp.route('/manutencoes/relatorio', methods=['GET'])
+@resposta_condicional('manutencoes', variante=lambda: datetime.utcnow().strftime('%Y-%m'))
 def get_relatorio_manutencoes():
     try:
-        # Estatísticas gerais
-        total_manutencoes = Manutencao.query.count()
-        
-        # Manutenções por tipo
-        tipos = db.session.query(Manutencao.tipo_manutencao, 
-                                db.func.count(Manutencao.id))\
-                          .group_by(Manutencao.tipo_manutencao).all()
-        
-        # Manutenções por mês (últimos 12 meses)
-        from sqlalchemy import extract
-        manutencoes_por_mes = db.session.query(
-            extract('year', Manutencao.data_manutencao).label('ano'),
-            extract('month', Manutencao.data_manutencao).label('mes'),
-            db.func.count(Manutencao.id).label('total')
-        ).group_by('ano', 'mes').order_by('ano', 'mes').limit(12).all()
-        
-        relatorio = {
-            'total_manutencoes': total_manutencoes,
-            'por_tipo': [{'tipo': tipo[0], 'quantidade': tipo[1]} for tipo in tipos],
-            'por_mes': [{'ano': int(item.ano), 'mes': int(item.mes), 'total': item.total} 
-                       for item in manutencoes_por_mes]
-        }
-        
-        return jsonify(relatorio), 200
+        return jsonify(relatorio_manutencoes()), 200
+    except ValueError:
+        return jsonify({'error': 'Período inválido: use data_inicio/data_fim no formato YYYY-MM-DD ou meses inteiro'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,83 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify
+from sqlalchemy import func, select
+from src.models import db
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
+from src.models.manutencao import Manutencao
+from src.models.peca import Peca
+from src.models.problema import Problema
+from src.routes.funcionario import funcionarios_referencia
+from src.routes.manutencao import relatorio_manutencoes, tipos_manutencao
+from src.routes.problema import categorias_problemas, problemas_referencia
+from src.utils.condicional import resposta_condicional
+from src.utils.paginacao import ParametroInvalido
+
+painel_bp = Blueprint('painel', __name__)
+
+# Quantidade de manutenções recentes exibidas no painel
+MANUTENCOES_RECENTES = 5
+
+
+def _totais():
+    # Uma consulta com uma subconsulta de contagem por tabela
+    contagens = db.session.execute(select(
+        *(select(func.count()).select_from(modelo).scalar_subquery().label(nome) for nome, modelo in (
+            ('computadores', Computador), ('funcionarios', Funcionario), ('problemas', Problema),
+            ('pecas', Peca), ('manutencoes', Manutencao)
+        ))
+    )).one()
+    return dict(contagens._mapping)
+
+
+def _manutencoes_recentes():
+    manutencoes = Manutencao.com_relacionamentos(('computador', 'funcionario'))\
+                            .order_by(Manutencao.data_manutencao.desc(), Manutencao.id.desc())\
+                            .limit(MANUTENCOES_RECENTES).all()
+    return [manutencao.to_dict(('computador', 'funcionario')) for manutencao in manutencoes]
+
+
+# Conjuntos disponíveis em /api/bootstrap. "pecas" (todas as peças) é o único
+# que cresce com o histórico e só vem quando pedido em ?incluir=
+CONJUNTOS = {
+    'totais': _totais,
+    'computadores': lambda: [computador.to_dict() for computador in Computador.query.all()],
+    'funcionarios': funcionarios_referencia,
+    'problemas': problemas_referencia,
+    'pecas': lambda: [peca.to_dict() for peca in Peca.query.all()],
+    'pecas_disponiveis': lambda: [peca.to_dict() for peca in Peca.query.filter_by(manutencao_id=None)],
+    'tipos_manutencao': tipos_manutencao,
+    'categorias_problemas': categorias_problemas,
+    'relatorio': relatorio_manutencoes,
+    'manutencoes_recentes': _manutencoes_recentes,
+}
+PADRAO = tuple(nome for nome in CONJUNTOS if nome != 'pecas')
+
+
+def _conjuntos_solicitados():
+    valor = request.args.get('incluir')
+    if not valor:
+        return PADRAO
+    nomes = [nome.strip() for nome in valor.split(',') if nome.strip()]
+    invalidos = [nome for nome in nomes if nome not in CONJUNTOS]
+    if invalidos:
+        raise ParametroInvalido(f'Conjunto inválido: {", ".join(invalidos)}')
+    return nomes
+
+
+@painel_bp.route('/bootstrap', methods=['GET'])
+@resposta_condicional('computadores', 'funcionarios', 'problemas', 'pecas', 'manutencoes',
+                      variante=lambda: datetime.utcnow().strftime('%Y-%m'))
+def get_bootstrap():
+    # Todos os dados da carga inicial do painel em uma resposta, montados
+    # com a mesma sessão; ?incluir=computadores,relatorio limita os conjuntos
+    # e aceita também "pecas". O relatório aceita os mesmos parâmetros de
+    # /api/manutencoes/relatorio
+    try:
+        return jsonify({nome: CONJUNTOS[nome]() for nome in _conjuntos_solicitados()}), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
+    except ValueError:
+        return jsonify({'error': 'Período inválido: use data_inicio/data_fim no formato YYYY-MM-DD ou meses inteiro'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
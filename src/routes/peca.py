@@ -1,23 +1,50 @@
 from flask import Blueprint, request, jsonify
 from src.models import db
 from src.models.peca import Peca
+from src.models.arquivo import arquivo_anexado, pecas_com_arquivo
+from src.models.busca import buscar, cabecalhos_limite, fts_disponivel
+from src.utils.importacao import (importar, ler_registros, ler_modo, texto_obrigatorio,
+                                   texto_opcional, data_obrigatoria, ImportacaoInvalida)
+from src.utils.paginacao import paginacao_solicitada, paginar, ler_ids, buscar_ids, ler_limite, ParametroInvalido
+from src.utils.condicional import resposta_condicional
+from src.utils.serializacao import Serializador
 from datetime import datetime
 
 peca_bp = Blueprint('peca', __name__)
 
 @peca_bp.route('/pecas', methods=['GET'])
+@resposta_condicional('pecas')
 def get_pecas():
     try:
+        serializar = Serializador(Peca)
+        ids = ler_ids()
+        if ids is not None:
+            return jsonify(serializar.lista(buscar_ids(Peca.query, Peca.id, ids))), 200
+        if paginacao_solicitada():
+            return jsonify(paginar(Peca.query, [Peca.id], serializar=serializar)), 200
+        
         pecas = Peca.query.all()
-        return jsonify([peca.to_dict() for peca in pecas]), 200
+        return jsonify(serializar.lista(pecas)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @peca_bp.route('/pecas/<int:id>', methods=['GET'])
+@resposta_condicional('pecas')
 def get_peca(id):
     try:
-        peca = Peca.query.get_or_404(id)
-        return jsonify(peca.to_dict()), 200
+        serializar = Serializador(Peca)
+        peca = db.session.get(Peca, id)
+        if peca is None and arquivo_anexado():
+            # Peça de uma manutenção arquivada (somente leitura)
+            entidade, query = pecas_com_arquivo()
+            peca = query.filter(entidade.id == id).first()
+        if peca is None:
+            return jsonify({'error': 'Peça não encontrada'}), 404
+        return jsonify(serializar(peca)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -54,7 +81,10 @@ def create_peca():
 @peca_bp.route('/pecas/<int:id>', methods=['PUT'])
 def update_peca(id):
     try:
-        peca = Peca.query.get_or_404(id)
+        # Peças arquivadas são somente leitura, como as manutenções
+        peca = db.session.get(Peca, id)
+        if peca is None:
+            return jsonify({'error': 'Peça não encontrada'}), 404
         data = request.get_json()
         
         if not data:
@@ -85,7 +115,9 @@ def update_peca(id):
 @peca_bp.route('/pecas/<int:id>', methods=['DELETE'])
 def delete_peca(id):
     try:
-        peca = Peca.query.get_or_404(id)
+        peca = db.session.get(Peca, id)
+        if peca is None:
+            return jsonify({'error': 'Peça não encontrada'}), 404
         
         db.session.delete(peca)
         db.session.commit()
@@ -95,29 +127,83 @@ def delete_peca(id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _validar_importacao(registro):
+    custo = texto_obrigatorio(registro, 'custo')
+    try:
+        custo = float(custo)
+    except ValueError:
+        raise ValueError('Custo inválido')
+    manutencao_id = texto_opcional(registro, 'manutencao_id')
+    try:
+        manutencao_id = int(manutencao_id) if manutencao_id else None
+    except ValueError:
+        raise ValueError('manutencao_id inválido')
+    return {
+        'nome_peca': texto_obrigatorio(registro, 'nome_peca'),
+        'numero_serie_peca': texto_opcional(registro, 'numero_serie_peca'),
+        'fabricante': texto_obrigatorio(registro, 'fabricante'),
+        'data_aquisicao_peca': data_obrigatoria(registro, 'data_aquisicao_peca'),
+        'custo': custo,
+        'manutencao_id': manutencao_id
+    }
+
+@peca_bp.route('/pecas/importar', methods=['POST'])
+def importar_pecas():
+    try:
+        # CSV ou NDJSON; com ?modo=upsert peças com numero_serie_peca existente são atualizadas
+        modo = ler_modo()
+        relatorio = importar(Peca, ler_registros(), _validar_importacao, 'numero_serie_peca', modo,
+                             chave_unica=False)
+        return jsonify(relatorio), 200
+    except ImportacaoInvalida as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @peca_bp.route('/pecas/search', methods=['GET'])
+@resposta_condicional('pecas')
 def search_pecas():
     try:
+        serializar = Serializador(Peca)
         query = request.args.get('q', '')
         if not query:
             return jsonify([]), 200
         
-        pecas = Peca.query.filter(
-            (Peca.nome_peca.contains(query)) |
-            (Peca.fabricante.contains(query)) |
-            (Peca.numero_serie_peca.contains(query))
-        ).all()
+        cabecalhos = {}
+        if fts_disponivel():
+            # Índice FTS5: busca por prefixo ordenada por relevância, até
+            # "limit" resultados (X-Result-Limit e X-Has-More)
+            limite = ler_limite()
+            pecas, mais = buscar('pecas', query, limite)
+            cabecalhos = cabecalhos_limite(limite, mais)
+        else:
+            pecas = Peca.query.filter(
+                (Peca.nome_peca.contains(query)) |
+                (Peca.fabricante.contains(query)) |
+                (Peca.numero_serie_peca.contains(query))
+            ).all()
         
-        return jsonify([peca.to_dict() for peca in pecas]), 200
+        return jsonify(serializar.lista(pecas)), 200, cabecalhos
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @peca_bp.route('/pecas/disponiveis', methods=['GET'])
+@resposta_condicional('pecas')
 def get_pecas_disponiveis():
     try:
+        serializar = Serializador(Peca)
         # Peças que não estão associadas a nenhuma manutenção
-        pecas = Peca.query.filter_by(manutencao_id=None).all()
-        return jsonify([peca.to_dict() for peca in pecas]), 200
+        query = Peca.query.filter_by(manutencao_id=None)
+        if paginacao_solicitada():
+            return jsonify(paginar(query, [Peca.id], serializar=serializar)), 200
+        
+        pecas = query.all()
+        return jsonify(serializar.lista(pecas)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
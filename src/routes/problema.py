@@ -1,23 +1,55 @@
 from flask import Blueprint, request, jsonify
 from src.models import db
+from src.models.arquivo import possui_manutencoes_arquivadas
 from src.models.problema import Problema
+from src.models.busca import buscar, cabecalhos_limite, fts_disponivel
+from src.utils.paginacao import paginacao_solicitada, paginar, ler_ids, buscar_ids, ler_limite, ParametroInvalido
+from src.utils.condicional import resposta_condicional
+from src.utils.serializacao import Serializador
+from src.utils.cache import cache_referencia
 from datetime import datetime
 
 problema_bp = Blueprint('problema', __name__)
 
+def problemas_referencia():
+    # Tabela de referência pequena: servida do cache em memória
+    return cache_referencia.obter(
+        'problemas', ('problemas',),
+        lambda: [problema.to_dict() for problema in Problema.query.all()]
+    )
+
+def categorias_problemas():
+    return cache_referencia.obter(
+        'problemas/categorias', ('problemas',),
+        lambda: [categoria[0] for categoria in db.session.query(Problema.categoria).distinct().all()]
+    )
+
 @problema_bp.route('/problemas', methods=['GET'])
+@resposta_condicional('problemas')
 def get_problemas():
     try:
-        problemas = Problema.query.all()
-        return jsonify([problema.to_dict() for problema in problemas]), 200
+        serializar = Serializador(Problema)
+        ids = ler_ids()
+        if ids is not None:
+            return jsonify(serializar.lista(buscar_ids(Problema.query, Problema.id, ids))), 200
+        if paginacao_solicitada():
+            return jsonify(paginar(Problema.query, [Problema.id], serializar=serializar)), 200
+        
+        return jsonify(serializar.filtrar(problemas_referencia())), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @problema_bp.route('/problemas/<int:id>', methods=['GET'])
+@resposta_condicional('problemas')
 def get_problema(id):
     try:
+        serializar = Serializador(Problema)
         problema = Problema.query.get_or_404(id)
-        return jsonify(problema.to_dict()), 200
+        return jsonify(serializar(problema)), 200
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -72,7 +104,7 @@ def delete_problema(id):
         problema = Problema.query.get_or_404(id)
         
         # Verificar se há manutenções associadas
-        if problema.manutencoes:
+        if problema.manutencoes or possui_manutencoes_arquivadas('problema_id', id):
             return jsonify({'error': 'Não é possível excluir problema com manutenções associadas'}), 400
         
         db.session.delete(problema)
@@ -84,26 +116,38 @@ def delete_problema(id):
         return jsonify({'error': str(e)}), 500
 
 @problema_bp.route('/problemas/search', methods=['GET'])
+@resposta_condicional('problemas')
 def search_problemas():
     try:
+        serializar = Serializador(Problema)
         query = request.args.get('q', '')
         if not query:
             return jsonify([]), 200
         
-        problemas = Problema.query.filter(
-            (Problema.descricao.contains(query)) |
-            (Problema.categoria.contains(query))
-        ).all()
+        cabecalhos = {}
+        if fts_disponivel():
+            # Índice FTS5: busca por prefixo ordenada por relevância, até
+            # "limit" resultados (X-Result-Limit e X-Has-More)
+            limite = ler_limite()
+            problemas, mais = buscar('problemas', query, limite)
+            cabecalhos = cabecalhos_limite(limite, mais)
+        else:
+            problemas = Problema.query.filter(
+                (Problema.descricao.contains(query)) |
+                (Problema.categoria.contains(query))
+            ).all()
         
-        return jsonify([problema.to_dict() for problema in problemas]), 200
+        return jsonify(serializar.lista(problemas)), 200, cabecalhos
+    except ParametroInvalido as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @problema_bp.route('/problemas/categorias', methods=['GET'])
+@resposta_condicional('problemas')
 def get_categorias():
     try:
-        categorias = db.session.query(Problema.categoria).distinct().all()
-        return jsonify([categoria[0] for categoria in categorias]), 200
+        return jsonify(categorias_problemas()), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
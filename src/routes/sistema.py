@@ -0,0 +1,61 @@
+import os
+import time
+from flask import Blueprint, Response, current_app, jsonify, request
+from src.models.conexao import caminho_replica
+from src.utils.cache import cache_referencia
+from src.utils.compressao import compressao
+from src.utils.consultas_lentas import ORDENACOES, consultas_lentas
+from src.utils.eventos import eventos
+from src.utils.metricas import metricas
+
+sistema_bp = Blueprint('sistema', __name__)
+
+@sistema_bp.route('/_cache', methods=['GET'])
+def get_cache():
+    return jsonify(cache_referencia.estatisticas()), 200
+
+@sistema_bp.route('/_cache', methods=['DELETE'])
+def limpar_cache():
+    cache_referencia.limpar()
+    return jsonify({'message': 'Cache limpo com sucesso'}), 200
+
+@sistema_bp.route('/_metrics', methods=['GET'])
+def get_metricas():
+    # Formato texto do Prometheus; os números são do worker que respondeu
+    if not metricas.ativa:
+        return jsonify({'error': 'Métricas desativadas (METRICAS_ATIVAS)'}), 404
+    cache = cache_referencia.estatisticas()
+    stream = eventos.estatisticas()
+    comprimidas = compressao.estatisticas()
+    extras = (
+        ('cache_referencia_acertos_total', 'counter', 'Acertos do cache de referência.', cache['acertos']),
+        ('cache_referencia_falhas_total', 'counter', 'Falhas do cache de referência.', cache['falhas']),
+        ('cache_referencia_itens', 'gauge', 'Itens no cache de referência.', cache['itens']),
+        ('eventos_clientes', 'gauge', 'Clientes conectados a /api/eventos.', stream['clientes']),
+        ('eventos_publicados_total', 'counter', 'Alterações publicadas no stream de eventos.', stream['publicados']),
+        ('compressao_bytes_originais_total', 'counter', 'Bytes das respostas comprimidas antes da compressão.',
+         comprimidas['bytes_originais']),
+        ('compressao_bytes_enviados_total', 'counter', 'Bytes das respostas comprimidas após a compressão.',
+         comprimidas['bytes_enviados']),
+    )
+    replica = caminho_replica(current_app.config)
+    if replica and os.path.exists(replica):
+        extras += (('leitura_replica_idade_segundos', 'gauge', 'Tempo desde a última atualização da réplica de leitura.',
+                    round(time.time() - os.path.getmtime(replica), 3)),)
+    return Response(metricas.exportar(extras), mimetype='text/plain; version=0.0.4')
+
+@sistema_bp.route('/_consultas_lentas', methods=['GET'])
+def get_consultas_lentas():
+    # Formatos de consulta acima do limiar neste worker, do mais custoso ao menos
+    if not consultas_lentas.ativo:
+        return jsonify({'error': 'Log de consultas lentas desativado (CONSULTAS_LENTAS_LIMIAR_MS)'}), 404
+    ordenar = request.args.get('ordenar', 'total_ms')
+    if ordenar not in ORDENACOES:
+        return jsonify({'error': f"ordenar deve ser um de: {', '.join(ORDENACOES)}"}), 400
+    limite = request.args.get('limite', type=int)
+    return jsonify(consultas_lentas.relatorio(ordenar, limite)), 200
+
+@sistema_bp.route('/_consultas_lentas', methods=['DELETE'])
+def limpar_consultas_lentas():
+    consultas_lentas.limpar()
+    return jsonify({'message': 'Log de consultas lentas limpo com sucesso'}), 200
@@ -20,6 +20,40 @@ function initializeApp() {
     setupNavigation();
     setupEventListeners();
     loadDashboardData();
+    setupLiveUpdates();
+}
+
+// Atualização ao vivo (Server-Sent Events)
+let liveReloadTimer = null;
+
+function setupLiveUpdates() {
+    if (!window.EventSource) return;
+    // O navegador reconecta sozinho e envia Last-Event-ID com o último token
+    const source = new EventSource(`${API_BASE}/eventos`);
+    source.addEventListener('change', event => {
+        const alteracao = JSON.parse(event.data);
+        if (currentSection === 'dashboard' || alteracao.entidade === currentSection) {
+            scheduleLiveReload();
+        }
+    });
+    source.addEventListener('resync', () => {
+        // Eventos perdidos: recarrega a seção atual e abre um novo stream
+        source.close();
+        scheduleLiveReload();
+        setTimeout(setupLiveUpdates, 3000);
+    });
+}
+
+function scheduleLiveReload() {
+    // Agrupa rajadas de alterações em uma única recarga
+    clearTimeout(liveReloadTimer);
+    liveReloadTimer = setTimeout(() => {
+        if (currentSection === 'dashboard') {
+            loadDashboardData();
+        } else {
+            loadSectionData(currentSection);
+        }
+    }, 500);
 }
 
 // Configuração da navegação
@@ -155,21 +189,20 @@ async function apiRequest(endpoint, options = {}) {
 // Dashboard Functions
 async function loadDashboardData() {
     try {
-        const [computadores, funcionarios, pecas, manutencoes] = await Promise.all([
-            apiRequest('/computadores'),
-            apiRequest('/funcionarios'),
-            apiRequest('/pecas'),
-            apiRequest('/manutencoes')
-        ]);
+        // Uma única requisição traz totais, listas de referência e as últimas manutenções
+        const dados = await apiRequest('/bootstrap');
+        currentData.computadores = dados.computadores;
+        currentData.funcionarios = dados.funcionarios;
+        currentData.problemas = dados.problemas;
         
         // Atualizar estatísticas
-        document.getElementById('total-computadores').textContent = computadores.length;
-        document.getElementById('total-funcionarios').textContent = funcionarios.length;
-        document.getElementById('total-pecas').textContent = pecas.length;
-        document.getElementById('total-manutencoes').textContent = manutencoes.length;
+        document.getElementById('total-computadores').textContent = dados.totais.computadores;
+        document.getElementById('total-funcionarios').textContent = dados.totais.funcionarios;
+        document.getElementById('total-pecas').textContent = dados.totais.pecas;
+        document.getElementById('total-manutencoes').textContent = dados.totais.manutencoes;
         
         // Carregar últimas manutenções
-        loadRecentManutencoes(manutencoes.slice(0, 5));
+        loadRecentManutencoes(dados.manutencoes_recentes);
         
     } catch (error) {
         console.error('Erro ao carregar dados do dashboard:', error);
@@ -434,7 +467,7 @@ function searchPecas() {
 async function loadManutencoes() {
     try {
         const [manutencoes, computadores] = await Promise.all([
-            apiRequest('/manutencoes'),
+            apiRequest('/manutencoes?expand=computador,funcionario,problema'),
             apiRequest('/computadores')
         ]);
         
@@ -1024,7 +1057,7 @@ async function editManutencao(id) {
 
 async function viewManutencao(id) {
     try {
-        const manutencao = await apiRequest(`/manutencoes/${id}`);
+        const manutencao = await apiRequest(`/manutencoes/${id}?expand=all`);
         
         const content = `
             <div class="manutencao-details">
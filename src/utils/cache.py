@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.models.versao import versoes
+
+# Valores padrão; podem ser alterados pela configuração do app
+TTL_PADRAO = 300
+MAXIMO_PADRAO = 128
+
+
+class CacheReferencia:
+    # Cache local do processo para tabelas de referência pequenas (problemas,
+    # funcionários, tipos, categorias). Cada item guarda as versões das
+    # tabelas de que depende (versoes_tabelas); se outro worker alterar a
+    # tabela, a versão muda e o item é descartado na próxima leitura.
+
+    def __init__(self, ttl=TTL_PADRAO, maximo=MAXIMO_PADRAO):
+        self.ttl = ttl
+        self.maximo = maximo
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self._zerar_estatisticas()
+
+    def _zerar_estatisticas(self):
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.obsoletos = 0
+        self.invalidados = 0
+        self.removidos_lru = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CACHE_REFERENCIA_TTL', self.ttl)
+        self.maximo = app.config.get('CACHE_REFERENCIA_MAXIMO', self.maximo)
+        _registrar_eventos(self)
+
+    def obter(self, chave, tabelas, carregar):
+        tabelas = tuple(tabelas)
+        estado = tuple(versao for versao, _ in versoes(tabelas).values())
+        agora = time.monotonic()
+
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                expira_em, versao_item, _, valor = item
+                if expira_em <= agora:
+                    self.expirados += 1
+                elif versao_item != estado:
+                    self.obsoletos += 1
+                else:
+                    self._itens.move_to_end(chave)
+                    self.acertos += 1
+                    return valor
+            self.falhas += 1
+
+        valor = carregar()
+        with self._lock:
+            self._itens[chave] = (agora + self.ttl, estado, tabelas, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+                self.removidos_lru += 1
+        return valor
+
+    def invalidar(self, tabelas=None):
+        with self._lock:
+            if tabelas is None:
+                removidas = list(self._itens)
+            else:
+                removidas = [chave for chave, item in self._itens.items() if set(item[2]) & set(tabelas)]
+            for chave in removidas:
+                del self._itens[chave]
+            self.invalidados += len(removidas)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._zerar_estatisticas()
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'maximo': self.maximo,
+                'ttl': self.ttl,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': round(self.acertos / consultas, 4) if consultas else None,
+                'expirados': self.expirados,
+                'obsoletos': self.obsoletos,
+                'invalidados': self.invalidados,
+                'removidos_lru': self.removidos_lru,
+                'chaves': list(self._itens)
+            }
+
+
+cache_referencia = CacheReferencia()
+
+
+def _tabelas_da_sessao(session):
+    return session.info.setdefault('tabelas_alteradas', set())
+
+
+def _registrar_eventos(cache):
+    # Invalida os itens afetados quando uma transação é confirmada, cobrindo
+    # tanto as rotas quanto escritas diretas pela sessão do SQLAlchemy
+    if getattr(cache, '_eventos_registrados', False):
+        return
+    cache._eventos_registrados = True
+
+    @event.listens_for(Session, 'after_flush')
+    def registrar_flush(session, flush_context):
+        tabelas = _tabelas_da_sessao(session)
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            tabela = getattr(obj, '__tablename__', None)
+            if tabela:
+                tabelas.add(tabela)
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def registrar_execucao(orm_execute_state):
+        # UPDATE/INSERT/DELETE em massa (session.execute(update(Modelo)...))
+        if orm_execute_state.is_update or orm_execute_state.is_insert or orm_execute_state.is_delete:
+            mapper = orm_execute_state.bind_mapper
+            if mapper is not None:
+                _tabelas_da_sessao(orm_execute_state.session).add(mapper.local_table.name)
+
+    @event.listens_for(Session, 'after_commit')
+    def invalidar_apos_commit(session):
+        tabelas = session.info.pop('tabelas_alteradas', None)
+        if tabelas:
+            cache.invalidar(tabelas)
+
+    @event.listens_for(Session, 'after_soft_rollback')
+    def descartar_apos_rollback(session, transacao_anterior):
+        session.info.pop('tabelas_alteradas', None)
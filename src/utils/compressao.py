@@ -0,0 +1,169 @@
+import threading
+import zlib
+from flask import request
+
+# brotli e zstandard são opcionais: sem eles só gzip é negociado
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende do ambiente
+    zstandard = None
+
+TIPOS_COMPRIMIVEIS = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+                      'image/svg+xml')
+# O stream SSE precisa entregar cada evento assim que é gerado
+TIPOS_NAO_COMPRIMIVEIS = ('text/event-stream',)
+
+NIVEIS_PADRAO = {'zstd': 3, 'br': 4, 'gzip': 6}
+
+
+class _Brotli:
+    # Mesma interface de zlib.compressobj (compress/flush)
+    def __init__(self, nivel):
+        self._compressor = brotli.Compressor(quality=nivel)
+
+    def compress(self, dados):
+        return self._compressor.process(dados)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+def _compressores():
+    # Em ordem de preferência quando o cliente aceita várias com o mesmo q
+    compressores = {}
+    if zstandard is not None:
+        compressores['zstd'] = lambda nivel: zstandard.ZstdCompressor(level=nivel).compressobj()
+    if brotli is not None:
+        compressores['br'] = _Brotli
+    # wbits=31: formato gzip (cabeçalho e CRC) em vez de zlib
+    compressores['gzip'] = lambda nivel: zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    return compressores
+
+
+COMPRESSORES = _compressores()
+
+
+class Compressao:
+    # Comprime as respostas da API conforme o Accept-Encoding (zstd, br ou
+    # gzip). Respostas menores que COMPRESSAO_MINIMO, de tipos que não são
+    # texto, já codificadas (arquivos estáticos pré-comprimidos) ou com
+    # Cache-Control: no-transform passam intactas. Respostas em stream (as
+    # exportações) são comprimidas bloco a bloco, conforme são geradas.
+    # Desativada (COMPRESSAO_ATIVA=False), nenhum gancho é registrado.
+
+    def __init__(self):
+        self.ativa = False
+        self.minimo = 1024
+        self.niveis = dict(NIVEIS_PADRAO)
+        self._lock = threading.Lock()
+        self.respostas = {}
+        self.bytes_originais = 0
+        self.bytes_enviados = 0
+
+    def init_app(self, app):
+        # Registrar depois de metricas.init_app: os ganchos after_request
+        # rodam na ordem inversa, e o tempo de compressão entra no total
+        self.ativa = app.config.get('COMPRESSAO_ATIVA', True)
+        self.minimo = app.config.get('COMPRESSAO_MINIMO', self.minimo)
+        self.niveis = {**NIVEIS_PADRAO, **(app.config.get('COMPRESSAO_NIVEIS') or {})}
+        if self.ativa:
+            app.after_request(self.comprimir)
+
+    def comprimir(self, resposta):
+        if resposta.status_code == 304:
+            self._revalidar(resposta)
+            return resposta
+        if not self._comprimivel(resposta):
+            return resposta
+        if not resposta.is_streamed and resposta.content_length is not None \
+                and resposta.content_length < self.minimo:
+            return resposta
+        resposta.vary.add('Accept-Encoding')
+        codificacao = request.accept_encodings.best_match(COMPRESSORES)
+        if codificacao is None:
+            return resposta
+        compressor = COMPRESSORES[codificacao](self.niveis[codificacao])
+
+        if resposta.is_streamed:
+            resposta.response = self._stream(resposta.iter_encoded(), resposta.response, compressor,
+                                             codificacao)
+            resposta.headers.pop('Content-Length', None)
+        else:
+            dados = resposta.get_data()
+            comprimido = compressor.compress(dados) + compressor.flush()
+            if len(comprimido) >= len(dados):
+                return resposta
+            resposta.set_data(comprimido)
+            self._contar(codificacao, len(dados), len(comprimido))
+        resposta.headers['Content-Encoding'] = codificacao
+        # O corpo muda com a codificação: o ETag passa a ser fraco, o que
+        # mantém o 304 (If-None-Match usa comparação fraca)
+        etag, fraco = resposta.get_etag()
+        if etag and not fraco:
+            resposta.set_etag(etag, weak=True)
+        return resposta
+
+    def _revalidar(self, resposta):
+        # O 304 leva o ETag e o Vary do 200 guardado pelo cliente: fraco se a
+        # cópia dele veio comprimida (If-None-Match com W/) ou, sem
+        # If-None-Match, se ele aceita alguma das codificações
+        etag, fraco = resposta.get_etag()
+        if not etag:
+            return
+        resposta.vary.add('Accept-Encoding')
+        if fraco:
+            return
+        if request.if_none_match:
+            comprimida = request.if_none_match.is_weak(etag)
+        else:
+            comprimida = request.accept_encodings.best_match(COMPRESSORES) is not None
+        if comprimida:
+            resposta.set_etag(etag, weak=True)
+
+    def _comprimivel(self, resposta):
+        if resposta.status_code < 200 or resposta.status_code in (204, 206, 304):
+            return False
+        if resposta.direct_passthrough or 'Content-Encoding' in resposta.headers:
+            return False
+        if 'no-transform' in resposta.headers.get('Cache-Control', ''):
+            return False
+        tipo = resposta.mimetype or ''
+        return tipo.startswith(TIPOS_COMPRIMIVEIS) and not tipo.startswith(TIPOS_NAO_COMPRIMIVEIS)
+
+    def _stream(self, partes, original, compressor, codificacao):
+        # O servidor fecha este gerador ao fim (ou na desconexão do cliente);
+        # o iterável original é fechado junto, liberando a sessão do banco
+        originais = enviados = 0
+        try:
+            for parte in partes:
+                originais += len(parte)
+                dados = compressor.compress(parte)
+                if dados:
+                    enviados += len(dados)
+                    yield dados
+            dados = compressor.flush()
+            enviados += len(dados)
+            yield dados
+        finally:
+            fechar = getattr(original, 'close', None)
+            if fechar:
+                fechar()
+            self._contar(codificacao, originais, enviados)
+
+    def _contar(self, codificacao, originais, enviados):
+        with self._lock:
+            self.respostas[codificacao] = self.respostas.get(codificacao, 0) + 1
+            self.bytes_originais += originais
+            self.bytes_enviados += enviados
+
+    def estatisticas(self):
+        with self._lock:
+            return {'respostas': dict(self.respostas), 'bytes_originais': self.bytes_originais,
+                    'bytes_enviados': self.bytes_enviados}
+
+
+compressao = Compressao()
@@ -0,0 +1,41 @@
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from werkzeug.http import is_resource_modified
+from src.models.versao import versoes
+
+
+def resposta_condicional(*tabelas, variante=None):
+    # Gera ETag e Last-Modified a partir das versões das tabelas das quais a
+    # resposta depende (uma consulta em versoes_tabelas), sem serializar o
+    # corpo. Se o cliente já tem a versão atual, responde 304 antes de
+    # executar a rota. "variante" é uma função opcional cujo valor também
+    # entra no ETag, para respostas que dependem de algo além das tabelas.
+    def decorador(funcao):
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            estado = versoes(tabelas)
+            assinatura = request.full_path + '|' + ','.join(
+                f'{tabela}:{versao}' for tabela, (versao, _) in sorted(estado.items())
+            )
+            if variante:
+                assinatura += '|' + str(variante())
+            etag = hashlib.sha1(assinatura.encode()).hexdigest()
+            datas = [atualizado_em for _, atualizado_em in estado.values() if atualizado_em]
+            ultima_alteracao = max(datas).replace(microsecond=0) if datas else None
+            
+            if not is_resource_modified(request.environ, etag=etag, last_modified=ultima_alteracao):
+                resposta = make_response('', 304)
+            else:
+                resposta = make_response(funcao(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+            
+            resposta.set_etag(etag)
+            if ultima_alteracao:
+                resposta.last_modified = ultima_alteracao
+            # O navegador pode guardar a resposta, mas deve revalidar a cada uso
+            resposta.headers['Cache-Control'] = 'no-cache'
+            return resposta
+        return envolvida
+    return decorador
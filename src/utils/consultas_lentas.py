@@ -0,0 +1,228 @@
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from flask import has_request_context, request
+from sqlalchemy import event
+from src.models import db
+
+logger = logging.getLogger(__name__)
+
+FORA_DE_REQUISICAO = '<fora de requisição>'
+# No lugar dos parâmetros quando CONSULTAS_LENTAS_PARAMETROS está desligado
+PARAMETROS_OMITIDOS = '<omitidos>'
+# Quantidade de formatos de consulta distintos guardados por processo
+MAXIMO_PADRAO = 200
+# SQL e parâmetros guardados como exemplo são truncados
+TAMANHO_MAXIMO_TEXTO = 500
+
+_ESPACOS = re.compile(r'\s+')
+_TEXTOS = re.compile(r"'(?:[^']|'')*'")
+_NUMEROS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LISTAS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+
+def normalizar(sql):
+    # Formato da consulta sem valores: literais viram ? e listas de IN com
+    # qualquer quantidade de parâmetros viram (...), para agrupar execuções
+    # que só diferem nos valores
+    sql = _ESPACOS.sub(' ', sql).strip()
+    sql = _TEXTOS.sub('?', sql)
+    sql = _NUMEROS.sub('?', sql)
+    return _LISTAS.sub('(...)', sql)
+
+
+def varredura_completa(plano):
+    # "SCAN tabela" sem índice percorre a tabela inteira; "SCAN ... USING
+    # (COVERING) INDEX" percorre um índice e geralmente é aceitável
+    return [linha for linha in plano or () if linha.startswith('SCAN ') and ' USING ' not in linha]
+
+
+class AgregadorConsultas:
+    # Agrupa ocorrências de consultas lentas por formato normalizado
+    def __init__(self, maximo=MAXIMO_PADRAO):
+        self.maximo = maximo
+        self.formatos = {}
+        self.descartadas = 0
+
+    def adicionar(self, ocorrencia):
+        # Devolve True quando o formato ainda não tinha sido visto
+        chave = ocorrencia['formato']
+        formato = self.formatos.get(chave)
+        novo = formato is None
+        if novo:
+            if len(self.formatos) >= self.maximo:
+                self.descartadas += 1
+                return False
+            formato = self.formatos[chave] = {
+                'formato': chave, 'ocorrencias': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'rotas': {}, 'plano': ocorrencia.get('plano'), 'exemplo': None,
+                'primeira': ocorrencia['quando'], 'ultima': ocorrencia['quando'],
+            }
+        formato['ocorrencias'] += 1
+        formato['total_ms'] += ocorrencia['duracao_ms']
+        formato['ultima'] = ocorrencia['quando']
+        formato['rotas'][ocorrencia['rota']] = formato['rotas'].get(ocorrencia['rota'], 0) + 1
+        if ocorrencia['duracao_ms'] >= formato['max_ms']:
+            # Guarda a execução mais lenta como exemplo (SQL e parâmetros reais)
+            formato['max_ms'] = ocorrencia['duracao_ms']
+            formato['exemplo'] = {'sql': ocorrencia['sql'], 'parametros': ocorrencia['parametros'],
+                                  'rota': ocorrencia['rota'], 'quando': ocorrencia['quando']}
+        if formato['plano'] is None and ocorrencia.get('plano') is not None:
+            formato['plano'] = ocorrencia['plano']
+        return novo
+
+    def relatorio(self, ordenar='total_ms', limite=None):
+        formatos = [{
+            **formato,
+            'rotas': dict(formato['rotas']),
+            'total_ms': round(formato['total_ms'], 3),
+            'max_ms': round(formato['max_ms'], 3),
+            'media_ms': round(formato['total_ms'] / formato['ocorrencias'], 3),
+            'varredura_completa': varredura_completa(formato['plano']),
+        } for formato in self.formatos.values()]
+        formatos.sort(key=lambda formato: formato[ordenar], reverse=True)
+        return formatos[:limite] if limite else formatos
+
+
+ORDENACOES = ('total_ms', 'max_ms', 'media_ms', 'ocorrencias')
+
+
+class ConsultasLentas:
+    # Registra toda consulta acima de CONSULTAS_LENTAS_LIMIAR_MS com a rota
+    # de origem, o EXPLAIN QUERY PLAN do SQLite (obtido uma vez por formato)
+    # e os parâmetros, se CONSULTAS_LENTAS_PARAMETROS estiver ligado. As ocorrências são agregadas por formato
+    # normalizado neste processo e, se CONSULTAS_LENTAS_ARQUIVO estiver
+    # definido, gravadas em NDJSON para o relatório de todos os workers
+    # (flask --app src.main consultas-lentas).
+
+    def __init__(self):
+        self.limiar_ms = None
+        self.parametros = False
+        self.arquivo = None
+        self._lock = threading.Lock()
+        self.agregador = AgregadorConsultas()
+
+    @property
+    def ativo(self):
+        return self.limiar_ms is not None
+
+    def init_app(self, app):
+        limiar = app.config.get('CONSULTAS_LENTAS_LIMIAR_MS')
+        self.limiar_ms = float(limiar) if limiar is not None else None
+        self.parametros = app.config.get('CONSULTAS_LENTAS_PARAMETROS', False)
+        self.arquivo = app.config.get('CONSULTAS_LENTAS_ARQUIVO')
+        self.agregador.maximo = app.config.get('CONSULTAS_LENTAS_MAXIMO', MAXIMO_PADRAO)
+        if not self.ativo:
+            return
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            if not event.contains(engine, 'after_cursor_execute', _depois_da_consulta):
+                event.listen(engine, 'before_cursor_execute', _antes_da_consulta)
+                event.listen(engine, 'after_cursor_execute', _depois_da_consulta)
+
+    def registrar(self, cursor, sql, parametros, executemany, duracao_ms):
+        formato = normalizar(sql)
+        with self._lock:
+            conhecido = formato in self.agregador.formatos
+        # O plano é obtido só na primeira vez que o formato aparece
+        plano = None if conhecido else _explicar(cursor, sql, parametros, executemany)
+        rota = FORA_DE_REQUISICAO
+        if has_request_context():
+            rota = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        ocorrencia = {
+            'quando': datetime.utcnow().isoformat(timespec='seconds'),
+            'duracao_ms': round(duracao_ms, 3),
+            'rota': rota,
+            'formato': formato,
+            'sql': _resumir(sql),
+            'parametros': (_resumir_parametros(parametros, executemany) if self.parametros
+                           else PARAMETROS_OMITIDOS),
+            'plano': plano,
+        }
+        with self._lock:
+            novo = self.agregador.adicionar(ocorrencia)
+        logger.warning('Consulta lenta (%.1f ms) em %s: %s %s', duracao_ms, rota, formato, ocorrencia['parametros'])
+        if novo and plano:
+            logger.warning('Plano: %s', ' | '.join(plano))
+        if self.arquivo:
+            with self._lock, open(self.arquivo, 'a') as arquivo:
+                arquivo.write(json.dumps(ocorrencia, ensure_ascii=False, default=str) + '\n')
+
+    def relatorio(self, ordenar='total_ms', limite=None):
+        with self._lock:
+            return {
+                'limiar_ms': self.limiar_ms,
+                'formatos_descartados': self.agregador.descartadas,
+                'consultas': self.agregador.relatorio(ordenar, limite),
+            }
+
+    def limpar(self):
+        with self._lock:
+            self.agregador = AgregadorConsultas(self.agregador.maximo)
+
+
+consultas_lentas = ConsultasLentas()
+
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    # Mede o execute(); no SQLite ele já produz a primeira linha, o que cobre
+    # ordenações e agregações, mas não o fetch das linhas seguintes
+    context._inicio_consulta_lenta = time.perf_counter()
+
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, '_inicio_consulta_lenta', None)
+    if inicio is None or consultas_lentas.limiar_ms is None:
+        return
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    if duracao_ms >= consultas_lentas.limiar_ms:
+        consultas_lentas.registrar(cursor, statement, parameters, executemany, duracao_ms)
+
+
+def _explicar(cursor, sql, parametros, executemany):
+    comando = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    if comando not in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE'):
+        return None
+    if executemany:
+        parametros = parametros[0] if parametros else ()
+    try:
+        # Usa a mesma conexão DBAPI, que enxerga as tabelas temporárias e a
+        # transação em andamento; a consulta original não é executada de novo
+        explicacao = cursor.connection.cursor()
+        try:
+            linhas = explicacao.execute(f'EXPLAIN QUERY PLAN {sql}', parametros or ()).fetchall()
+        finally:
+            explicacao.close()
+    except Exception as e:
+        return [f'(plano indisponível: {e})']
+    # Linhas: (id, pai, não usado, detalhe); a indentação reproduz a árvore do sqlite3 shell
+    profundidade = {0: -1}
+    plano = []
+    for id_no, pai, _, detalhe in linhas:
+        profundidade[id_no] = profundidade.get(pai, -1) + 1
+        plano.append('  ' * profundidade[id_no] + detalhe)
+    return plano
+
+
+def _resumir(texto, tamanho=TAMANHO_MAXIMO_TEXTO):
+    return texto if len(texto) <= tamanho else texto[:tamanho] + '...'
+
+
+def _resumir_parametros(parametros, executemany):
+    if executemany:
+        return _resumir(f'{len(parametros)} linhas, primeira: {parametros[0]!r}' if parametros else '[]')
+    return _resumir(repr(parametros))
+
+
+def relatorio_arquivo(caminho, ordenar='total_ms', limite=None, maximo=MAXIMO_PADRAO):
+    # Agrega as ocorrências gravadas por todos os workers em CONSULTAS_LENTAS_ARQUIVO
+    agregador = AgregadorConsultas(maximo)
+    with open(caminho) as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                agregador.adicionar(json.loads(linha))
+    return agregador.relatorio(ordenar, limite)
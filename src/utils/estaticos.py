@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from flask import Response, request
+
+# brotli é opcional: sem ele só a variante gzip é gerada
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+# Arquivos gerados pelo build que não são servidos como ativos próprios
+EXTENSOES_COMPRIMIDAS = ('.gz', '.br')
+ARQUIVO_MANIFESTO = 'manifest.json'
+# Abaixo disso a compressão não compensa o cabeçalho extra
+TAMANHO_MINIMO_COMPRESSAO = 256
+TIPOS_COMPRIMIVEIS = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+
+
+class Ativo:
+    __slots__ = ('nome', 'nome_publico', 'mimetype', 'conteudo', 'variantes', 'hash')
+
+    def __init__(self, nome, nome_publico, mimetype, conteudo, variantes, hash_conteudo):
+        self.nome = nome
+        self.nome_publico = nome_publico
+        self.mimetype = mimetype
+        self.conteudo = conteudo
+        self.variantes = variantes
+        self.hash = hash_conteudo
+
+
+def _hash(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()[:12]
+
+
+def _nome_com_hash(nome, hash_conteudo):
+    base, extensao = os.path.splitext(nome)
+    return f'{base}.{hash_conteudo}{extensao}'
+
+
+def _comprimivel(mimetype, conteudo):
+    return len(conteudo) >= TAMANHO_MINIMO_COMPRESSAO and mimetype.startswith(TIPOS_COMPRIMIVEIS)
+
+
+def _variantes(caminho, mimetype, conteudo):
+    # Usa os arquivos .br/.gz gerados pelo build quando estão atualizados;
+    # caso contrário comprime uma única vez, na inicialização
+    variantes = {}
+    if not _comprimivel(mimetype, conteudo):
+        return variantes
+    geradores = {'gzip': ('.gz', lambda dados: gzip.compress(dados, compresslevel=9, mtime=0))}
+    if brotli is not None:
+        geradores['br'] = ('.br', lambda dados: brotli.compress(dados, quality=11))
+    for codificacao, (extensao, comprimir) in geradores.items():
+        pre_comprimido = caminho + extensao
+        if os.path.exists(pre_comprimido) and os.path.getmtime(pre_comprimido) >= os.path.getmtime(caminho):
+            with open(pre_comprimido, 'rb') as arquivo:
+                dados = arquivo.read()
+        else:
+            dados = comprimir(conteudo)
+        if len(dados) < len(conteudo):
+            variantes[codificacao] = dados
+    return variantes
+
+
+class ManifestoEstaticos:
+    # Carrega os arquivos estáticos na memória uma vez, na inicialização.
+    # Arquivos referenciados pelo index.html ganham um nome com o hash do
+    # conteúdo (styles.<hash>.css) e são servidos com cache imutável; o HTML
+    # é reescrito para apontar para esses nomes e sempre revalidado.
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.ativos = {}
+        self.indice = None
+        if pasta and os.path.isdir(pasta):
+            self._construir()
+
+    def _arquivos(self):
+        for raiz, _, arquivos in os.walk(self.pasta):
+            for nome in arquivos:
+                if nome.endswith(EXTENSOES_COMPRIMIDAS) or nome == ARQUIVO_MANIFESTO:
+                    continue
+                caminho = os.path.join(raiz, nome)
+                yield os.path.relpath(caminho, self.pasta).replace(os.sep, '/'), caminho
+
+    def _construir(self):
+        arquivos = dict(self._arquivos())
+        conteudos = {}
+        for nome, caminho in arquivos.items():
+            with open(caminho, 'rb') as arquivo:
+                conteudos[nome] = arquivo.read()
+
+        # Ativos com impressão digital (tudo menos HTML)
+        nomes_publicos = {}
+        for nome, conteudo in conteudos.items():
+            if not nome.endswith('.html'):
+                nomes_publicos[nome] = _nome_com_hash(nome, _hash(conteudo))
+
+        for nome, caminho in arquivos.items():
+            conteudo = conteudos[nome]
+            mimetype = mimetypes.guess_type(nome)[0] or 'application/octet-stream'
+            nome_publico = nomes_publicos.get(nome, nome)
+            if nome.endswith('.html'):
+                conteudo = self._reescrever_referencias(conteudo, nomes_publicos)
+                variantes = {}
+                if _comprimivel(mimetype, conteudo):
+                    variantes['gzip'] = gzip.compress(conteudo, compresslevel=9, mtime=0)
+                    if brotli is not None:
+                        variantes['br'] = brotli.compress(conteudo, quality=11)
+            else:
+                variantes = _variantes(caminho, mimetype, conteudo)
+            ativo = Ativo(nome, nome_publico, mimetype, conteudo, variantes, _hash(conteudo))
+            self.ativos[nome_publico] = ativo
+            # O nome original continua acessível, mas sem cache imutável
+            self.ativos.setdefault(nome, ativo)
+
+        self.indice = self.ativos.get('index.html')
+
+    @staticmethod
+    def _reescrever_referencias(html, nomes_publicos):
+        texto = html.decode('utf-8')
+        for nome, nome_publico in nomes_publicos.items():
+            texto = re.sub(r'(\b(?:href|src)=["\'])/?' + re.escape(nome) + r'(["\'])',
+                           lambda m: m.group(1) + nome_publico + m.group(2), texto)
+        return texto.encode('utf-8')
+
+    def gravar_build(self):
+        # Grava as variantes .gz/.br ao lado dos originais e o manifesto
+        # (nome original -> nome com hash), para não comprimir na inicialização
+        manifesto = {}
+        for nome, ativo in self.ativos.items():
+            if nome != ativo.nome:
+                continue
+            manifesto[ativo.nome] = ativo.nome_publico
+            if ativo.nome.endswith('.html'):
+                continue
+            caminho = os.path.join(self.pasta, ativo.nome)
+            for codificacao, dados in ativo.variantes.items():
+                extensao = '.gz' if codificacao == 'gzip' else '.br'
+                with open(caminho + extensao, 'wb') as arquivo:
+                    arquivo.write(dados)
+        with open(os.path.join(self.pasta, ARQUIVO_MANIFESTO), 'w') as arquivo:
+            json.dump(manifesto, arquivo, indent=2, sort_keys=True)
+        return manifesto
+
+    def obter(self, caminho):
+        return self.ativos.get(caminho)
+
+    def responder(self, ativo, caminho_solicitado):
+        imutavel = caminho_solicitado == ativo.nome_publico and ativo.nome_publico != ativo.nome
+        codificacao = self._escolher_codificacao(ativo)
+        corpo = ativo.variantes[codificacao] if codificacao else ativo.conteudo
+        etag = f'{ativo.hash}-{codificacao}' if codificacao else ativo.hash
+
+        if request.if_none_match.contains(etag):
+            resposta = Response(status=304)
+        else:
+            resposta = Response(corpo, mimetype=ativo.mimetype)
+            if codificacao:
+                resposta.headers['Content-Encoding'] = codificacao
+        resposta.set_etag(etag)
+        resposta.headers['Cache-Control'] = CACHE_IMUTAVEL if imutavel else CACHE_REVALIDAR
+        if ativo.variantes:
+            resposta.vary.add('Accept-Encoding')
+        return resposta
+
+    @staticmethod
+    def _escolher_codificacao(ativo):
+        aceitas = request.accept_encodings
+        for codificacao in ('br', 'gzip'):
+            if codificacao in ativo.variantes and aceitas[codificacao] > 0:
+                return codificacao
+        return None
@@ -0,0 +1,175 @@
+import json
+import queue
+import threading
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from src.models import db
+from src.models.alteracoes import OPERACOES
+
+# Valores padrão; podem ser alterados pela configuração do app
+FILA_MAXIMA_PADRAO = 256
+HEARTBEAT_PADRAO = 15
+INTERVALO_PADRAO = 1.0
+MAXIMO_CLIENTES_PADRAO = 50
+# Alterações lidas do registro por consulta
+LOTE = 500
+
+# Evento enviado a um cliente cuja fila encheu: os eventos perdidos devem ser
+# recuperados por /api/changes a partir do último token aplicado
+RESSINCRONIZAR = 'resync'
+
+
+class Assinatura:
+    __slots__ = ('fila', 'transbordou')
+
+    def __init__(self, tamanho):
+        self.fila = queue.Queue(tamanho)
+        self.transbordou = False
+
+    def entregar(self, item):
+        if self.transbordou:
+            return
+        try:
+            self.fila.put_nowait(item)
+        except queue.Full:
+            # Cliente lento: descarta o que estava pendente e pede ressincronização
+            self.transbordou = True
+            while True:
+                try:
+                    self.fila.get_nowait()
+                except queue.Empty:
+                    break
+            self.fila.put_nowait((None, RESSINCRONIZAR, {}))
+
+    def proximo(self, espera):
+        # (token, tipo, dados) ou None se nada chegou dentro da espera
+        try:
+            return self.fila.get(timeout=espera)
+        except queue.Empty:
+            return None
+
+
+class CentralEventos:
+    # Pub/sub em processo para o stream SSE (/api/eventos). A origem dos
+    # eventos é o registro de alterações (tabela alteracoes, mantida por
+    # triggers), lido por uma thread do worker: como o arquivo do SQLite é
+    # compartilhado, alterações feitas por qualquer worker (ou por escritas
+    # fora das rotas) chegam a todos os clientes. Um commit no próprio
+    # processo acorda a thread na hora; os demais são vistos em até
+    # EVENTOS_INTERVALO segundos. Cada cliente tem uma fila limitada.
+
+    def __init__(self):
+        self.app = None
+        self.ativos = False
+        self.fila_maxima = FILA_MAXIMA_PADRAO
+        self.heartbeat = HEARTBEAT_PADRAO
+        self.intervalo = INTERVALO_PADRAO
+        self.maximo_clientes = MAXIMO_CLIENTES_PADRAO
+        self._assinaturas = set()
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._thread = None
+        self.ultimo_token = None
+        self.publicados = 0
+
+    def init_app(self, app):
+        self.app = app
+        self.ativos = app.config.get('EVENTOS_ATIVOS', True)
+        self.fila_maxima = app.config.get('EVENTOS_FILA_MAXIMA', FILA_MAXIMA_PADRAO)
+        self.heartbeat = app.config.get('EVENTOS_HEARTBEAT', HEARTBEAT_PADRAO)
+        self.intervalo = app.config.get('EVENTOS_INTERVALO', INTERVALO_PADRAO)
+        self.maximo_clientes = app.config.get('EVENTOS_MAXIMO_CLIENTES', MAXIMO_CLIENTES_PADRAO)
+        if self.ativos and not event.contains(Session, 'after_commit', _acordar_apos_commit):
+            event.listen(Session, 'after_commit', _acordar_apos_commit)
+
+    def assinar(self):
+        # None quando o limite de clientes do worker foi atingido
+        with self._lock:
+            if len(self._assinaturas) >= self.maximo_clientes:
+                return None
+            assinatura = Assinatura(self.fila_maxima)
+            self._assinaturas.add(assinatura)
+            if self._thread is None or not self._thread.is_alive():
+                # O ponto de partida da thread é lido aqui, antes de a rota
+                # buscar o que o cliente perdeu: toda alteração posterior a
+                # ele chega pela fila, e a sobreposição é descartada pelo token
+                self.ultimo_token = token_atual()
+                self._thread = threading.Thread(target=self._acompanhar, name='eventos', daemon=True)
+                self._thread.start()
+        return assinatura
+
+    def cancelar(self, assinatura):
+        with self._lock:
+            self._assinaturas.discard(assinatura)
+
+    def acordar(self):
+        if self._assinaturas:
+            self._acordar.set()
+
+    def publicar(self, token, tipo, dados):
+        with self._lock:
+            assinaturas = list(self._assinaturas)
+        for assinatura in assinaturas:
+            assinatura.entregar((token, tipo, dados))
+        self.publicados += 1
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                'ativos': self.ativos,
+                'clientes': len(self._assinaturas),
+                'maximo_clientes': self.maximo_clientes,
+                'ultimo_token': self.ultimo_token,
+                'publicados': self.publicados,
+            }
+
+    def _acompanhar(self):
+        # Segue o registro de alterações enquanto houver clientes conectados
+        with self.app.app_context():
+            # Cada cliente recupera o que perdeu antes de conectar pela rota
+            # (Last-Event-ID); a thread só publica o que vier depois de
+            # ultimo_token, definido em assinar()
+            while True:
+                self._acordar.wait(self.intervalo)
+                self._acordar.clear()
+                with self._lock:
+                    if not self._assinaturas:
+                        self._thread = None
+                        return
+                try:
+                    for token, tipo, dados in alteracoes_desde(self.ultimo_token):
+                        self.publicar(token, tipo, dados)
+                        self.ultimo_token = token
+                except Exception as e:
+                    self.app.logger.warning('Falha ao ler o registro de alterações: %s', e)
+
+
+eventos = CentralEventos()
+
+
+def _acordar_apos_commit(session):
+    eventos.acordar()
+
+
+def token_atual():
+    with db.engine.connect() as conn:
+        return conn.execute(text('SELECT COALESCE(MAX(seq), 0) FROM alteracoes')).scalar()
+
+
+def alteracoes_desde(token, limite=LOTE):
+    # Lê direto do engine, sem a sessão da requisição, para não prender uma
+    # conexão durante o stream
+    with db.engine.connect() as conn:
+        linhas = conn.execute(text(
+            'SELECT seq, tabela, registro_id, operacao FROM alteracoes WHERE seq > :token ORDER BY seq LIMIT :limite'
+        ), {'token': token, 'limite': limite}).all()
+    return [(seq, 'change', {'entidade': tabela, 'id': registro_id, 'operacao': OPERACOES[operacao]})
+            for seq, tabela, registro_id, operacao in linhas]
+
+
+def formatar(token, tipo, dados):
+    # Formato text/event-stream; o id permite retomar com Last-Event-ID
+    linhas = [f'id: {token}'] if token is not None else []
+    linhas.append(f'event: {tipo}')
+    linhas.append('data: ' + json.dumps(dados, ensure_ascii=False, separators=(',', ':')))
+    return '\n'.join(linhas) + '\n\n'
@@ -0,0 +1,183 @@
+import csv
+import json
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import insert, update
+from src.models import db
+
+# Quantidade de linhas validadas e gravadas por transação
+TAMANHO_LOTE = 500
+
+MODOS = ('inserir', 'upsert')
+
+
+class ImportacaoInvalida(ValueError):
+    pass
+
+
+def ler_modo():
+    modo = request.args.get('modo', 'inserir')
+    if modo not in MODOS:
+        raise ImportacaoInvalida(f'Modo inválido: use {" ou ".join(MODOS)}')
+    return modo
+
+
+def _detectar_formato(tipo_conteudo, nome_arquivo):
+    formato = request.args.get('formato')
+    if formato:
+        if formato not in ('csv', 'ndjson'):
+            raise ImportacaoInvalida('Formato inválido: use csv ou ndjson')
+        return formato
+    tipo_conteudo = (tipo_conteudo or '').lower()
+    nome_arquivo = (nome_arquivo or '').lower()
+    if 'csv' in tipo_conteudo or nome_arquivo.endswith('.csv'):
+        return 'csv'
+    if 'ndjson' in tipo_conteudo or 'jsonl' in tipo_conteudo or nome_arquivo.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    raise ImportacaoInvalida('Não foi possível identificar o formato: informe ?formato=csv ou ?formato=ndjson')
+
+
+def _linhas_texto(stream):
+    # Decodifica o arquivo linha a linha, sem carregá-lo inteiro em memória
+    primeira = True
+    for linha in stream:
+        texto = linha.decode('utf-8')
+        if primeira:
+            texto = texto.lstrip('\ufeff')
+            primeira = False
+        yield texto
+
+
+def _registros_csv(linhas):
+    for numero, registro in enumerate(csv.DictReader(linhas), start=1):
+        yield numero, registro
+
+
+def _registros_ndjson(linhas):
+    numero = 0
+    for texto in linhas:
+        if not texto.strip():
+            continue
+        numero += 1
+        try:
+            registro = json.loads(texto)
+        except ValueError:
+            yield numero, None
+            continue
+        yield numero, registro if isinstance(registro, dict) else None
+
+
+def ler_registros():
+    # Aceita upload multipart no campo "arquivo" ou o arquivo direto no corpo
+    arquivo = request.files.get('arquivo')
+    if arquivo:
+        formato = _detectar_formato(arquivo.mimetype, arquivo.filename)
+        stream = arquivo.stream
+    else:
+        formato = _detectar_formato(request.mimetype, None)
+        stream = request.stream
+
+    linhas = _linhas_texto(stream)
+    return _registros_csv(linhas) if formato == 'csv' else _registros_ndjson(linhas)
+
+
+def texto_obrigatorio(registro, campo):
+    valor = registro.get(campo)
+    valor = str(valor).strip() if valor is not None else ''
+    if not valor:
+        raise ValueError(f'Campo obrigatório: {campo}')
+    return valor
+
+
+def texto_opcional(registro, campo):
+    valor = registro.get(campo)
+    valor = str(valor).strip() if valor is not None else ''
+    return valor or None
+
+
+def data_obrigatoria(registro, campo):
+    valor = texto_obrigatorio(registro, campo)
+    try:
+        # date.fromisoformat é bem mais rápido que strptime para YYYY-MM-DD
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f'Data inválida em {campo}: use o formato YYYY-MM-DD')
+
+
+def importar(modelo, registros, validar, chave, modo='inserir', chave_unica=True, tamanho_lote=TAMANHO_LOTE):
+    # Valida e grava os registros em lotes. A existência da chave é verificada
+    # com uma única consulta IN por lote e as linhas são gravadas com
+    # executemany, uma transação por lote. Erros são reportados por linha.
+    relatorio = {'total': 0, 'inseridos': 0, 'atualizados': 0, 'erros': []}
+    verificar_chave = chave_unica or modo == 'upsert'
+    vistos = set()
+    lote = []
+
+    for linha, registro in registros:
+        relatorio['total'] += 1
+        if registro is None:
+            relatorio['erros'].append({'linha': linha, 'error': 'Linha mal formatada'})
+            continue
+        try:
+            dados = validar(registro)
+        except ValueError as e:
+            relatorio['erros'].append({'linha': linha, 'error': str(e)})
+            continue
+
+        valor_chave = dados.get(chave)
+        if verificar_chave and valor_chave is not None:
+            if valor_chave in vistos:
+                relatorio['erros'].append({'linha': linha, 'error': f'{chave} repetido no arquivo'})
+                continue
+            vistos.add(valor_chave)
+
+        lote.append((linha, dados))
+        if len(lote) >= tamanho_lote:
+            _gravar_lote(modelo, lote, chave, modo, verificar_chave, relatorio)
+            lote = []
+
+    if lote:
+        _gravar_lote(modelo, lote, chave, modo, verificar_chave, relatorio)
+
+    relatorio['erros'].sort(key=lambda erro: erro['linha'])
+    return relatorio
+
+
+def _gravar_lote(modelo, lote, chave, modo, verificar_chave, relatorio):
+    coluna = getattr(modelo, chave)
+    existentes = {}
+    if verificar_chave:
+        valores = {dados[chave] for _, dados in lote if dados.get(chave) is not None}
+        if valores:
+            for id_existente, valor in db.session.query(modelo.id, coluna).filter(coluna.in_(valores)):
+                existentes.setdefault(valor, []).append(id_existente)
+
+    agora = datetime.utcnow()
+    novos, atualizacoes, linhas_gravadas = [], [], []
+    for linha, dados in lote:
+        ids = existentes.get(dados.get(chave))
+        if not ids:
+            novos.append(dados)
+        elif modo != 'upsert':
+            relatorio['erros'].append({'linha': linha, 'error': f'{chave} já existe'})
+            continue
+        elif len(ids) > 1:
+            relatorio['erros'].append({'linha': linha, 'error': f'{chave} corresponde a mais de um registro'})
+            continue
+        else:
+            atualizacoes.append({**dados, 'id': ids[0], 'updated_at': agora})
+        linhas_gravadas.append(linha)
+
+    try:
+        if novos:
+            db.session.execute(insert(modelo), novos)
+        if atualizacoes:
+            db.session.execute(update(modelo), atualizacoes)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        relatorio['erros'].extend({'linha': linha, 'error': str(e)} for linha in linhas_gravadas)
+        return
+
+    relatorio['inseridos'] += len(novos)
+    relatorio['atualizados'] += len(atualizacoes)
@@ -0,0 +1,43 @@
+from flask.json.provider import DefaultJSONProvider
+
+# orjson é opcional: sem ele o app usa o codificador padrão do Flask
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+
+class ProvedorJSONRapido(DefaultJSONProvider):
+    # Serializa com orjson (em C, várias vezes mais rápido que o módulo json
+    # para listas grandes) e gera o corpo da resposta direto em bytes.
+    # Chamadas com argumentos extras do json padrão usam o provedor do Flask.
+
+    def _opcoes(self):
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opcoes |= orjson.OPT_SORT_KEYS
+        return opcoes
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._opcoes()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        corpo = orjson.dumps(obj, default=self.default, option=self._opcoes())
+        return self._app.response_class(corpo, mimetype=self.mimetype)
+
+
+def configurar_json(app):
+    # JSON_ORDENAR_CHAVES=False evita o custo de ordenar as chaves de cada objeto
+    if app.config.get('JSON_RAPIDO', True):
+        app.json = ProvedorJSONRapido(app)
+    app.json.sort_keys = app.config.get('JSON_ORDENAR_CHAVES', False)
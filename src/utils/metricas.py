@@ -0,0 +1,213 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from src.models import db
+from src.models.sessao import BANCO_PRINCIPAL
+
+# Limites dos histogramas (segundos e número de consultas)
+LIMITES_TEMPO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+SEM_ROTA = '<sem rota>'
+
+
+class Histograma:
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.soma += valor
+        self.total += 1
+        indice = bisect_left(self.limites, valor)
+        if indice < len(self.contagens):
+            self.contagens[indice] += 1
+
+
+class Metricas:
+    # Instrumentação por requisição: número de consultas e tempo gasto no
+    # banco (eventos do engine), tempo de serialização JSON e tempo total.
+    # Os valores vão no cabeçalho Server-Timing de cada resposta e são
+    # agregados por rota em histogramas expostos em /api/_metrics no formato
+    # texto do Prometheus. Cada worker mantém os seus próprios números.
+    # Desativada (METRICAS_ATIVAS=False), nenhum gancho é registrado.
+
+    def __init__(self):
+        self.ativa = False
+        self._lock = threading.Lock()
+        self._zerar()
+
+    def _zerar(self):
+        self.requisicoes = {}
+        self.histogramas = {}
+        self.bancos = {}
+
+    def init_app(self, app):
+        self.ativa = app.config.get('METRICAS_ATIVAS', True)
+        if not self.ativa:
+            return
+        with app.app_context():
+            for engine in db.engines.values():
+                _registrar_eventos_engine(engine)
+        app.before_request(_iniciar_requisicao)
+        app.after_request(self._finalizar_requisicao)
+        _medir_serializacao(app)
+
+    def _finalizar_requisicao(self, resposta):
+        dados = g.pop('metricas', None)
+        if dados is None:
+            return resposta
+        total = time.perf_counter() - dados['inicio']
+        rota = request.url_rule.rule if request.url_rule else SEM_ROTA
+        descricao = f"{dados['consultas']} consultas"
+        if dados['bancos']:
+            descricao += f" em {'+'.join(sorted(dados['bancos']))}"
+        resposta.headers.add('Server-Timing', (
+            f"db;dur={dados['db'] * 1000:.2f};desc=\"{descricao}\", "
+            f"json;dur={dados['serializacao'] * 1000:.2f}, total;dur={total * 1000:.2f}"
+        ))
+        self.registrar(request.method, rota, resposta.status_code, total, dados)
+        return resposta
+
+    def registrar(self, metodo, rota, status, total, dados):
+        chave = (metodo, rota)
+        with self._lock:
+            self.requisicoes[(metodo, rota, status)] = self.requisicoes.get((metodo, rota, status), 0) + 1
+            if dados['bancos']:
+                # Engine(s) que atenderam a requisição: principal, leitura ou ambos
+                banco = (metodo, rota, '+'.join(sorted(dados['bancos'])))
+                self.bancos[banco] = self.bancos.get(banco, 0) + 1
+            histogramas = self.histogramas.get(chave)
+            if histogramas is None:
+                histogramas = self.histogramas[chave] = {
+                    'requisicao_segundos': Histograma(LIMITES_TEMPO),
+                    'db_segundos': Histograma(LIMITES_TEMPO),
+                    'db_consultas': Histograma(LIMITES_CONSULTAS),
+                    'serializacao_segundos': Histograma(LIMITES_TEMPO),
+                }
+            histogramas['requisicao_segundos'].observar(total)
+            histogramas['db_segundos'].observar(dados['db'])
+            histogramas['db_consultas'].observar(dados['consultas'])
+            histogramas['serializacao_segundos'].observar(dados['serializacao'])
+
+    def limpar(self):
+        with self._lock:
+            self._zerar()
+
+    def exportar(self, extras=()):
+        # Formato texto do Prometheus (text/plain; version=0.0.4)
+        with self._lock:
+            requisicoes = dict(self.requisicoes)
+            bancos = dict(self.bancos)
+            histogramas = {chave: {nome: (h.limites, list(h.contagens), h.soma, h.total) for nome, h in valores.items()}
+                           for chave, valores in self.histogramas.items()}
+
+        linhas = [
+            '# HELP api_requisicoes_total Requisições atendidas por rota e status.',
+            '# TYPE api_requisicoes_total counter',
+        ]
+        for (metodo, rota, status), total in sorted(requisicoes.items()):
+            linhas.append(f'api_requisicoes_total{_rotulos(metodo=metodo, rota=rota, status=status)} {total}')
+
+        linhas.append('# HELP api_requisicoes_banco_total Requisições por rota e engine que as atendeu.')
+        linhas.append('# TYPE api_requisicoes_banco_total counter')
+        for (metodo, rota, banco), total in sorted(bancos.items()):
+            linhas.append(f'api_requisicoes_banco_total{_rotulos(metodo=metodo, rota=rota, banco=banco)} {total}')
+
+        descricoes = {
+            'requisicao_segundos': 'Duração das requisições.',
+            'db_segundos': 'Tempo gasto em consultas SQL por requisição.',
+            'db_consultas': 'Consultas SQL por requisição.',
+            'serializacao_segundos': 'Tempo de serialização JSON por requisição.',
+        }
+        for nome, descricao in descricoes.items():
+            linhas.append(f'# HELP api_{nome} {descricao}')
+            linhas.append(f'# TYPE api_{nome} histogram')
+            for (metodo, rota), valores in sorted(histogramas.items()):
+                limites, contagens, soma, total = valores[nome]
+                acumulado = 0
+                for limite, contagem in zip(limites, contagens):
+                    acumulado += contagem
+                    linhas.append(f'api_{nome}_bucket{_rotulos(metodo=metodo, rota=rota, le=_numero(limite))} {acumulado}')
+                linhas.append(f'api_{nome}_bucket{_rotulos(metodo=metodo, rota=rota, le="+Inf")} {total}')
+                linhas.append(f'api_{nome}_sum{_rotulos(metodo=metodo, rota=rota)} {_numero(soma)}')
+                linhas.append(f'api_{nome}_count{_rotulos(metodo=metodo, rota=rota)} {total}')
+
+        for nome, tipo, descricao, valor in extras:
+            linhas.append(f'# HELP api_{nome} {descricao}')
+            linhas.append(f'# TYPE api_{nome} {tipo}')
+            linhas.append(f'api_{nome} {_numero(valor)}')
+        return '\n'.join(linhas) + '\n'
+
+
+metricas = Metricas()
+
+
+def _rotulos(**valores):
+    pares = []
+    for nome, valor in valores.items():
+        texto = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{nome}="{texto}"')
+    return '{' + ','.join(pares) + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _metricas_atuais():
+    return g.get('metricas') if has_app_context() else None
+
+
+def _iniciar_requisicao():
+    g.metricas = {'inicio': time.perf_counter(), 'consultas': 0, 'db': 0.0, 'serializacao': 0.0, 'bancos': set()}
+
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('inicio_consultas', []).append(time.perf_counter())
+
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info['inicio_consultas'].pop()
+    dados = _metricas_atuais()
+    if dados is not None:
+        dados['consultas'] += 1
+        dados['bancos'].add(conn.info.get('banco', BANCO_PRINCIPAL))
+        dados['db'] += time.perf_counter() - inicio
+
+
+def _erro_na_consulta(contexto_excecao):
+    # Consultas que falham não disparam after_cursor_execute
+    inicios = contexto_excecao.connection.info.get('inicio_consultas') if contexto_excecao.connection else None
+    if inicios:
+        inicios.pop()
+
+
+def _registrar_eventos_engine(engine):
+    if event.contains(engine, 'before_cursor_execute', _antes_da_consulta):
+        return
+    event.listen(engine, 'before_cursor_execute', _antes_da_consulta)
+    event.listen(engine, 'after_cursor_execute', _depois_da_consulta)
+    event.listen(engine, 'handle_error', _erro_na_consulta)
+
+
+def _medir_serializacao(app):
+    # jsonify() passa por app.json.response, tanto no provedor padrão quanto no orjson
+    responder = app.json.response
+
+    def response(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return responder(*args, **kwargs)
+        finally:
+            dados = _metricas_atuais()
+            if dados is not None:
+                dados['serializacao'] += time.perf_counter() - inicio
+
+    app.json.response = response
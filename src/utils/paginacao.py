@@ -0,0 +1,126 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import tuple_
+
+# Tamanho de página usado quando o cliente não informa "limit"
+LIMITE_PADRAO = 50
+# Maior página aceita, independente do que o cliente pedir
+LIMITE_MAXIMO = 500
+
+
+class ParametroInvalido(ValueError):
+    pass
+
+
+def paginacao_solicitada():
+    # Sem "limit" nem "cursor" as rotas mantêm a resposta antiga (lista completa)
+    return 'limit' in request.args or 'cursor' in request.args
+
+
+def ler_limite():
+    valor = request.args.get('limit')
+    if valor is None or valor == '':
+        return LIMITE_PADRAO
+    try:
+        limite = int(valor)
+    except ValueError:
+        raise ParametroInvalido('Parâmetro limit deve ser um número inteiro')
+    if limite < 1:
+        raise ParametroInvalido('Parâmetro limit deve ser maior que zero')
+    return min(limite, LIMITE_MAXIMO)
+
+
+def ler_data(nome):
+    # Parâmetro de data YYYY-MM-DD como datetime; None quando não informado
+    valor = request.args.get(nome)
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d')
+    except ValueError:
+        raise ParametroInvalido(f'Parâmetro {nome} deve estar no formato YYYY-MM-DD')
+
+
+def ler_ids():
+    # ?ids=1,2,3 pede vários itens de uma vez; None quando não informado
+    valor = request.args.get('ids')
+    if valor is None:
+        return None
+    try:
+        ids = list(dict.fromkeys(int(item) for item in valor.split(',') if item.strip()))
+    except ValueError:
+        raise ParametroInvalido('Parâmetro ids deve ser uma lista de inteiros separados por vírgula')
+    if len(ids) > LIMITE_MAXIMO:
+        raise ParametroInvalido(f'Parâmetro ids aceita no máximo {LIMITE_MAXIMO} valores')
+    return ids
+
+
+def buscar_ids(query, coluna, ids):
+    # Um único WHERE id IN (...); a resposta segue a ordem pedida e omite os
+    # ids que não existem
+    if not ids:
+        return []
+    encontrados = {getattr(item, coluna.key): item for item in query.filter(coluna.in_(ids))}
+    return [encontrados[id] for id in ids if id in encontrados]
+
+
+def _valor_cursor(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return valor
+
+
+def codificar_cursor(valores):
+    bruto = json.dumps([_valor_cursor(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor, colunas):
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        if not isinstance(valores, list) or len(valores) != len(colunas):
+            raise ValueError
+        convertidos = []
+        for coluna, valor in zip(colunas, valores):
+            tipo = coluna.type.python_type
+            if valor is not None and tipo is datetime:
+                valor = datetime.fromisoformat(valor)
+            elif valor is not None and tipo is date:
+                valor = date.fromisoformat(valor)
+            convertidos.append(valor)
+        return convertidos
+    except (ValueError, TypeError):
+        raise ParametroInvalido('Cursor inválido')
+
+
+def paginar(query, colunas, descendente=False, serializar=None):
+    # Paginação por chave (keyset): o cursor guarda os valores das colunas de
+    # ordenação do último item, e a próxima página começa logo depois deles.
+    # As colunas devem formar uma chave única (terminar em id) e ser indexadas.
+    limite = ler_limite()
+    cursor = request.args.get('cursor')
+    serializar = serializar or (lambda obj: obj.to_dict())
+
+    if cursor:
+        valores = decodificar_cursor(cursor, colunas)
+        chave = tuple_(*colunas) if len(colunas) > 1 else colunas[0]
+        limite_chave = tuple_(*valores) if len(colunas) > 1 else valores[0]
+        query = query.filter(chave < limite_chave if descendente else chave > limite_chave)
+
+    ordem = [coluna.desc() if descendente else coluna.asc() for coluna in colunas]
+    itens = query.order_by(None).order_by(*ordem).limit(limite + 1).all()
+
+    next_cursor = None
+    if len(itens) > limite:
+        itens = itens[:limite]
+        ultimo = itens[-1]
+        next_cursor = codificar_cursor([getattr(ultimo, coluna.key) for coluna in colunas])
+
+    return {
+        'items': [serializar(item) for item in itens],
+        'limit': limite,
+        'next_cursor': next_cursor
+    }
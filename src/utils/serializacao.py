@@ -0,0 +1,47 @@
+from flask import request
+from src.utils.paginacao import ParametroInvalido
+
+
+def _lista_parametro(nome):
+    valor = request.args.get(nome)
+    if not valor:
+        return set()
+    return {item.strip() for item in valor.split(',') if item.strip()}
+
+
+def filtrar_campos(dados, campos):
+    if not campos:
+        return dados
+    return {chave: valor for chave, valor in dados.items() if chave in campos}
+
+
+class Serializador:
+    # Aplica ?fields= (campos retornados) e ?expand= (objetos relacionados
+    # incluídos) da requisição atual. Sem expand, relacionamentos vêm apenas
+    # como ids; os nomes aceitos em expand ficam em Modelo.EXPANSOES.
+
+    def __init__(self, modelo):
+        permitidas = set(getattr(modelo, 'EXPANSOES', ()))
+        self.expandir = _lista_parametro('expand')
+        if 'all' in self.expandir and permitidas:
+            self.expandir = permitidas
+        invalidas = self.expandir - permitidas
+        if invalidas:
+            raise ParametroInvalido(f'Expansão inválida: {", ".join(sorted(invalidas))}')
+        self.campos = _lista_parametro('fields')
+        if self.campos:
+            # Um relacionamento pedido em expand sempre aparece na resposta
+            self.campos |= self.expandir
+
+    def __call__(self, obj):
+        dados = obj.to_dict(self.expandir) if self.expandir else obj.to_dict()
+        return filtrar_campos(dados, self.campos)
+
+    def lista(self, objetos):
+        return [self(obj) for obj in objetos]
+
+    def filtrar(self, dicionarios):
+        # Para listas já serializadas (por exemplo, vindas do cache)
+        if not self.campos:
+            return dicionarios
+        return [filtrar_campos(dados, self.campos) for dados in dicionarios]
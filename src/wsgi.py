@@ -0,0 +1,9 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.app import create_app
+
+# Ponto de entrada WSGI para servidores multi-processo/multi-thread:
+#   gunicorn -c gunicorn.conf.py src.wsgi:app
+app = create_app(os.environ.get('APP_PERFIL', 'producao'))
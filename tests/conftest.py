@@ -0,0 +1,75 @@
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.app import create_app
+from src.models import db
+from src.models.computador import Computador
+from src.models.funcionario import Funcionario
+from src.models.manutencao import Manutencao
+from src.models.peca import Peca
+from src.models.problema import Problema
+
+
+@pytest.fixture
+def criar_app(tmp_path):
+    # Fábrica de apps sobre um SQLite temporário; os engines são descartados
+    # ao fim do teste
+    apps = []
+
+    def criar(perfil='desenvolvimento', **configuracao):
+        configuracao.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'app.db'}")
+        configuracao.setdefault('CONSULTAS_LENTAS_LIMIAR_MS', None)
+        configuracao.setdefault('EVENTOS_ATIVOS', False)
+        app = create_app(perfil, configuracao)
+        apps.append(app)
+        return app
+
+    yield criar
+    for app in apps:
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+def popular(quantidade, computadores=5):
+    # "quantidade" manutenções com uma peça cada, distribuídas entre os computadores
+    maquinas = [Computador(marca='Dell', modelo=f'OptiPlex {i}', numero_serie=f'TESTE{i:04d}',
+                           data_aquisicao=date(2022, 1, 1)) for i in range(computadores)]
+    tecnicos = [Funcionario(nome=f'Técnico {i}', cargo='Técnico', departamento='TI') for i in range(3)]
+    problemas = [Problema(descricao=f'Problema {i}', categoria='Hardware') for i in range(3)]
+    db.session.add_all(maquinas + tecnicos + problemas)
+    db.session.flush()
+    for i in range(quantidade):
+        manutencao = Manutencao(computador_id=maquinas[i % computadores].id, funcionario_id=tecnicos[i % 3].id,
+                                problema_id=problemas[i % 3].id, data_manutencao=datetime(2024, 1 + i % 12, 1 + i % 28),
+                                tipo_manutencao=('Preventiva', 'Corretiva')[i % 2],
+                                descricao_problema='Não liga', solucao_aplicada='Troca da fonte')
+        db.session.add(manutencao)
+        db.session.flush()
+        db.session.add(Peca(nome_peca=f'Fonte {i}', fabricante='ACME', data_aquisicao_peca=date(2024, 1, 1),
+                            custo=100 + i, manutencao_id=manutencao.id))
+    db.session.commit()
+    return maquinas
+
+
+class ContadorConsultas:
+    # Conta as consultas SQL executadas pelo engine dentro do bloco with
+    def __init__(self, engine):
+        self.engine = engine
+        self.total = 0
+
+    def _contar(self, *args):
+        self.total += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._contar)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, 'before_cursor_execute', self._contar)
@@ -0,0 +1,47 @@
+FUNCIONARIO = {'nome': 'Ana', 'cargo': 'Técnica', 'departamento': 'TI'}
+
+
+def _alteracoes(cliente, since='0', limite=100):
+    resposta = cliente.get(f'/api/changes?since={since}&limit={limite}')
+    assert resposta.status_code == 200
+    return resposta.get_json()
+
+
+def test_insercao_alteracao_e_exclusao(criar_app):
+    cliente = criar_app().test_client()
+    ana = cliente.post('/api/funcionarios', json=FUNCIONARIO).get_json()['id']
+    bia = cliente.post('/api/funcionarios', json={**FUNCIONARIO, 'nome': 'Bia'}).get_json()['id']
+    token = _alteracoes(cliente)['next_token']
+
+    cliente.put(f'/api/funcionarios/{ana}', json={'cargo': 'Coordenadora'})
+    cliente.delete(f'/api/funcionarios/{bia}')
+    corpo = _alteracoes(cliente, token)
+    por_id = {alteracao['id']: alteracao for alteracao in corpo['changes']}
+
+    assert por_id[ana]['operacao'] == 'update'
+    assert por_id[ana]['dados']['cargo'] == 'Coordenadora'
+    # Exclusão: marcador sem dados
+    assert por_id[bia]['operacao'] == 'delete'
+    assert 'dados' not in por_id[bia]
+    assert corpo['has_more'] is False
+
+    # Sem novidades o token não muda
+    assert _alteracoes(cliente, corpo['next_token']) == {'changes': [], 'next_token': corpo['next_token'],
+                                                        'has_more': False}
+
+
+def test_paginas_por_token(criar_app):
+    cliente = criar_app().test_client()
+    for i in range(5):
+        cliente.post('/api/funcionarios', json={**FUNCIONARIO, 'nome': f'Técnico {i}'})
+
+    vistos, token, mais = [], '0', True
+    while mais:
+        corpo = _alteracoes(cliente, token, limite=2)
+        vistos += [alteracao['dados']['nome'] for alteracao in corpo['changes']]
+        token, mais = corpo['next_token'], corpo['has_more']
+    assert vistos == [f'Técnico {i}' for i in range(5)]
+
+
+def test_token_invalido(criar_app):
+    assert criar_app().test_client().get('/api/changes?since=abc').status_code == 400
@@ -0,0 +1,115 @@
+import os
+import shutil
+from datetime import datetime
+
+from src.models import db
+from src.models.arquivo import arquivar_lote
+from conftest import popular
+
+BANCO_ORIGINAL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'database', 'app.db')
+N = 20
+# As manutenções de popular() vão de janeiro a dezembro de 2024: as
+# anteriores a julho vão para o arquivo
+LIMITE = datetime(2024, 7, 1)
+NOVA_MANUTENCAO = {'computador_id': 1, 'funcionario_id': 1, 'problema_id': 1, 'data_manutencao': '2025-01-10T09:00',
+                   'tipo_manutencao': 'Corretiva', 'descricao_problema': 'Não liga', 'solucao_aplicada': 'Troca da fonte'}
+
+
+def _arquivar(limite=LIMITE):
+    # Só são arquivadas as manutenções sem alteração recente
+    db.session.execute(db.text('UPDATE manutencoes SET updated_at = data_manutencao'))
+    db.session.commit()
+    with db.engine.begin() as conn:
+        return arquivar_lote(conn, limite, 1000)
+
+
+def _app_com_arquivo(criar_app, tmp_path, **configuracao):
+    return criar_app(ARQUIVO_CAMINHO=str(tmp_path / 'arquivo.db'), **configuracao)
+
+
+def _lista(cliente, url):
+    resposta = cliente.get(url)
+    assert resposta.status_code == 200
+    return resposta.get_json()
+
+
+def test_listagem_une_quente_e_arquivo(criar_app, tmp_path):
+    app = _app_com_arquivo(criar_app, tmp_path)
+    with app.app_context():
+        popular(N)
+        arquivadas, _ = _arquivar()
+        quentes = db.session.execute(db.text('SELECT COUNT(*) FROM manutencoes')).scalar()
+    assert 0 < arquivadas < N and quentes == N - arquivadas
+
+    cliente = app.test_client()
+    assert len(_lista(cliente, '/api/manutencoes')) == N
+    # Período posterior ao arquivo: só a tabela quente
+    assert len(_lista(cliente, '/api/manutencoes?data_inicio=2024-07-01')) == quentes
+    # Consulta por id e peça de uma manutenção arquivada
+    antiga = _lista(cliente, '/api/manutencoes?data_fim=2024-01-31')[0]
+    assert _lista(cliente, f"/api/manutencoes/{antiga['id']}")['id'] == antiga['id']
+    assert _lista(cliente, f"/api/pecas/{antiga['pecas_ids'][0]}")['manutencao_id'] == antiga['id']
+
+
+def test_paginacao_atravessa_o_arquivo(criar_app, tmp_path):
+    app = _app_com_arquivo(criar_app, tmp_path)
+    with app.app_context():
+        popular(N)
+        _arquivar()
+    cliente = app.test_client()
+    esperados = [m['id'] for m in _lista(cliente, '/api/manutencoes')]
+
+    ids, cursor = [], None
+    while True:
+        pagina = _lista(cliente, '/api/manutencoes?limit=3' + (f'&cursor={cursor}' if cursor else ''))
+        ids += [m['id'] for m in pagina['items']]
+        cursor = pagina['next_cursor']
+        if cursor is None:
+            break
+    assert ids == esperados
+
+
+def test_exportacao_e_alteracoes_incluem_arquivadas(criar_app, tmp_path):
+    app = _app_com_arquivo(criar_app, tmp_path)
+    with app.app_context():
+        popular(N)
+        _arquivar()
+    cliente = app.test_client()
+
+    linhas = cliente.get('/api/manutencoes/exportar').get_data(as_text=True).splitlines()
+    assert len(linhas) == N
+
+    alteracoes = _lista(cliente, '/api/changes?limit=500')['changes']
+    manutencoes = [a for a in alteracoes if a['entidade'] in ('manutencoes', 'pecas')]
+    assert len(manutencoes) == 2 * N
+    assert all(a['operacao'] != 'delete' and a['dados'] for a in manutencoes)
+
+
+def test_arquivadas_sao_somente_leitura(criar_app, tmp_path):
+    app = _app_com_arquivo(criar_app, tmp_path)
+    with app.app_context():
+        popular(N)
+        _arquivar()
+    cliente = app.test_client()
+    antiga = _lista(cliente, '/api/manutencoes?data_fim=2024-01-31')[0]
+
+    assert cliente.put(f"/api/manutencoes/{antiga['id']}", json={'solucao_aplicada': 'x'}).status_code == 404
+    assert cliente.delete(f"/api/manutencoes/{antiga['id']}").status_code == 404
+    assert cliente.put(f"/api/pecas/{antiga['pecas_ids'][0]}", json={'custo': 1}).status_code == 404
+    assert cliente.delete(f"/api/pecas/{antiga['pecas_ids'][0]}").status_code == 404
+
+
+def test_ids_arquivados_nao_sao_reutilizados(criar_app, tmp_path):
+    # Banco criado antes da migração 6 (sem AUTOINCREMENT): as tabelas são
+    # reconstruídas na primeira inicialização com o arquivo
+    banco = tmp_path / 'app.db'
+    shutil.copy(BANCO_ORIGINAL, banco)
+    app = _app_com_arquivo(criar_app, tmp_path)
+    with app.app_context():
+        maior = db.session.execute(db.text('SELECT MAX(id) FROM manutencoes')).scalar()
+        _arquivar(datetime(2100, 1, 1))
+        assert db.session.execute(db.text('SELECT COUNT(*) FROM manutencoes')).scalar() == 0
+
+    resposta = app.test_client().post('/api/manutencoes', json=NOVA_MANUTENCAO)
+    assert resposta.status_code == 201
+    assert resposta.get_json()['id'] > maior
@@ -0,0 +1,37 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from src.models import busca
+from conftest import popular
+
+
+def test_busca_informa_o_limite(criar_app):
+    app = criar_app()
+    with app.app_context():
+        popular(30)
+    cliente = app.test_client()
+
+    resposta = cliente.get('/api/pecas/search?q=Fonte&limit=5')
+    assert resposta.status_code == 200
+    assert len(resposta.get_json()) == 5
+    assert resposta.headers['X-Result-Limit'] == '5'
+    assert resposta.headers['X-Has-More'] == 'true'
+
+    resposta = cliente.get('/api/pecas/search?q=Fonte&limit=30')
+    assert len(resposta.get_json()) == 30
+    assert resposta.headers['X-Has-More'] == 'false'
+
+    resposta = cliente.get('/api/search?q=Fonte&limit=5')
+    assert len(resposta.get_json()['pecas']) == 5
+    assert resposta.headers['X-Truncated-Types'] == 'pecas'
+
+
+def test_erro_na_criacao_do_indice_interrompe_a_migracao(criar_app, tmp_path, monkeypatch):
+    # Só a falta do módulo FTS5 leva ao LIKE; outros erros não são engolidos
+    monkeypatch.setattr(busca, '_ddl_indice', lambda tabela, colunas: ['CREATE VIRTUAL TABLE x USING inexistente(a)'])
+    with pytest.raises(OperationalError):
+        criar_app()
+    with sqlite3.connect(tmp_path / 'app.db') as conn:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
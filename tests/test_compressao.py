@@ -0,0 +1,70 @@
+import gzip
+import json
+
+import pytest
+
+from src.utils import compressao
+from conftest import popular
+
+
+@pytest.fixture
+def cliente(criar_app):
+    app = criar_app()
+    with app.app_context():
+        popular(30)
+    return app.test_client()
+
+
+def test_gzip(cliente):
+    original = cliente.get('/api/manutencoes')
+    resposta = cliente.get('/api/manutencoes', headers={'Accept-Encoding': 'gzip'})
+    assert original.headers.get('Content-Encoding') is None
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resposta.headers['Vary']
+    assert json.loads(gzip.decompress(resposta.data)) == original.get_json()
+
+
+def test_preferencia_do_cliente(cliente):
+    resposta = cliente.get('/api/manutencoes', headers={'Accept-Encoding': 'br;q=1, gzip;q=0.5'})
+    esperado = 'br' if compressao.brotli is not None else 'gzip'
+    assert resposta.headers['Content-Encoding'] == esperado
+
+
+def test_codificacao_recusada_ou_desconhecida(cliente):
+    for cabecalho in ('gzip;q=0', 'identity', 'compress'):
+        resposta = cliente.get('/api/manutencoes', headers={'Accept-Encoding': cabecalho})
+        assert resposta.headers.get('Content-Encoding') is None, cabecalho
+
+
+def test_resposta_pequena_nao_e_comprimida(cliente):
+    resposta = cliente.get('/api/problemas', headers={'Accept-Encoding': 'gzip'})
+    assert len(resposta.data) < 1024
+    assert resposta.headers.get('Content-Encoding') is None
+
+
+def test_exportacao_em_stream(cliente):
+    original = cliente.get('/api/manutencoes/exportar').data
+    resposta = cliente.get('/api/manutencoes/exportar', headers={'Accept-Encoding': 'gzip'})
+    assert resposta.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in resposta.headers
+    assert gzip.decompress(resposta.data) == original
+
+
+def test_304_repete_etag_fraco_e_vary(cliente):
+    cabecalhos = {'Accept-Encoding': 'gzip'}
+    resposta = cliente.get('/api/manutencoes', headers=cabecalhos)
+    etag = resposta.headers['ETag']
+    assert etag.startswith('W/')
+
+    revalidada = cliente.get('/api/manutencoes', headers={**cabecalhos, 'If-None-Match': etag})
+    assert revalidada.status_code == 304
+    assert revalidada.headers['ETag'] == etag
+    assert 'Accept-Encoding' in revalidada.headers['Vary']
+
+
+def test_304_sem_compressao_mantem_etag_forte(cliente):
+    etag = cliente.get('/api/manutencoes').headers['ETag']
+    assert not etag.startswith('W/')
+    revalidada = cliente.get('/api/manutencoes', headers={'If-None-Match': etag})
+    assert revalidada.status_code == 304
+    assert revalidada.headers['ETag'] == etag
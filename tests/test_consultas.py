@@ -0,0 +1,35 @@
+import pytest
+
+from src.models import db
+from src.models.manutencao import Manutencao
+from conftest import ContadorConsultas, popular
+
+N = 10
+
+# Consultas por requisição, independentes da quantidade de linhas: versões
+# das tabelas (ETag), manutenções (com computador, funcionário e problema)
+# e peças (selectinload)
+CONSULTAS_ESPERADAS = {
+    '/api/manutencoes': 3,
+    '/api/manutencoes?expand=all': 3,
+    '/api/manutencoes/{id}': 3,
+    '/api/manutencoes/computador/{computador_id}': 3,
+}
+
+
+@pytest.mark.parametrize('quantidade', [N, 10 * N])
+@pytest.mark.parametrize('rota', list(CONSULTAS_ESPERADAS))
+def test_consultas_por_requisicao(criar_app, rota, quantidade):
+    app = criar_app()
+    with app.app_context():
+        maquinas = popular(quantidade)
+        manutencao_id = db.session.query(Manutencao.id).order_by(Manutencao.id).first()[0]
+        url = rota.format(id=manutencao_id, computador_id=maquinas[0].id)
+        engine = db.engine
+
+    cliente = app.test_client()
+    with ContadorConsultas(engine) as contador:
+        resposta = cliente.get(url)
+
+    assert resposta.status_code == 200
+    assert contador.total == CONSULTAS_ESPERADAS[rota]
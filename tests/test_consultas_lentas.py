@@ -0,0 +1,40 @@
+from src.config import DesenvolvimentoConfig, ProducaoConfig
+from src.models import db
+from src.utils.consultas_lentas import PARAMETROS_OMITIDOS, consultas_lentas
+
+from conftest import popular
+
+
+def test_desligado_fora_do_desenvolvimento():
+    assert ProducaoConfig.CONSULTAS_LENTAS_LIMIAR_MS is None
+    assert ProducaoConfig.CONSULTAS_LENTAS_PARAMETROS is False
+    assert DesenvolvimentoConfig.CONSULTAS_LENTAS_LIMIAR_MS == 100
+
+
+def test_endpoint_desligado_responde_404(criar_app):
+    app = criar_app('producao')
+    resposta = app.test_client().get('/api/_consultas_lentas')
+    assert resposta.status_code == 404
+
+
+def _consultar(app):
+    with app.app_context():
+        popular(3)
+    consultas_lentas.limpar()
+    resposta = app.test_client().get('/api/computadores?ids=1,2')
+    assert resposta.status_code == 200
+    relatorio = app.test_client().get('/api/_consultas_lentas').get_json()
+    return [consulta['exemplo']['parametros'] for consulta in relatorio['consultas']]
+
+
+def test_parametros_omitidos_por_padrao(criar_app):
+    # Limiar mínimo: toda consulta entra no log
+    app = criar_app('producao', CONSULTAS_LENTAS_LIMIAR_MS=1e-9)
+    parametros = _consultar(app)
+    assert parametros and all(valor == PARAMETROS_OMITIDOS for valor in parametros)
+
+
+def test_parametros_com_a_opcao_ligada(criar_app):
+    app = criar_app('producao', CONSULTAS_LENTAS_LIMIAR_MS=1e-9, CONSULTAS_LENTAS_PARAMETROS=True)
+    parametros = _consultar(app)
+    assert any('1' in valor for valor in parametros if valor)
@@ -0,0 +1,52 @@
+import time
+
+FUNCIONARIO = {'nome': 'Ana', 'cargo': 'Técnica', 'departamento': 'TI'}
+
+
+def _eventos(resposta, prazo):
+    # Partes do stream até o prazo; o heartbeat curto garante que o gerador
+    # devolve algo (": ping") mesmo sem alterações
+    fim = time.monotonic() + prazo
+    for parte in resposta.response:
+        yield parte.decode() if isinstance(parte, bytes) else parte
+        if time.monotonic() > fim:
+            return
+
+
+def test_evento_depois_de_uma_escrita(criar_app):
+    app = criar_app(EVENTOS_ATIVOS=True, EVENTOS_HEARTBEAT=0.2, EVENTOS_INTERVALO=0.1)
+    cliente = app.test_client()
+    resposta = cliente.get('/api/eventos', buffered=False)
+    assert resposta.status_code == 200
+    assert resposta.mimetype == 'text/event-stream'
+
+    recebido = None
+    try:
+        for parte in _eventos(resposta, 10):
+            if 'event: ready' in parte:
+                # Conectado: a escrita de outro cliente deve chegar pelo stream
+                id = app.test_client().post('/api/funcionarios', json=FUNCIONARIO).get_json()['id']
+            elif 'event: change' in parte and '"funcionarios"' in parte:
+                recebido = parte
+                break
+    finally:
+        resposta.close()
+
+    assert recebido is not None
+    assert f'"id":{id}' in recebido and '"operacao":"insert"' in recebido
+
+
+def test_last_event_id_recupera_o_que_foi_perdido(criar_app):
+    app = criar_app(EVENTOS_ATIVOS=True, EVENTOS_HEARTBEAT=0.2)
+    cliente = app.test_client()
+    cliente.post('/api/funcionarios', json=FUNCIONARIO)
+    resposta = cliente.get('/api/eventos', headers={'Last-Event-ID': '0'}, buffered=False)
+    try:
+        partes = ''.join(_eventos(resposta, 1))
+    finally:
+        resposta.close()
+    assert 'event: change' in partes and '"funcionarios"' in partes
+
+
+def test_eventos_desativados(criar_app):
+    assert criar_app().test_client().get('/api/eventos').status_code == 404
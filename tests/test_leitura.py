@@ -0,0 +1,45 @@
+import os
+import threading
+
+
+def _iniciar(criar_app, **configuracao):
+    # create_app em outra thread: um travamento na inicialização falha o
+    # teste em vez de prender a execução
+    resultado = {}
+
+    def iniciar():
+        try:
+            resultado['app'] = criar_app(**configuracao)
+        except Exception as e:
+            resultado['erro'] = e
+
+    thread = threading.Thread(target=iniciar, daemon=True)
+    thread.start()
+    thread.join(30)
+    assert not thread.is_alive(), 'create_app não terminou'
+    if 'erro' in resultado:
+        raise resultado['erro']
+    return resultado['app']
+
+
+def _gravar_e_ler(app):
+    cliente = app.test_client()
+    resposta = cliente.post('/api/funcionarios', json={'nome': 'Ana', 'cargo': 'Técnica', 'departamento': 'TI'})
+    assert resposta.status_code == 201
+    resposta = cliente.get('/api/funcionarios')
+    assert resposta.status_code == 200
+    return resposta.get_json()
+
+
+def test_modo_ro_em_banco_novo(criar_app, tmp_path):
+    # Primeira execução com APP_LEITURA=ro: o banco principal ainda não existe
+    app = _iniciar(criar_app, LEITURA_BANCO='ro')
+    assert os.path.exists(tmp_path / 'app.db')
+    assert [funcionario['nome'] for funcionario in _gravar_e_ler(app)] == ['Ana']
+
+
+def test_replica_em_banco_novo(criar_app, tmp_path):
+    # A réplica criada na inicialização já tem o esquema do banco migrado
+    app = _iniciar(criar_app, LEITURA_BANCO=str(tmp_path / 'replica.db'))
+    assert os.path.exists(tmp_path / 'replica.db')
+    assert _gravar_e_ler(app) == []
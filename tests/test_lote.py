@@ -0,0 +1,77 @@
+from src.models import db
+from src.models.funcionario import Funcionario
+from src.models.peca import Peca
+from conftest import popular
+
+FUNCIONARIO = {'nome': 'Ana', 'cargo': 'Técnica', 'departamento': 'TI'}
+
+
+def _peca(**dados):
+    return {'nome_peca': 'SSD', 'fabricante': 'ACME', 'data_aquisicao_peca': '2024-01-01', 'custo': 250, **dados}
+
+
+def test_refs_e_gravacao(criar_app):
+    app = criar_app()
+    with app.app_context():
+        maquinas = popular(1)
+        computador_id = maquinas[0].id
+    cliente = app.test_client()
+    resposta = cliente.post('/api/batch', json={'operacoes': [
+        {'operacao': 'create', 'entidade': 'funcionarios', 'ref': 'ana', 'dados': FUNCIONARIO},
+        {'operacao': 'create', 'entidade': 'pecas', 'ref': 'ssd', 'dados': _peca()},
+        {'operacao': 'create', 'entidade': 'manutencoes', 'dados': {
+            'computador_id': computador_id, 'funcionario_id': {'$ref': 'ana'}, 'problema_id': 1,
+            'data_manutencao': '2024-05-01T10:00', 'tipo_manutencao': 'Corretiva',
+            'descricao_problema': 'Lento', 'solucao_aplicada': 'Troca do disco', 'pecas_ids': [{'$ref': 'ssd'}]}},
+    ]})
+    assert resposta.status_code == 200
+    corpo = resposta.get_json()
+    manutencao = corpo['resultados'][2]['dados']
+    assert manutencao['funcionario_id'] == corpo['refs']['ana']
+    assert manutencao['pecas_ids'] == [corpo['refs']['ssd']]
+
+
+def test_falha_desfaz_o_lote(criar_app):
+    app = criar_app()
+    cliente = app.test_client()
+    resposta = cliente.post('/api/batch', json={'operacoes': [
+        {'operacao': 'create', 'entidade': 'funcionarios', 'dados': FUNCIONARIO},
+        {'operacao': 'create', 'entidade': 'pecas', 'dados': _peca(custo='nan')},
+    ]})
+    assert resposta.status_code == 400
+    assert resposta.get_json()['indice'] == 1
+    with app.app_context():
+        assert db.session.query(Funcionario).count() == 0
+        assert db.session.query(Peca).count() == 0
+
+
+def test_custo_deve_ser_numero_finito(criar_app):
+    cliente = criar_app().test_client()
+    for custo in (True, '12.5', float('inf'), None):
+        resposta = cliente.post('/api/batch', json={'operacoes': [
+            {'operacao': 'create', 'entidade': 'pecas', 'dados': _peca(custo=custo)}]})
+        assert resposta.status_code == 400, custo
+    resposta = cliente.post('/api/batch', json={'operacoes': [
+        {'operacao': 'create', 'entidade': 'pecas', 'dados': _peca(custo=12.5)}]})
+    assert resposta.get_json()['resultados'][0]['dados']['custo'] == 12.5
+
+
+def test_idempotencia(criar_app):
+    app = criar_app()
+    cliente = app.test_client()
+    corpo = {'operacoes': [{'operacao': 'create', 'entidade': 'funcionarios', 'dados': FUNCIONARIO}]}
+    cabecalhos = {'Idempotency-Key': 'lote-1'}
+
+    primeira = cliente.post('/api/batch', json=corpo, headers=cabecalhos)
+    repetida = cliente.post('/api/batch', json=corpo, headers=cabecalhos)
+    assert primeira.status_code == repetida.status_code == 200
+    assert repetida.headers['Idempotency-Replayed'] == 'true'
+    assert repetida.get_json() == primeira.get_json()
+    with app.app_context():
+        assert db.session.query(Funcionario).count() == 1
+
+    outro = {'operacoes': [{'operacao': 'create', 'entidade': 'funcionarios', 'dados': {**FUNCIONARIO, 'nome': 'Bia'}}]}
+    conflito = cliente.post('/api/batch', json=outro, headers=cabecalhos)
+    assert conflito.status_code == 409
+    with app.app_context():
+        assert db.session.query(Funcionario).count() == 1
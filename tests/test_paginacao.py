@@ -0,0 +1,84 @@
+from datetime import datetime
+
+import pytest
+
+from src.models import db
+from src.models.manutencao import Manutencao
+from conftest import popular
+
+MESMA_DATA = datetime(2024, 3, 15, 10, 0)
+
+
+def _paginas(cliente, url, limite):
+    # Segue next_cursor até o fim; retorna as páginas de ids
+    paginas, cursor = [], None
+    while True:
+        resposta = cliente.get(f'{url}?limit={limite}' + (f'&cursor={cursor}' if cursor else ''))
+        assert resposta.status_code == 200
+        corpo = resposta.get_json()
+        paginas.append([item['id'] for item in corpo['items']])
+        cursor = corpo['next_cursor']
+        if cursor is None:
+            return paginas
+
+
+def test_datas_repetidas_nao_perdem_nem_repetem_itens(criar_app):
+    app = criar_app()
+    with app.app_context():
+        popular(7)
+        # Todas com a mesma data: o desempate é o id
+        db.session.query(Manutencao).update({Manutencao.data_manutencao: MESMA_DATA})
+        db.session.commit()
+        esperados = [id for (id,) in db.session.query(Manutencao.id).order_by(Manutencao.id.desc())]
+
+    paginas = _paginas(app.test_client(), '/api/manutencoes', 3)
+    assert [len(pagina) for pagina in paginas] == [3, 3, 1]
+    assert sum(paginas, []) == esperados
+
+
+def test_ultima_pagina_completa_nao_tem_cursor(criar_app):
+    app = criar_app()
+    with app.app_context():
+        popular(6)
+    paginas = _paginas(app.test_client(), '/api/pecas', 3)
+    assert [len(pagina) for pagina in paginas] == [3, 3]
+    assert sum(paginas, []) == sorted(sum(paginas, []))
+
+
+def test_limite_maximo(criar_app):
+    cliente = criar_app().test_client()
+    assert cliente.get('/api/computadores?limit=10000').get_json()['limit'] == 500
+    assert cliente.get('/api/computadores?cursor=').get_json()['limit'] == 50
+
+
+@pytest.mark.parametrize('url', [
+    '/api/manutencoes?cursor=invalido',
+    '/api/manutencoes?cursor=WzFd',  # [1]: faltam colunas
+    '/api/computadores?cursor=eyJhIjoxfQ',  # {"a":1}
+    '/api/computadores?limit=0',
+    '/api/computadores?limit=dez',
+    '/api/manutencoes?data_inicio=2024-13-01',
+    '/api/manutencoes?data_fim=ontem',
+    '/api/manutencoes/exportar?data_inicio=01/02/2024',
+])
+def test_parametros_invalidos(criar_app, url):
+    resposta = criar_app().test_client().get(url)
+    assert resposta.status_code == 400
+    assert 'error' in resposta.get_json()
+
+
+@pytest.mark.parametrize('url, quantidade', [
+    ('/api/computadores', 5),
+    ('/api/funcionarios', 3),
+    ('/api/problemas', 3),
+    ('/api/pecas', 4),
+    ('/api/pecas/disponiveis', 0),
+    ('/api/manutencoes', 4),
+])
+def test_sem_paginacao_devolve_lista_completa(criar_app, url, quantidade):
+    app = criar_app()
+    with app.app_context():
+        popular(4)
+    resposta = app.test_client().get(url)
+    assert resposta.status_code == 200
+    assert len(resposta.get_json()) == quantidade
@@ -0,0 +1,31 @@
+from conftest import popular
+
+
+def test_janela_vale_para_total_tipos_e_meses(criar_app):
+    app = criar_app()
+    with app.app_context():
+        # Uma manutenção por mês de 2024, alternando Preventiva e Corretiva
+        popular(12)
+    cliente = app.test_client()
+
+    relatorio = cliente.get('/api/manutencoes/relatorio?data_inicio=2024-01-01&data_fim=2024-03-31').get_json()
+    assert relatorio['total_manutencoes'] == 3
+    assert {item['tipo']: item['quantidade'] for item in relatorio['por_tipo']} == {'Preventiva': 2, 'Corretiva': 1}
+    assert [item['mes'] for item in relatorio['por_mes']] == [1, 2, 3]
+    assert relatorio['total_manutencoes'] == sum(item['total'] for item in relatorio['por_mes'])
+
+    relatorio = cliente.get('/api/manutencoes/relatorio?data_inicio=2024-01-01&data_fim=2024-12-31').get_json()
+    assert relatorio['total_manutencoes'] == 12
+
+    relatorio = cliente.get('/api/manutencoes/relatorio?data_inicio=2023-01-01&data_fim=2023-12-31').get_json()
+    assert relatorio == {**relatorio, 'total_manutencoes': 0, 'por_tipo': [], 'por_mes': []}
+
+
+def test_painel_usa_a_mesma_janela(criar_app):
+    app = criar_app()
+    with app.app_context():
+        popular(12)
+    corpo = app.test_client().get('/api/bootstrap?incluir=totais,relatorio&data_inicio=2024-06-01&data_fim=2024-06-30')
+    corpo = corpo.get_json()
+    assert corpo['totais']['manutencoes'] == 12
+    assert corpo['relatorio']['total_manutencoes'] == 1